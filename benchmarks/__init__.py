@@ -0,0 +1,5 @@
+"""Benchmarks of canonical MinimalComputer workloads.
+
+Run with python -m benchmarks. See benchmarks.run for the metrics and how a run
+is compared with a baseline.
+"""
@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+import pytest
+from pytest_subtests import SubTests
+
+from benchmarks import workloads
+from benchmarks.run import compare, main, run_workload
+from flip.components import MinimalComputer
+
+
+def test_workloads(subtests: SubTests) -> None:
+    for workload in [
+        workloads.fibonacci(5),
+        workloads.memcpy(7),
+        workloads.bubble_sort(5),
+        workloads.multiply(0xFF, 0xFF),
+        workloads.multiply(0x00, 0x12),
+        workloads.recursion(5),
+        *workloads.workloads(),
+    ]:
+        with subtests.test(workload=workload.name):
+            computer = MinimalComputer(data=workload.program())
+            computer.tick_until_halt(1 << 20)
+            assert computer.halt
+            workload.check(computer)
+
+
+def test_run_workload() -> None:
+    result = run_workload(workloads.multiply(), repeat=1)
+    assert result["cycles"] == 1019
+    assert result["seconds"] > 0
+    assert result["ticks_per_second"] == pytest.approx(
+        result["cycles"] / result["seconds"]
+    )
+    assert result["peak_bytes"] > 0
+
+
+def _results(seconds: float, ticks_per_second: float, cycles: int = 100) -> dict:
+    return {
+        "setup": {"assembly_seconds": seconds},
+        "workloads": {
+            "w": {
+                "cycles": cycles,
+                "seconds": seconds,
+                "ticks_per_second": ticks_per_second,
+            }
+        },
+    }
+
+
+def test_compare(subtests: SubTests) -> None:
+    baseline = _results(1.0, 100.0)
+    for results, expected in list[tuple[dict, list[str]]](
+        [
+            (_results(1.0, 100.0), []),
+            (_results(1.1, 91.0), []),
+            (_results(0.5, 200.0), []),
+            (
+                _results(1.3, 100.0),
+                ["setup: assembly_seconds 1.3 > 1", "w: seconds 1.3 > 1"],
+            ),
+            (_results(1.0, 70.0), ["w: ticks_per_second 70 < 100"]),
+            (_results(1.0, 100.0, cycles=101), ["w: cycles 101 != 100"]),
+            (
+                {"setup": {}, "workloads": {"v": {"cycles": 1, "seconds": 9.0}}},
+                [],
+            ),
+        ]
+    ):
+        with subtests.test(results=results):
+            assert compare(results, baseline, 0.2) == expected
+
+
+def test_main(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "output.json"
+    argv = ["multiply", "--repeat=1", f"--baseline={baseline}"]
+    assert main([*argv, "--update-baseline"]) == 0
+    assert set(json.loads(baseline.read_text())["workloads"]) == {"multiply"}
+    assert main([*argv, "--tolerance=10", f"--output={output}"]) == 0
+    assert json.loads(output.read_text())["workloads"]["multiply"]["cycles"] == 1019
+    results = json.loads(baseline.read_text())
+    results["workloads"]["multiply"]["cycles"] += 1
+    baseline.write_text(json.dumps(results))
+    assert main([*argv, "--tolerance=10"]) == 1
+
+
+def test_main_invalid() -> None:
+    for argv in (["missing"], ["--repeat=0"], ["--tolerance=-1"]):
+        with pytest.raises(SystemExit):
+            main(argv)
@@ -0,0 +1,223 @@
+"""Runs the benchmark workloads and compares the results with a baseline.
+
+Each workload is a guest program that runs on the microcode engine until it
+halts. For each one, a run records its cycles, the best wall time to halt over
+--repeat runs, the ticks per second that gives, and the peak memory allocated
+while building the computer and running it, measured with tracemalloc in a
+separate run so the timed runs aren't slowed down. A run also times building
+the MinimalComputer instruction set, assembling its microcode ROM and
+constructing a MinimalComputer with both cached.
+
+Results are written as JSON. Compared with a baseline, a metric regresses if
+it's worse than the baseline's by more than --tolerance, as a fraction, and
+a workload's cycles must match exactly, since a change there is a change in
+behavior rather than speed. Timings depend on the machine, so the stored
+baseline should be updated with --update-baseline on the machine that checks
+against it.
+"""
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from benchmarks.workloads import Workload, workloads
+from flip.components import MinimalComputer
+from flip.components.controller import Assembler
+
+VERSION = 1
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# Whether a bigger value of each metric is better.
+_HIGHER_IS_BETTER = {
+    "seconds": False,
+    "ticks_per_second": True,
+    "peak_bytes": False,
+}
+
+
+def _best(repeat: int, f: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _run(workload: Workload, max_cycles: int) -> MinimalComputer:
+    computer = MinimalComputer(data=workload.program())
+    computer.tick_until_halt(max_cycles)
+    if not computer.halt:
+        raise RuntimeError(f"{workload.name} didn't halt in {max_cycles} cycles.")
+    workload.check(computer)
+    return computer
+
+
+def run_workload(
+    workload: Workload, repeat: int = 3, max_cycles: int = 1 << 24
+) -> Mapping[str, Any]:
+    """Run a workload and measure it."""
+    cycles = _run(workload, max_cycles).cycles
+    seconds = float("inf")
+    for _ in range(repeat):
+        computer = MinimalComputer(data=workload.program())
+        start = time.perf_counter()
+        computer.tick_until_halt(max_cycles)
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        _run(workload, max_cycles)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "cycles": cycles,
+        "seconds": seconds,
+        "ticks_per_second": cycles / seconds,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_setup(repeat: int = 3) -> Mapping[str, float]:
+    """Time building, assembling and constructing a MinimalComputer."""
+    # Fill the caches that construction uses.
+    MinimalComputer()
+    build_instruction_set = MinimalComputer._cached_instruction_set.__wrapped__
+    instruction_set = MinimalComputer.instruction_set()
+    return {
+        "instruction_set_seconds": _best(repeat, build_instruction_set),
+        "assembly_seconds": _best(
+            repeat, lambda: Assembler(instruction_set).assemble()
+        ),
+        "construction_seconds": _best(repeat, MinimalComputer),
+    }
+
+
+def run(names: Optional[Iterable[str]] = None, repeat: int = 3) -> Mapping[str, Any]:
+    """Run the setup benchmarks and the named workloads, or all of them."""
+    selected = workloads()
+    if names is not None:
+        names = set(names)
+        if unknown := names - {workload.name for workload in selected}:
+            raise ValueError(f"Unknown workloads {sorted(unknown)}.")
+        selected = [workload for workload in selected if workload.name in names]
+    return {
+        "version": VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "setup": run_setup(repeat),
+        "workloads": {
+            workload.name: run_workload(workload, repeat) for workload in selected
+        },
+    }
+
+
+def _regressed(
+    metric: str, value: float, baseline: float, tolerance: float
+) -> Optional[str]:
+    if _HIGHER_IS_BETTER.get(metric, False):
+        if value < baseline * (1 - tolerance):
+            return f"{metric} {value:.6g} < {baseline:.6g}"
+    elif value > baseline * (1 + tolerance):
+        return f"{metric} {value:.6g} > {baseline:.6g}"
+    return None
+
+
+def compare(
+    results: Mapping[str, Any], baseline: Mapping[str, Any], tolerance: float
+) -> Sequence[str]:
+    """Describe every metric of results that regressed from baseline.
+
+    Workloads and metrics that aren't in both are skipped.
+    """
+    regressions = list[str]()
+    for metric, value in results["setup"].items():
+        if (base := baseline.get("setup", {}).get(metric)) is not None:
+            if (regression := _regressed(metric, value, base, tolerance)) is not None:
+                regressions.append(f"setup: {regression}")
+    for name, result in results["workloads"].items():
+        if (base_result := baseline.get("workloads", {}).get(name)) is None:
+            continue
+        if result["cycles"] != base_result["cycles"]:
+            regressions.append(
+                f"{name}: cycles {result['cycles']} != {base_result['cycles']}"
+            )
+        for metric, value in result.items():
+            if metric == "cycles" or (base := base_result.get(metric)) is None:
+                continue
+            if (regression := _regressed(metric, value, base, tolerance)) is not None:
+                regressions.append(f"{name}: {regression}")
+    return regressions
+
+
+def _table(results: Mapping[str, Any]) -> str:
+    lines = [f"{metric}  {value:.6f}" for metric, value in results["setup"].items()]
+    lines += ["", "workload  cycles  seconds  ticks/s  peak KiB"]
+    for name, result in results["workloads"].items():
+        lines.append(
+            f"{name}  {result['cycles']}  {result['seconds']:.4f}  "
+            f"{result['ticks_per_second']:.0f}  {result['peak_bytes'] / 1024:.0f}"
+        )
+    return "\n".join(lines)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the benchmark workloads and compare them with a baseline.",
+    )
+    parser.add_argument(
+        "workloads",
+        nargs="*",
+        help="names of the workloads to run, all of them by default",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", type=Path, default=None, help="path to write results to"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fraction a metric may be worse than the baseline's",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write the results to the baseline instead of comparing",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Returns 0 if nothing regressed from the baseline, otherwise 1."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1.")
+    if args.tolerance < 0:
+        parser.error("--tolerance must not be negative.")
+    try:
+        results = run(args.workloads or None, args.repeat)
+    except ValueError as e:
+        parser.error(str(e))
+    print(_table(results))
+    encoded = json.dumps(results, indent=2) + "\n"
+    if args.output is not None:
+        args.output.write_text(encoded)
+    if args.update_baseline:
+        args.baseline.write_text(encoded)
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}.")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    return 1 if regressions else 0
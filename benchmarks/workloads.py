@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from flip.bytes import Word
+from flip.components import MinimalComputer
+
+# Scratch addresses at the top of the zero page, clear of the programs, which
+# start at 0x0000.
+_A = 0xF0
+_B = 0xF1
+_T = 0xF2
+_LO = 0xF3
+_HI = 0xF4
+_OUT = 0xF5
+
+
+@dataclass(frozen=True, kw_only=True)
+class Workload:
+    name: str
+    program: Callable[[], MinimalComputer.ProgramBuilder]
+    # Raises AssertionError if a halted computer has the wrong result.
+    check: Callable[[MinimalComputer], None]
+
+
+def _peek(computer: MinimalComputer, address: int) -> int:
+    return computer.memory[Word(address)].unsigned_value
+
+
+def fibonacci(count: int = 24) -> Workload:
+    """Stores count 8-bit Fibonacci numbers from 0x0300, last first."""
+
+    def program() -> MinimalComputer.ProgramBuilder:
+        return (
+            MinimalComputer.program_builder()
+            .lda(0x00)
+            .sta_zero_page(_A)
+            .lda(0x01)
+            .sta_zero_page(_B)
+            .ldx(count)
+            .label("loop")
+            .lda_zero_page(_A)
+            .clc()
+            .instruction("adc")
+            .absolute(_B)
+            .sta_index_x(0x0300)
+            .tay()
+            .lda_zero_page(_B)
+            .sta_zero_page(_A)
+            .tya()
+            .sta_zero_page(_B)
+            .dex()
+            .bne("loop")
+            .hlt()
+        )
+
+    def check(computer: MinimalComputer) -> None:
+        a, b = 0, 1
+        for x in range(count, 0, -1):
+            a, b = b, (a + b) & 0xFF
+            assert _peek(computer, 0x0300 + x) == b, x
+
+    return Workload(name="fibonacci", program=program, check=check)
+
+
+def memcpy(size: int = 200) -> Workload:
+    """Copies size bytes from 0x0400 to 0x0500."""
+    data = [(i * 37 + 11) & 0xFF for i in range(size)]
+
+    def program() -> MinimalComputer.ProgramBuilder:
+        return (
+            MinimalComputer.program_builder()
+            .ldx(size)
+            .label("loop")
+            .lda_index_x(0x0400 - 1)
+            .sta_index_x(0x0500 - 1)
+            .dex()
+            .bne("loop")
+            .hlt()
+            .at(0x0400)
+            .data(*data)
+        )
+
+    def check(computer: MinimalComputer) -> None:
+        assert [_peek(computer, 0x0500 + i) for i in range(size)] == data
+
+    return Workload(name="memcpy", program=program, check=check)
+
+
+def bubble_sort(size: int = 16) -> Workload:
+    """Sorts size bytes at 0x0600 in place."""
+    data = [(i * 97 + 53) & 0xFF for i in range(size)]
+
+    def program() -> MinimalComputer.ProgramBuilder:
+        return (
+            MinimalComputer.program_builder()
+            .ldy(size - 1)
+            .label("outer")
+            .ldx(0x00)
+            .label("inner")
+            .lda_index_x(0x0601)
+            .sta_zero_page(_T)
+            .lda_index_x(0x0600)
+            .instruction("cmp")
+            .absolute(_T)
+            # In order if a < t or a == t.
+            .bcc("next")
+            .beq("next")
+            .sta_index_x(0x0601)
+            .lda_zero_page(_T)
+            .sta_index_x(0x0600)
+            .label("next")
+            .inx()
+            .txa()
+            .cmp(size - 1)
+            .bne("inner")
+            .dey()
+            .bne("outer")
+            .hlt()
+            .at(0x0600)
+            .data(*data)
+        )
+
+    def check(computer: MinimalComputer) -> None:
+        assert [_peek(computer, 0x0600 + i) for i in range(size)] == sorted(data)
+
+    return Workload(name="bubble_sort", program=program, check=check)
+
+
+def multiply(lhs: int = 0xB7, rhs: int = 0xD5) -> Workload:
+    """Multiplies two bytes into a word at _LO and _HI by shift and add."""
+
+    def program() -> MinimalComputer.ProgramBuilder:
+        return (
+            MinimalComputer.program_builder()
+            .lda(lhs)
+            .sta_zero_page(_A)
+            .lda(rhs)
+            .sta_zero_page(_B)
+            .lda(0x00)
+            .sta_zero_page(_LO)
+            .sta_zero_page(_HI)
+            .ldx(0x08)
+            .label("loop")
+            # result <<= 1
+            .lda_zero_page(_LO)
+            .asl()
+            .sta_zero_page(_LO)
+            .lda_zero_page(_HI)
+            .rol()
+            .sta_zero_page(_HI)
+            # rhs <<= 1, and add lhs if its top bit was set
+            .lda_zero_page(_B)
+            .asl()
+            .sta_zero_page(_B)
+            .bcc("next")
+            .lda_zero_page(_LO)
+            .clc()
+            .instruction("adc")
+            .absolute(_A)
+            .sta_zero_page(_LO)
+            .lda_zero_page(_HI)
+            .adc(0x00)
+            .sta_zero_page(_HI)
+            .label("next")
+            .dex()
+            .bne("loop")
+            .hlt()
+        )
+
+    def check(computer: MinimalComputer) -> None:
+        product = _peek(computer, _HI) << 8 | _peek(computer, _LO)
+        assert product == lhs * rhs, hex(product)
+
+    return Workload(name="multiply", program=program, check=check)
+
+
+def recursion(depth: int = 40) -> Workload:
+    """Sums 1 to depth with a recursive subroutine, into _OUT."""
+
+    def program() -> MinimalComputer.ProgramBuilder:
+        return (
+            MinimalComputer.program_builder()
+            .lda(depth)
+            .jsr("sum")
+            .sta_zero_page(_OUT)
+            .hlt()
+            # a = a + sum(a - 1)
+            .label("sum")
+            .cmp(0x00)
+            .beq("done")
+            .pha()
+            .sec()
+            .sbc(0x01)
+            .jsr("sum")
+            .sta_zero_page(_T)
+            .pla()
+            .clc()
+            .instruction("adc")
+            .absolute(_T)
+            .label("done")
+            .rts()
+        )
+
+    def check(computer: MinimalComputer) -> None:
+        assert _peek(computer, _OUT) == depth * (depth + 1) // 2 & 0xFF
+
+    return Workload(name="recursion", program=program, check=check)
+
+
+def workloads() -> list[Workload]:
+    """The canonical workloads."""
+    return [fibonacci(), memcpy(), bubble_sort(), multiply(), recursion()]
@@ -0,0 +1,15 @@
+from typing import Iterator
+
+import pytest
+
+from flip.components.controller import RomCache
+
+
+@pytest.fixture(autouse=True, scope="session")
+def rom_cache(tmp_path_factory: pytest.TempPathFactory) -> Iterator[None]:
+    # Keep the tests' assembled ROMs out of the developer's cache.
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv(
+            RomCache.ENVIRONMENT_VARIABLE, str(tmp_path_factory.mktemp("roms"))
+        )
+        yield
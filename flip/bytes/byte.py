@@ -1,16 +1,32 @@
+import warnings
 from dataclasses import dataclass
-from typing import Iterable, Iterator, Sized, override
+from typing import ClassVar, Iterable, Iterator, Sized, override
 
 from flip.core import Error, Errorable
 
 
 class Byte(Errorable, Sized, Iterable[bool]):
+    """An 8-bit value.
+
+    Byte.of returns one of 256 shared, immutable instances, and should be
+    preferred over the constructor. Bytes built with the constructor can still
+    be modified in place through the value setters, but that's deprecated.
+    """
+
+    __slots__ = ("__value", "__frozen")
+
     class Error(Error): ...
 
     class IndexError(Error, IndexError): ...
 
     class ValueError(Error, ValueError): ...
 
+    class FrozenError(Error, AttributeError): ...
+
+    # The interned instances returned by Byte.of, indexed by value. Built by
+    # the first call to Byte.of.
+    __interned: ClassVar[tuple["Byte", ...]] = ()
+
     @dataclass(frozen=True, kw_only=True)
     class Result:
         value: "Byte"
@@ -36,6 +52,37 @@ class Byte(Errorable, Sized, Iterable[bool]):
 
     def __init__(self, value: int = 0) -> None:
         self.__value = value & 0xFF
+        self.__frozen = False
+
+    @classmethod
+    def of(cls, value: int) -> "Byte":
+        """Get the interned, immutable Byte for value."""
+        try:
+            return Byte.__interned[value & 0xFF]
+        except IndexError:
+            Byte.__interned = tuple(map(Byte.__frozen_byte, range(0x100)))
+            return Byte.__interned[value & 0xFF]
+
+    @classmethod
+    def __frozen_byte(cls, value: int) -> "Byte":
+        byte = cls(value)
+        byte.__frozen = True
+        return byte
+
+    @property
+    def frozen(self) -> bool:
+        return self.__frozen
+
+    def __set_value(self, value: int) -> None:
+        if self.__frozen:
+            raise self._error(f"Can't modify interned {self!r}.", self.FrozenError)
+        warnings.warn(
+            "Modifying a Byte in place is deprecated, use Byte.of to get a new "
+            "value instead.",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        self.__value = value & 0xFF
 
     @override
     def __repr__(self) -> str:
@@ -43,7 +90,9 @@ class Byte(Errorable, Sized, Iterable[bool]):
 
     @override
     def __eq__(self, other: object) -> bool:
-        return isinstance(other, Byte) and self.__value == other.__value
+        return self is other or (
+            isinstance(other, Byte) and self.__value == other.__value
+        )
 
     @override
     def __hash__(self) -> int:
@@ -77,7 +126,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
 
     @signed_value.setter
     def signed_value(self, value: int) -> None:
-        self.__value = value & 0xFF
+        self.__set_value(value)
 
     @property
     def unsigned_value(self) -> int:
@@ -85,7 +134,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
 
     @unsigned_value.setter
     def unsigned_value(self, value: int) -> None:
-        self.__value = value & 0xFF
+        self.__set_value(value)
 
     def add(self, rhs: "Byte", carry_in: bool = False) -> "Byte.Result":
         a = self.unsigned_value
@@ -95,7 +144,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
         result_ = total & 0xFF
 
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             carry=total > 0xFF,
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
@@ -112,7 +161,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
         result_ = total & 0xFF
 
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             # In subtraction, carry means NO borrow happened.
             carry=(a - b - borrow) >= 0,
             zero=result_ == 0,
@@ -127,7 +176,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
     def and_(self, rhs: "Byte") -> "Byte.Result":
         result_ = self.unsigned_value & rhs.unsigned_value
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
         )
@@ -135,7 +184,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
     def or_(self, rhs: "Byte") -> "Byte.Result":
         result_ = self.unsigned_value | rhs.unsigned_value
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
         )
@@ -143,14 +192,14 @@ class Byte(Errorable, Sized, Iterable[bool]):
     def xor(self, rhs: "Byte") -> "Byte.Result":
         result_ = self.unsigned_value ^ rhs.unsigned_value
         return Byte.Result(
-            value=Byte(result_), zero=result_ == 0, negative=(result_ & 0x80) != 0
+            value=Byte.of(result_), zero=result_ == 0, negative=(result_ & 0x80) != 0
         )
 
     def shift_left(self) -> "Byte.Result":
         a = self.unsigned_value
         result_ = (a << 1) & 0xFF
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
             carry=(a & 0x80) != 0,
@@ -160,7 +209,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
         a = self.unsigned_value
         result_ = (a >> 1) & 0xFF
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
             carry=(a & 0x01) != 0,
@@ -170,7 +219,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
         a = self.unsigned_value
         result_ = ((a << 1) | (1 if carry_in else 0)) & 0xFF
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
             carry=(a & 0x80) != 0,
@@ -180,7 +229,7 @@ class Byte(Errorable, Sized, Iterable[bool]):
         a = self.unsigned_value
         result_ = ((a >> 1) | (0x80 if carry_in else 0)) & 0xFF
         return Byte.Result(
-            value=Byte(result_),
+            value=Byte.of(result_),
             zero=result_ == 0,
             negative=(result_ & 0x80) != 0,
             carry=(a & 0x01) != 0,
@@ -17,19 +17,45 @@ def test_ctor_mod() -> None:
 def test_set_unsigned_value() -> None:
     b = Byte()
     assert b.unsigned_value == 0x00
-    b.unsigned_value = 0x01
+    with pytest.deprecated_call():
+        b.unsigned_value = 0x01
     assert b.unsigned_value == 0x01
 
 
 def test_set_signed_value() -> None:
     b = Byte()
     assert b.signed_value == 0x00
-    b.signed_value = 0x01
+    with pytest.deprecated_call():
+        b.signed_value = 0x01
     assert b.signed_value == 0x01
-    b.signed_value = -0x01
+    with pytest.deprecated_call():
+        b.signed_value = -0x01
     assert b.signed_value == -0x01
 
 
+def test_of() -> None:
+    b = Byte.of(0x101)
+    assert b.unsigned_value == 0x01
+    assert b.frozen
+    assert Byte.of(0x01) is b
+    assert b == Byte(0x01)
+    assert not Byte(0x01).frozen
+
+
+def test_of_frozen() -> None:
+    b = Byte.of(0x01)
+    with pytest.raises(Byte.FrozenError):
+        b.unsigned_value = 0x02
+    with pytest.raises(Byte.FrozenError):
+        b.signed_value = 0x02
+    assert b.unsigned_value == 0x01
+
+
+def test_slots() -> None:
+    with pytest.raises(AttributeError):
+        Byte().x = 1  # type: ignore
+
+
 def test_len() -> None:
     b = Byte()
     assert len(b) == 8
@@ -1,15 +1,36 @@
-from typing import override
+from typing import ClassVar, Optional, override
 
 from flip.bytes.byte import Byte
 
 
 class Word:
+    """An immutable 16-bit value.
+
+    Word.of returns shared instances and should be preferred over the
+    constructor in hot paths.
+    """
+
+    __slots__ = ("__value",)
+
+    # Instances returned by Word.of, indexed by value and created on demand.
+    _interned: ClassVar[list[Optional["Word"]]] = [None] * 0x10000
+
     def __init__(self, value: int = 0) -> None:
         self.__value = value & 0xFFFF
 
+    @classmethod
+    def of(cls, value: int) -> "Word":
+        """Get the interned Word for value."""
+        value &= 0xFFFF
+        if (word := cls._interned[value]) is None:
+            word = cls._interned[value] = cls(value)
+        return word
+
     @override
     def __eq__(self, other: object) -> bool:
-        return isinstance(other, Word) and self.__value == other.__value
+        return self is other or (
+            isinstance(other, Word) and self.__value == other.__value
+        )
 
     @override
     def __hash__(self) -> int:
@@ -21,13 +42,13 @@ class Word:
 
     def to_bytes(self) -> tuple[Byte, Byte]:
         return (
-            Byte(self.__value & 0xFF),
-            Byte((self.__value >> 8) & 0xFF),
+            Byte.of(self.__value & 0xFF),
+            Byte.of((self.__value >> 8) & 0xFF),
         )
 
     @classmethod
     def from_bytes(cls, low: Byte, high: Byte) -> "Word":
-        return cls((high.unsigned_value << 8) | low.unsigned_value)
+        return cls.of((high.unsigned_value << 8) | low.unsigned_value)
 
     @property
     def value(self) -> int:
@@ -37,3 +37,13 @@ def test_to_bytes() -> None:
 
 def test_from_bytes() -> None:
     assert Word.from_bytes(Byte(0x34), Byte(0x12)) == Word(0x1234)
+
+
+def test_of() -> None:
+    w = Word.of(0x11234)
+    assert w == Word(0x1234)
+    assert Word.of(0x1234) is w
+    assert Word.from_bytes(Byte(0x34), Byte(0x12)) is w
+    low, high = w.to_bytes()
+    assert low is Byte.of(0x34)
+    assert high is Byte.of(0x12)
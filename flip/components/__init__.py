@@ -2,12 +2,14 @@ from .bus import Bus as Bus
 from .component import Component as Component
 from .computer import Computer as Computer
 from .control import Control as Control
+from .control_state import ControlState as ControlState
 from .counter import Counter as Counter
 from .memory import Memory as Memory
 from .minimal_computer import MinimalComputer as MinimalComputer
 from .program_counter import ProgramCounter as ProgramCounter
 from .register import Register as Register
 from .result_analyzer import ResultAnalyzer as ResultAnalyzer
+from .reverse_execution import ReverseExecution as ReverseExecution
 from .stack_pointer import StackPointer as StackPointer
 from .status import Status as Status
 from .word_register import WordRegister as WordRegister
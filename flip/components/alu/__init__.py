@@ -1 +1,2 @@
 from .alu import Alu as Alu
+from .operation_table import OperationTable as OperationTable
@@ -2,6 +2,8 @@ import math
 from typing import Optional, override
 
 from flip.bytes import Byte
+from flip.components import trace
+from flip.components.alu.operation_table import OperationTable
 from flip.components.alu.operations.operation import Operation
 from flip.components.alu.operations.operation_set import OperationSet
 from flip.components.bus import Bus
@@ -21,6 +23,11 @@ class Alu(Component):
     ) -> None:
         super().__init__(name=name, parent=parent)
         self.__operation_set = operation_set
+        self.__operations = tuple(operation_set.operations)
+        # Indexed by opcode - 1, like operations.
+        self.__tables = tuple(
+            OperationTable.for_operation(operation) for operation in self.__operations
+        )
         self.__num_control_bits = self._num_control_bits(self.__operation_set)
         self.__opcode_controls: list[Control] = [
             Control(name=self._opcode_control_name(i), parent=self)
@@ -196,21 +203,31 @@ class Alu(Component):
     def operation(self) -> Optional[Operation]:
         if (opcode := self.opcode) == 0:
             return None
-        return self.__operation_set.operations_by_index[opcode - 1]
+        return self.__operations[opcode - 1]
 
     @override
     def _tick_read(self) -> None:
         super()._tick_read()
         if self.rhs_one:
-            self.rhs = Byte(0x01)
+            self.rhs = Byte.of(0x01)
 
     @override
     def _tick_process(self) -> None:
         super()._tick_process()
-        if (operation := self.operation) is not None:
-            result = operation(self.lhs, self.rhs, self.carry_in)
-            self._log(
-                f"Executing {operation.name} on {self.lhs} and {self.rhs} = {result}"
-            )
+        if (opcode := self.opcode) != 0:
+            table = self.__tables[opcode - 1]
+            result = table(self.lhs, self.rhs, self.carry_in)
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.AluOperation(
+                        path=self.path,
+                        operation=table.operation.name,
+                        lhs=self.lhs.unsigned_value,
+                        rhs=self.rhs.unsigned_value,
+                        carry_in=self.carry_in,
+                        value=result.value.unsigned_value,
+                        carry_out=result.carry,
+                    )
+                )
             self.result = result
             self.carry_in = result.carry
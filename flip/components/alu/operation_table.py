@@ -0,0 +1,102 @@
+from array import array
+from typing import ClassVar, Optional
+
+from flip.bytes import Byte
+from flip.components.alu.operations.operation import Operation
+
+
+class OperationTable:
+    """Precomputed results of an Operation for every input.
+
+    Entries are computed lazily, the first time each (lhs, rhs, carry_in) is
+    seen, and stored packed as the result value plus flag bits in a compact
+    16-bit array. Results are returned from a pool of shared Byte.Result
+    instances, so a lookup doesn't allocate.
+
+    Operations are assumed to be pure functions of their inputs and attributes,
+    so tables are shared by operations with the same type and attributes.
+    """
+
+    __slots__ = ("__operation", "__entries")
+
+    CARRY = 1 << 8
+    ZERO = 1 << 9
+    NEGATIVE = 1 << 10
+    OVERFLOW = 1 << 11
+    HALF_CARRY = 1 << 12
+
+    # Packed entries fit in 13 bits, so this never collides with one.
+    EMPTY = 0xFFFF
+    _SIZE = 2 * 0x100 * 0x100
+
+    _tables: ClassVar[dict[tuple[object, ...], "OperationTable"]] = {}
+    _results: ClassVar[list[Optional[Byte.Result]]] = [None] * 0x2000
+
+    def __init__(self, operation: Operation) -> None:
+        self.__operation = operation
+        self.__entries = array("H", [self.EMPTY]) * self._SIZE
+
+    @classmethod
+    def for_operation(cls, operation: Operation) -> "OperationTable":
+        """Get the table shared by operations like operation."""
+        key = (type(operation), tuple(sorted(vars(operation).items())))
+        if (table := cls._tables.get(key)) is None:
+            table = cls._tables[key] = cls(operation)
+        return table
+
+    @property
+    def operation(self) -> Operation:
+        return self.__operation
+
+    @property
+    def entries(self) -> array[int]:
+        """The packed entries, with EMPTY for ones that haven't been computed."""
+        return self.__entries
+
+    @classmethod
+    def pack(cls, result: Byte.Result) -> int:
+        return (
+            result.value.unsigned_value
+            | (cls.CARRY if result.carry else 0)
+            | (cls.ZERO if result.zero else 0)
+            | (cls.NEGATIVE if result.negative else 0)
+            | (cls.OVERFLOW if result.overflow else 0)
+            | (cls.HALF_CARRY if result.half_carry else 0)
+        )
+
+    @classmethod
+    def unpack(cls, entry: int) -> Byte.Result:
+        """Get the shared Byte.Result for a packed entry."""
+        if (result := cls._results[entry]) is None:
+            result = cls._results[entry] = Byte.Result(
+                value=Byte.of(entry & 0xFF),
+                carry=bool(entry & cls.CARRY),
+                zero=bool(entry & cls.ZERO),
+                negative=bool(entry & cls.NEGATIVE),
+                overflow=bool(entry & cls.OVERFLOW),
+                half_carry=bool(entry & cls.HALF_CARRY),
+            )
+        return result
+
+    def entry(self, lhs: int, rhs: int, carry_in: bool) -> int:
+        """Get the packed result for unsigned operands."""
+        index = (0x10000 if carry_in else 0) | (lhs << 8) | rhs
+        if (entry := self.__entries[index]) == self.EMPTY:
+            entry = self.__entries[index] = self.pack(
+                self.__operation(Byte.of(lhs), Byte.of(rhs), carry_in)
+            )
+        return entry
+
+    def __call__(self, lhs: Byte, rhs: Byte, carry_in: bool) -> Byte.Result:
+        return self.unpack(self.entry(lhs.unsigned_value, rhs.unsigned_value, carry_in))
+
+    def build(self) -> None:
+        """Compute every entry that hasn't been computed yet."""
+        for carry_in in (False, True):
+            for lhs in range(0x100):
+                for rhs in range(0x100):
+                    self.entry(lhs, rhs, carry_in)
+
+    def __len__(self) -> int:
+        """The number of entries that have been computed."""
+        return self._SIZE - self.__entries.count(self.EMPTY)
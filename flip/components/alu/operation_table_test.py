@@ -0,0 +1,84 @@
+from typing import override
+
+from pytest_subtests import SubTests
+
+from flip.bytes import Byte
+from flip.components.alu import OperationTable
+from flip.components.alu.operations import (
+    Adc,
+    And,
+    Operation,
+    Or,
+    Rol,
+    Ror,
+    Sbc,
+    Shl,
+    Shr,
+    Xor,
+)
+
+
+def test_matches_operation(subtests: SubTests) -> None:
+    values = [0x00, 0x01, 0x0F, 0x10, 0x7F, 0x80, 0x81, 0xF0, 0xFF]
+    for operation in list[Operation](
+        [Adc(), And(), Or(), Rol(), Ror(), Sbc(), Shl(), Shr(), Xor()]
+    ):
+        table = OperationTable(operation)
+        for lhs in values:
+            for rhs in values:
+                for carry_in in (False, True):
+                    with subtests.test(
+                        operation=operation.name,
+                        lhs=lhs,
+                        rhs=rhs,
+                        carry_in=carry_in,
+                    ):
+                        assert table(Byte.of(lhs), Byte.of(rhs), carry_in) == operation(
+                            Byte.of(lhs), Byte.of(rhs), carry_in
+                        )
+
+
+def test_build() -> None:
+    table = OperationTable(Adc())
+    assert len(table) == 0
+    table(Byte.of(0x01), Byte.of(0x02), False)
+    assert len(table) == 1
+    table.build()
+    assert len(table) == 2 * 0x100 * 0x100
+    for carry_in in (False, True):
+        for lhs in range(0x100):
+            for rhs in range(0x100):
+                result = Byte.of(lhs).add(Byte.of(rhs), carry_in)
+                assert table.unpack(table.entry(lhs, rhs, carry_in)) == result
+
+
+def test_shared_results() -> None:
+    table = OperationTable(Adc())
+    result = table(Byte.of(0x01), Byte.of(0x02), False)
+    assert result == Byte.Result(value=Byte.of(0x03))
+    assert table(Byte.of(0x02), Byte.of(0x01), False) is result
+    assert OperationTable(Or())(Byte.of(0x01), Byte.of(0x02), False) is result
+
+
+def test_for_operation() -> None:
+    table = OperationTable.for_operation(Adc())
+    assert OperationTable.for_operation(Adc()) is table
+    assert OperationTable.for_operation(Sbc()) is not table
+    assert isinstance(table.operation, Adc)
+
+
+def test_for_operation_with_attributes() -> None:
+    class AddConstant(Operation):
+        def __init__(self, constant: int) -> None:
+            self.constant = constant
+
+        @override
+        def __call__(self, lhs: Byte, rhs: Byte, carry_in: bool) -> Byte.Result:
+            return lhs.add(Byte.of(self.constant), carry_in)
+
+    one = OperationTable.for_operation(AddConstant(1))
+    two = OperationTable.for_operation(AddConstant(2))
+    assert OperationTable.for_operation(AddConstant(1)) is one
+    assert two is not one
+    assert one(Byte.of(1), Byte.of(0), False).value == Byte.of(2)
+    assert two(Byte.of(1), Byte.of(0), False).value == Byte.of(3)
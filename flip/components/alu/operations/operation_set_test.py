@@ -108,6 +108,11 @@ def test_duplicate_operation_name() -> None:
         OperationSet.create({_Operation("a", 0), _Operation("a", 2)})
 
 
+def test_duplicate_operation_instances() -> None:
+    with pytest.raises(OperationSet.DuplicateOperationName):
+        OperationSet.create([Adc(), Adc()])
+
+
 def test_get_operation_name() -> None:
     assert operation_set.operation("adc") == adc
 
@@ -0,0 +1,501 @@
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional
+
+from flip.bytes import Byte, Word
+from flip.components.alu.operation_table import OperationTable
+from flip.components.minimal_computer import MinimalComputer
+from flip.components.register import Register
+from flip.core import Error, Errorable
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+else:
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover
+        np = None
+
+type Array = npt.NDArray[Any]
+
+
+class BatchSimulator(Errorable):
+    """Lockstep microcode simulation of many MinimalComputers with NumPy.
+
+    The state of every machine is held in arrays indexed by machine: one uint8
+    array per register path, one bool array per status path and per control
+    that keeps its value between ticks, and an N x 0x10000 memory. Each tick
+    looks up every running machine's control word in an array copy of the ROM
+    and applies each asserted control to the machines that assert it, phase by
+    phase, the same way the component tree does. ALU results come from the
+    shared OperationTables.
+
+    Machines stop when they halt. A machine that does something the microcode
+    engine would raise on, like decoding an unknown opcode, is marked as
+    faulted and stops too, without stopping the rest of the batch.
+
+    NumPy is an optional dependency, only needed to construct one of these.
+    """
+
+    class Error(Error): ...
+
+    # Controls with semantics besides a register's read, write and reset.
+    _CONTROLS = frozenset(
+        {
+            "memory.read",
+            "memory.write",
+            "program_counter.increment",
+            "program_counter.reset",
+            "stack_pointer.increment",
+            "stack_pointer.decrement",
+            # Asserted by the controller every tick.
+            "controller.step_counter.increment",
+            "controller.status.latch",
+            "controller.status.disable_latch",
+            "alu.rhs_one",
+            "alu.carry_in",
+            "alu.carry_in.clear",
+            "halt",
+            "halt.clear",
+        }
+    )
+
+    def __init__(
+        self,
+        size: int,
+        computer: Optional[MinimalComputer] = None,
+    ) -> None:
+        """Create size machines, each in the state of computer.
+
+        computer defaults to a new MinimalComputer. It's only read from, so it
+        can be used as a template with a program loaded.
+        """
+        if np is None:  # pragma: no cover
+            raise self._error("BatchSimulator requires numpy.", self.Error)
+        if size < 1:
+            raise self._error(f"Invalid size {size}.", self.Error)
+        if computer is None:
+            computer = MinimalComputer()
+        self.__size = size
+        controller = computer.controller
+        instruction_memory = controller.instruction_memory
+        format = instruction_memory.format
+        self.__status_format = controller.status.format
+        self.__register_paths = tuple(
+            sorted(
+                component.path
+                for component in computer.walk()
+                if isinstance(component, Register)
+            )
+        )
+        self.__status_paths = tuple(sorted(computer.statuses_by_path))
+        self.__control_paths = tuple(
+            sorted(
+                path
+                for path, control in computer.controls_by_path.items()
+                if not control.auto_clear
+            )
+        )
+        self.__bits: Mapping[str, int] = dict(format.controls)
+        supported = self._CONTROLS | {
+            f"{path}.{control}"
+            for path in self.__register_paths
+            for control in ("read", "write", "reset")
+        }
+        alu_opcode_paths = sorted(
+            path for path in self.__bits if path.startswith("alu.opcode_")
+        )
+        for path in self.__bits:
+            if path not in supported and path not in alu_opcode_paths:
+                raise self._error(f"Unsupported control {path}.", self.Error)
+        self.__num_alu_opcode_bits = len(alu_opcode_paths)
+        self.__operation_tables = tuple(
+            OperationTable.for_operation(operation)
+            for operation in computer.alu.operation_set.operations
+        )
+
+        # The controller's tables for turning the instruction buffer, status
+        # register and step counter into a slot in the ROM.
+        self.__instruction_memory = instruction_memory
+        self.__num_steps = 1 << format.step_index_size
+        status_bits = [
+            format.statuses.encode_address(self.__status_format.decode(Byte.of(status)))
+            for status in range(0x100)
+        ]
+        status_slots: dict[int, list[int]] = {}
+        for opcode in map(Byte.of, range(0x100)):
+            mask = instruction_memory.status_mask(opcode)
+            if mask not in status_slots:
+                status_slots[mask] = [
+                    instruction_memory.status_slot(opcode, bits) for bits in status_bits
+                ]
+        self.__opcode_slots = np.array(
+            [
+                instruction_memory.opcode_slot(Byte.of(opcode))
+                for opcode in range(0x100)
+            ],
+            dtype=np.int64,
+        )
+        self.__status_slots = np.array(
+            [
+                status_slots[instruction_memory.status_mask(Byte.of(opcode))]
+                for opcode in range(0x100)
+            ],
+            dtype=np.int64,
+        )
+        self.__rom = np.array(instruction_memory.rom, dtype=np.int64)
+        self.__words = np.array(instruction_memory.words, dtype=np.uint64)
+        writers = self.__mask(
+            [f"{path}.write" for path in self.__register_paths] + ["memory.write"]
+        )
+        readers = self.__mask(
+            [f"{path}.read" for path in self.__register_paths] + ["memory.read"]
+        )
+        # Writing to the bus twice or reading an open bus raises.
+        self.__valid = np.array(
+            [
+                (word & writers).bit_count() == 1 or not word & (writers | readers)
+                for word in instruction_memory.words
+            ],
+            dtype=np.bool_,
+        )
+
+        self.__registers = {
+            path: np.zeros(size, dtype=np.uint8) for path in self.__register_paths
+        }
+        self.__statuses = {
+            path: np.zeros(size, dtype=np.bool_) for path in self.__status_paths
+        }
+        self.__controls = {
+            path: np.zeros(size, dtype=np.bool_) for path in self.__control_paths
+        }
+        self.__memory = np.zeros((size, 0x10000), dtype=np.uint8)
+        self.__written = np.zeros((size, 0x10000), dtype=np.bool_)
+        self.__cycles = np.zeros(size, dtype=np.int64)
+        self.__faulted = np.zeros(size, dtype=np.bool_)
+        self.capture(computer)
+
+    def __mask(self, paths: list[str]) -> int:
+        mask = 0
+        for path in paths:
+            if (index := self.__bits.get(path)) is not None:
+                mask |= 1 << index
+        return mask
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def register_paths(self) -> tuple[str, ...]:
+        return self.__register_paths
+
+    @property
+    def status_paths(self) -> tuple[str, ...]:
+        return self.__status_paths
+
+    @property
+    def control_paths(self) -> tuple[str, ...]:
+        """Paths of the controls that keep their values between ticks."""
+        return self.__control_paths
+
+    def register(self, path: str) -> Array:
+        """The uint8 values of the register at path, by machine."""
+        try:
+            return self.__registers[path]
+        except KeyError as e:
+            raise self._error(f"Unknown register {path}.", self.Error) from e
+
+    def status(self, path: str) -> Array:
+        """The bool values of the status at path, by machine."""
+        try:
+            return self.__statuses[path]
+        except KeyError as e:
+            raise self._error(f"Unknown status {path}.", self.Error) from e
+
+    def control(self, path: str) -> Array:
+        """The bool values of the persistent control at path, by machine."""
+        try:
+            return self.__controls[path]
+        except KeyError as e:
+            raise self._error(f"Unknown control {path}.", self.Error) from e
+
+    @property
+    def memory(self) -> Array:
+        """The uint8 memory of every machine, indexed by (machine, address).
+
+        Writing to this directly doesn't mark addresses as written, so they
+        won't show up as keys in snapshots unless they're written later.
+        """
+        return self.__memory
+
+    @property
+    def written(self) -> Array:
+        """Which addresses of each machine's memory are keys of its Memory."""
+        return self.__written
+
+    @property
+    def cycles(self) -> Array:
+        return self.__cycles
+
+    @property
+    def halted(self) -> Array:
+        return self.__controls["halt"]
+
+    @property
+    def faulted(self) -> Array:
+        """Machines stopped where the microcode engine would have raised."""
+        return self.__faulted
+
+    @property
+    def running(self) -> Array:
+        return ~(self.halted | self.__faulted)
+
+    def capture(
+        self, computer: MinimalComputer, index: Optional[int | slice] = None
+    ) -> None:
+        """Copy computer's state into the machines at index, or every machine."""
+        if index is None:
+            index = slice(None)
+        registers_by_path = {
+            component.path: component
+            for component in computer.walk()
+            if isinstance(component, Register)
+        }
+        for path, values in self.__registers.items():
+            values[index] = registers_by_path[path].value.unsigned_value
+        for path, values in self.__statuses.items():
+            values[index] = computer.statuses_by_path[path].value
+        for path, values in self.__controls.items():
+            values[index] = computer.controls_by_path[path].value
+        memory = np.zeros(0x10000, dtype=np.uint8)
+        written = np.zeros(0x10000, dtype=np.bool_)
+        for address, value in computer.memory.items():
+            memory[address.value] = value.unsigned_value
+            written[address.value] = True
+        self.__memory[index] = memory
+        self.__written[index] = written
+        self.__cycles[index] = computer.cycles
+        self.__faulted[index] = False
+
+    def store(self, index: int, computer: MinimalComputer) -> None:
+        """Copy the state of the machine at index into computer."""
+        for component in computer.walk():
+            if isinstance(component, Register):
+                component.value = Byte.of(int(self.__registers[component.path][index]))
+        for path, values in self.__statuses.items():
+            computer.statuses_by_path[path].value = bool(values[index])
+        for path, values in self.__controls.items():
+            computer.controls_by_path[path].value = bool(values[index])
+        computer.memory.clear()
+        addresses = np.flatnonzero(self.__written[index])
+        values = self.__memory[index, addresses]
+        computer.memory.load(
+            {
+                Word.of(int(address)): Byte.of(int(value))
+                for address, value in zip(addresses, values, strict=True)
+            }
+        )
+        computer.cycles = int(self.__cycles[index])
+
+    def snapshot(self, index: int, **kwargs: Any) -> MinimalComputer:
+        """A new MinimalComputer in the state of the machine at index.
+
+        kwargs are passed on to MinimalComputer.
+        """
+        computer = MinimalComputer(**kwargs)
+        self.store(index, computer)
+        return computer
+
+    def run(self, max_ticks: Optional[int] = None) -> int:
+        """Tick until every machine stops and return the number of ticks."""
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            if not self.tick():
+                break
+            ticks += 1
+        return ticks
+
+    def tick(self) -> bool:
+        """Advance every running machine by one microcode step.
+
+        Returns False without ticking if no machines are running.
+        """
+        running = np.flatnonzero(self.running)
+        if not len(running):
+            return False
+        registers = {path: values[running] for path, values in self.__registers.items()}
+        statuses = {path: values[running] for path, values in self.__statuses.items()}
+        controls = {path: values[running] for path, values in self.__controls.items()}
+        memory_address = registers["memory.address.low"].astype(np.int64) | (
+            registers["memory.address.high"].astype(np.int64) << 8
+        )
+
+        # control
+        word_index = self.__word_index(
+            registers["controller.instruction_buffer"],
+            registers["controller.status"],
+            registers["controller.step_counter"],
+        )
+        valid = word_index >= 0
+        valid[valid] = self.__valid[word_index[valid]]
+        if not valid.all():
+            self.__faulted[running[~valid]] = True
+            running = running[valid]
+            word_index = word_index[valid]
+            memory_address = memory_address[valid]
+            registers = {path: values[valid] for path, values in registers.items()}
+            statuses = {path: values[valid] for path, values in statuses.items()}
+            controls = {path: values[valid] for path, values in controls.items()}
+            if not len(running):
+                return True
+        words = self.__words[word_index]
+        # Controls that no machine asserts this tick can be skipped entirely.
+        asserted_bits = int(np.bitwise_or.reduce(words))
+
+        def asserted(path: str) -> Optional[Array]:
+            if (index := self.__bits.get(path)) is None or not (
+                asserted_bits >> index & 1
+            ):
+                return None
+            return (words >> np.uint64(index) & np.uint64(1)).astype(np.bool_)
+
+        for path, values in controls.items():
+            if (mask := asserted(path)) is not None:
+                values |= mask
+        self.__cycles[running] += 1
+
+        # write
+        bus = np.zeros(len(running), dtype=np.uint8)
+        for path, values in registers.items():
+            if (mask := asserted(f"{path}.write")) is not None:
+                bus[mask] = values[mask]
+        if (mask := asserted("memory.write")) is not None:
+            bus[mask] = self.__memory[running[mask], memory_address[mask]]
+
+        # read
+        if (mask := asserted("memory.read")) is not None:
+            self.__memory[running[mask], memory_address[mask]] = bus[mask]
+            self.__written[running[mask], memory_address[mask]] = True
+        if (mask := asserted("alu.rhs_one")) is not None:
+            registers["alu.rhs"][mask] = 1
+        for path, values in registers.items():
+            if (mask := asserted(f"{path}.read")) is not None:
+                values[mask] = bus[mask]
+
+        # process
+        self.__tick_alu(registers, statuses, controls, asserted)
+        if (mask := asserted("alu.carry_in.clear")) is not None:
+            controls["alu.carry_in"][mask] = False
+        if (mask := asserted("halt.clear")) is not None:
+            controls["halt"][mask] = False
+        if (mask := asserted("program_counter.increment")) is not None:
+            low = registers["program_counter.low"]
+            high = registers["program_counter.high"]
+            # Carry into the high byte when the low byte wraps.
+            high[mask & (low == 0xFF)] += 1
+            low[mask] += 1
+        # Resetting takes precedence over incrementing.
+        if (mask := asserted("program_counter.reset")) is not None:
+            registers["program_counter.low"][mask] = 0
+            registers["program_counter.high"][mask] = 0
+        stack_pointer = registers["stack_pointer.low"]
+        if (mask := asserted("stack_pointer.increment")) is not None:
+            stack_pointer[mask] += 1
+        if (mask := asserted("stack_pointer.decrement")) is not None:
+            stack_pointer[mask] -= 1
+        step_counter = registers["controller.step_counter"]
+        if (mask := asserted("controller.step_counter.reset")) is not None:
+            step_counter[~mask] += 1
+        else:
+            step_counter += 1
+        for path, values in registers.items():
+            if (mask := asserted(f"{path}.reset")) is not None:
+                values[mask] = 0
+        result = registers["result_analyzer"]
+        statuses["result_analyzer.zero"] = result == 0
+        statuses["result_analyzer.negative"] = result & 0x80 != 0
+
+        # clear
+        if (latch := asserted("controller.status.latch")) is not None:
+            if (
+                disable_latch := asserted("controller.status.disable_latch")
+            ) is not None:
+                latch &= ~disable_latch
+            status = np.zeros(len(running), dtype=np.uint8)
+            for path, index in self.__status_format.items():
+                status |= statuses[path].astype(np.uint8) << index
+            registers["controller.status"][latch] = status[latch]
+        for path in ("controller.status.latch", "controller.status.disable_latch"):
+            if path in controls:
+                controls[path][:] = False
+
+        for path, values in registers.items():
+            self.__registers[path][running] = values
+        for path, values in statuses.items():
+            self.__statuses[path][running] = values
+        for path, values in controls.items():
+            self.__controls[path][running] = values
+        return True
+
+    def __word_index(self, opcode: Array, status: Array, step_index: Array) -> Array:
+        """The index in the ROM's words of each machine's word, or -1."""
+        step_index = step_index.astype(np.int64)
+        in_range = step_index < self.__num_steps
+        slots = (
+            self.__opcode_slots[opcode]
+            + self.__status_slots[opcode, status]
+            + np.where(in_range, step_index, 0)
+        )
+        word_index = np.where(in_range, self.__rom[slots], 0) - 1
+        # Step indices aren't masked when they're encoded, so ones past the
+        # opcode's steps spill into the status bits, like they do in the
+        # controller.
+        for i in np.flatnonzero(~in_range).tolist():
+            try:
+                word_index[i] = self.__instruction_memory.word_index(
+                    Byte.of(int(opcode[i])),
+                    self.__status_format.decode(Byte.of(int(status[i]))),
+                    Byte.of(int(step_index[i])),
+                )
+            except self.__instruction_memory.KeyError:
+                pass
+        return word_index
+
+    def __tick_alu(
+        self,
+        registers: dict[str, Array],
+        statuses: dict[str, Array],
+        controls: dict[str, Array],
+        asserted: Callable[[str], Optional[Array]],
+    ) -> None:
+        opcode: Optional[Array] = None
+        for i in range(self.__num_alu_opcode_bits):
+            if (mask := asserted(f"alu.opcode_{i}")) is not None:
+                if opcode is None:
+                    opcode = np.zeros(len(mask), dtype=np.int64)
+                opcode |= mask.astype(np.int64) << i
+        if opcode is None:
+            return
+        lhs = registers["alu.lhs"].astype(np.int64)
+        rhs = registers["alu.rhs"].astype(np.int64)
+        carry_in = controls["alu.carry_in"]
+        for operation in np.unique(opcode[opcode != 0]).tolist():
+            table = self.__operation_tables[int(operation) - 1]
+            entries = np.frombuffer(table.entries, dtype=np.uint16)
+            mask = opcode == operation
+            index = carry_in[mask].astype(np.int64) << 16 | lhs[mask] << 8 | rhs[mask]
+            if (missing := entries[index] == OperationTable.EMPTY).any():
+                for entry in np.unique(index[missing]).tolist():
+                    table.entry(entry >> 8 & 0xFF, entry & 0xFF, bool(entry >> 16))
+            packed = entries[index]
+            registers["alu.output"][mask] = packed & 0xFF
+            carry = packed & OperationTable.CARRY != 0
+            statuses["alu.carry_out"][mask] = carry
+            statuses["alu.zero"][mask] = packed & OperationTable.ZERO != 0
+            statuses["alu.negative"][mask] = packed & OperationTable.NEGATIVE != 0
+            statuses["alu.overflow"][mask] = packed & OperationTable.OVERFLOW != 0
+            statuses["alu.half_carry"][mask] = packed & OperationTable.HALF_CARRY != 0
+            carry_in[mask] = carry
@@ -0,0 +1,140 @@
+import pytest
+from pytest_subtests import SubTests
+
+from flip.bytes import Byte, Word
+from flip.components import MinimalComputer, Register
+from flip.components.controller.instruction_memory import InstructionMemory
+
+pytest.importorskip("numpy")
+
+from flip.components.batch_simulator import BatchSimulator
+
+
+def _loop(count: int = 0x10) -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(count)  # 0x0000, operand at 0x0001
+        .label("loop")
+        .adc(0x03)
+        .sta_zero_page(0xF0)
+        .jsr("sub")
+        .dex()
+        .bne("loop")
+        .hlt()
+        .label("sub")
+        .pha()
+        .ror()
+        .pla()
+        .rts()
+    )
+
+
+def _assert_matches(
+    simulator: BatchSimulator, index: int, computer: MinimalComputer
+) -> None:
+    snapshot = simulator.snapshot(index)
+    registers = {
+        component.path: component
+        for component in snapshot.walk()
+        if isinstance(component, Register)
+    }
+    for component in computer.walk():
+        if isinstance(component, Register):
+            assert registers[component.path].value == component.value, component.path
+    for path, status in computer.statuses_by_path.items():
+        assert snapshot.statuses_by_path[path].value == status.value, path
+    assert snapshot.alu.carry_in == computer.alu.carry_in
+    assert snapshot.halt == computer.halt
+    assert dict(snapshot.memory) == dict(computer.memory)
+    assert snapshot.cycles == computer.cycles
+
+
+def test_matches_microcode(subtests: SubTests) -> None:
+    counts = [0x01, 0x02, 0x07, 0x10]
+    simulator = BatchSimulator(len(counts), MinimalComputer(data=_loop()))
+    for i, count in enumerate(counts):
+        simulator.memory[i, 0x0001] = count
+    simulator.run()
+    assert simulator.halted.all()
+    for i, count in enumerate(counts):
+        with subtests.test(count=count):
+            computer = MinimalComputer()
+            computer.run(_loop(count))
+            _assert_matches(simulator, i, computer)
+
+
+def test_mid_instruction(subtests: SubTests) -> None:
+    for ticks in (1, 5, 23, 100):
+        with subtests.test(ticks=ticks):
+            simulator = BatchSimulator(2, MinimalComputer(data=_loop()))
+            assert simulator.run(ticks) == ticks
+            computer = MinimalComputer(data=_loop())
+            for _ in range(ticks):
+                computer.tick()
+            _assert_matches(simulator, 1, computer)
+
+
+def test_halt_mask() -> None:
+    simulator = BatchSimulator(3, MinimalComputer(data=_loop()))
+    simulator.memory[0, 0x0001] = 0x01
+    simulator.memory[1, 0x0001] = 0x04
+    simulator.halted[2] = True
+    ticks = simulator.run()
+    assert simulator.halted.all()
+    assert simulator.cycles[1] == ticks
+    assert 0 < simulator.cycles[0] < simulator.cycles[1]
+    assert simulator.cycles[2] == 0
+    assert not simulator.tick()
+
+
+def test_fault() -> None:
+    template = MinimalComputer(
+        data={Word(0x0000): Byte(0x00), Word(0x0001): Byte(0xFF)}
+    )
+    simulator = BatchSimulator(2, template)
+    simulator.capture(MinimalComputer(data=_loop(0x01)), 1)
+    simulator.run()
+    assert simulator.faulted.tolist() == [True, False]
+    assert simulator.halted.tolist() == [False, True]
+    # The nop ran and the unknown opcode was fetched.
+    computer = MinimalComputer(data=template.memory)
+    with pytest.raises(InstructionMemory.KeyError):
+        computer.tick_until_halt()
+    assert simulator.register("controller.instruction_buffer")[0] == 0xFF
+    # The microcode counts the tick it raises in.
+    assert simulator.cycles[0] == computer.cycles - 1
+
+
+def test_step_past_opcode() -> None:
+    computer = MinimalComputer(data=MinimalComputer.program_builder().lda(1).hlt())
+    computer.controller.step_counter.value = Byte(0xFF)
+    simulator = BatchSimulator(1, computer)
+    simulator.tick()
+    assert simulator.faulted[0]
+    with pytest.raises(InstructionMemory.KeyError):
+        computer.tick()
+
+
+def test_capture_and_store() -> None:
+    computer = MinimalComputer()
+    computer.run(_loop(0x03))
+    simulator = BatchSimulator(1)
+    assert not simulator.register("a")[0]
+    simulator.capture(computer, 0)
+    _assert_matches(simulator, 0, computer)
+    other = MinimalComputer(data={Word(0x1234): Byte(0x56)})
+    simulator.store(0, other)
+    assert Word(0x1234) not in other.memory
+    _assert_matches(simulator, 0, other)
+
+
+def test_errors() -> None:
+    with pytest.raises(BatchSimulator.Error):
+        BatchSimulator(0)
+    simulator = BatchSimulator(1)
+    with pytest.raises(BatchSimulator.Error):
+        simulator.register("z")
+    with pytest.raises(BatchSimulator.Error):
+        simulator.status("z")
+    with pytest.raises(BatchSimulator.Error):
+        simulator.control("z")
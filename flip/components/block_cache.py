@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping, Optional
+
+from flip.components.instruction_engine import InstructionEngine
+from flip.core import Error, Errorable
+
+
+class BlockCache(Errorable):
+    """Translation cache of basic blocks for an InstructionEngine.
+
+    A block is a straight-line run of instructions starting at some program
+    counter and ending at the first instruction whose successor isn't known
+    statically: a branch, jmp, jsr, rts or hlt. Each block is decoded once into
+    a single closure that runs all of its instructions and returns the next
+    program counter, so hot loops skip re-decoding the same instructions.
+    Immediate and direct operands are baked into the handlers, and cycles are
+    summed ahead of time for everything but the final instruction.
+
+    Writes to any byte a block was decoded from invalidate the block, whether
+    they come from the engine itself (stores and pushes) or through
+    invalidate(), which a computer's memory write listener can call, so
+    self-modifying code stays correct.
+    """
+
+    class Error(Error): ...
+
+    # Runs a block and returns (next program counter, cycles).
+    type Function = Callable[[InstructionEngine.State], tuple[int, int]]
+
+    @dataclass(frozen=True, kw_only=True)
+    class Block:
+        start: int
+        # Addresses of every byte the block was decoded from.
+        addresses: frozenset[int]
+        instructions: int
+        # Upper bound on the cycles the block takes, over all statuses.
+        max_cycles: int
+        run: "BlockCache.Function"
+
+    class _Memory(dict[int, int]):
+        """Engine memory that invalidates cached blocks when written to."""
+
+        def __init__(self, data: Mapping[int, int], cache: "BlockCache") -> None:
+            super().__init__(data)
+            self.cache = cache
+
+        def __setitem__(self, address: int, value: int) -> None:
+            super().__setitem__(address, value)
+            self.cache.invalidate(address)
+
+    def __init__(
+        self,
+        engine: InstructionEngine,
+        max_block_instructions: int = 64,
+    ) -> None:
+        if max_block_instructions < 1:
+            raise self._error(
+                f"Invalid max_block_instructions {max_block_instructions}.",
+                self.Error,
+            )
+        self.__engine = engine
+        self.__max_block_instructions = max_block_instructions
+        self.__blocks: dict[int, BlockCache.Block] = {}
+        self.__blocks_by_address: dict[int, set[int]] = {}
+        self.__interrupted = False
+        self.__hits = 0
+        self.__misses = 0
+        self.__invalidations = 0
+
+    @property
+    def engine(self) -> InstructionEngine:
+        return self.__engine
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def invalidations(self) -> int:
+        return self.__invalidations
+
+    def __len__(self) -> int:
+        return len(self.__blocks)
+
+    def __contains__(self, start: int) -> bool:
+        return start in self.__blocks
+
+    def blocks(self) -> Iterable[Block]:
+        return self.__blocks.values()
+
+    def clear(self) -> None:
+        self.__blocks.clear()
+        self.__blocks_by_address.clear()
+        self.__interrupted = True
+
+    def invalidate(self, address: int) -> None:
+        """Drop every cached block decoded from the byte at address."""
+        starts = self.__blocks_by_address.pop(address, None)
+        if not starts:
+            return
+        for start in starts:
+            block = self.__blocks.pop(start)
+            self.__invalidations += 1
+            for block_address in block.addresses:
+                if (others := self.__blocks_by_address.get(block_address)) is not None:
+                    others.discard(start)
+                    if not others:
+                        del self.__blocks_by_address[block_address]
+        # The running block may have just been overwritten, so stop it after
+        # the current instruction.
+        self.__interrupted = True
+
+    def block(self, state: InstructionEngine.State) -> Block:
+        """Get the block starting at state's program counter, decoding on miss."""
+        if (block := self.__blocks.get(state.program_counter)) is not None:
+            self.__hits += 1
+            return block
+        self.__misses += 1
+        block = self._translate(state.program_counter, state.memory)
+        self.__blocks[block.start] = block
+        for address in block.addresses:
+            self.__blocks_by_address.setdefault(address, set()).add(block.start)
+        return block
+
+    def run(
+        self, state: InstructionEngine.State, max_cycles: Optional[int] = None
+    ) -> int:
+        """Execute blocks until halt and return the number of cycles.
+
+        This takes exactly as many cycles as InstructionEngine.run: near
+        max_cycles, blocks that might overshoot it are run one instruction at
+        a time.
+        """
+        if not (
+            isinstance(state.memory, BlockCache._Memory) and state.memory.cache is self
+        ):
+            state.memory = BlockCache._Memory(state.memory, self)
+        cycles = 0
+        block = self.block
+        step = self.__engine.step
+        while not state.halt:
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            current = block(state)
+            if max_cycles is not None and cycles + current.max_cycles > max_cycles:
+                cycles += step(state)
+                continue
+            _, block_cycles = current.run(state)
+            cycles += block_cycles
+        return cycles
+
+    def _translate(self, start: int, memory: Mapping[int, int]) -> Block:
+        engine = self.__engine
+        # (opcode, program counter to run the handler at, handler, cycles so far)
+        body: list[tuple[int, int, InstructionEngine.Handler, int]] = []
+        last: Optional[tuple[int, int, InstructionEngine.Handler, list[int]]] = None
+        addresses = set[int]()
+        cycles = 0
+        address = start
+        while len(body) < self.__max_block_instructions:
+            opcode = memory.get(address, 0)
+            if (handler := engine.handler(opcode)) is None:
+                if not body:
+                    raise self._error(
+                        f"Unknown opcode 0x{opcode:02X} at 0x{address:04X}.",
+                        InstructionEngine.DecodeError,
+                    )
+                # Leave the unknown opcode to be reported when it's reached.
+                break
+            size = engine.size(opcode)
+            operand_addresses = [(address + i) & 0xFFFF for i in range(1, size)]
+            addresses.add(address)
+            addresses.update(operand_addresses)
+            next_address = (address + size) & 0xFFFF
+            if engine.ends_block(opcode):
+                cycles_by_status = [engine.cycles(opcode, s) for s in range(256)]
+                last = (opcode, (address + 1) & 0xFFFF, handler, cycles_by_status)
+                break
+            cycles += engine.cycles(opcode, 0)
+            if (decoder := engine.decoder(opcode)) is not None:
+                operand = 0
+                for i, operand_address in enumerate(operand_addresses):
+                    operand |= memory.get(operand_address, 0) << (8 * i)
+                body.append((opcode, next_address, decoder(operand), cycles))
+            else:
+                body.append((opcode, (address + 1) & 0xFFFF, handler, cycles))
+            address = next_address
+        return self.Block(
+            start=start,
+            addresses=frozenset(addresses),
+            instructions=len(body) + (last is not None),
+            max_cycles=cycles + (max(last[3]) if last is not None else 0),
+            run=self._compile(tuple(body), last, cycles),
+        )
+
+    def _compile(
+        self,
+        body: tuple[tuple[int, int, InstructionEngine.Handler, int], ...],
+        last: Optional[tuple[int, int, InstructionEngine.Handler, list[int]]],
+        body_cycles: int,
+    ) -> Function:
+        def run(s: InstructionEngine.State) -> tuple[int, int]:
+            self.__interrupted = False
+            for opcode, program_counter, handler, cycles in body:
+                s.instruction = opcode
+                s.program_counter = program_counter
+                handler(s)
+                if self.__interrupted:
+                    return s.program_counter, cycles
+            if last is None:
+                return s.program_counter, body_cycles
+            opcode, program_counter, handler, cycles_by_status = last
+            cycles = body_cycles + cycles_by_status[s.status]
+            s.instruction = opcode
+            s.program_counter = program_counter
+            handler(s)
+            return s.program_counter, cycles
+
+        return run
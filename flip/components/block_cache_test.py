@@ -0,0 +1,155 @@
+import pytest
+
+from flip.bytes import Byte, Word
+from flip.components import MinimalComputer
+from flip.components.block_cache import BlockCache
+from flip.components.instruction_engine import InstructionEngine
+
+
+def _loop() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x20)
+        .label("loop")
+        .adc(0x03)
+        .sta_zero_page(0xF0)
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+
+
+def _self_modifying() -> MinimalComputer.ProgramBuilder:
+    # Each iteration loads the lda's own operand, adds 2 and stores it back.
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x03)  # 0x0000
+        .label("loop")
+        .lda(0x00)  # 0x0002, operand at 0x0003
+        .adc(0x02)  # 0x0004
+        .sta(0x0003)  # 0x0006
+        .dex()  # 0x0009
+        .bne("loop")  # 0x000A
+        .hlt()
+    )
+
+
+def _assert_matches_microcode(program: MinimalComputer.ProgramBuilder) -> None:
+    microcode = MinimalComputer()
+    microcode_cycles = microcode.run(program)
+    cached = MinimalComputer()
+    cached_cycles = cached.run(program, engine="instruction")
+    assert cached_cycles == microcode_cycles
+    assert cached.a.value == microcode.a.value
+    assert cached.x.value == microcode.x.value
+    assert cached.program_counter.value == microcode.program_counter.value
+    assert cached.controller.status.value == microcode.controller.status.value
+    assert dict(cached.memory) == dict(microcode.memory)
+
+
+def test_block() -> None:
+    computer = MinimalComputer()
+    computer.load(_loop())
+    cache = computer.block_cache
+    state = InstructionEngine.State.capture(computer)
+    block = cache.block(state)
+    assert block.start == 0x0000
+    # ldx, adc, sta, dex, bne
+    assert block.instructions == 5
+    assert block.addresses == frozenset(range(0x0000, 0x000A))
+    assert cache.misses == 1
+    assert cache.block(state) is block
+    assert cache.hits == 1
+    next_program_counter, cycles = block.run(state)
+    assert next_program_counter == state.program_counter == 0x0002
+    assert cycles == sum(
+        computer.instruction_engine.cycles(opcode, 0)
+        for opcode in (0x0F, 0x1C, 0x0C, 0x2D)
+    ) + computer.instruction_engine.cycles(0x33, 0)
+
+
+def test_run_matches_microcode() -> None:
+    _assert_matches_microcode(_loop())
+
+
+def test_hits() -> None:
+    computer = MinimalComputer()
+    computer.run(_loop(), engine="instruction")
+    # ldx..bne, adc..bne and hlt
+    assert computer.block_cache.misses == 3
+    assert len(computer.block_cache) == 3
+    # The first of 0x20 iterations runs ldx..bne and the second misses.
+    assert computer.block_cache.hits == 0x1E
+    assert computer.block_cache.invalidations == 0
+
+
+def test_self_modifying_code() -> None:
+    _assert_matches_microcode(_self_modifying())
+    computer = MinimalComputer()
+    computer.run(_self_modifying(), engine="instruction")
+    # dex leaves the carry set, so later iterations add 3.
+    assert computer.a.value == Byte(0x08)
+    assert computer.block_cache.invalidations == 3
+
+
+def test_memory_write_invalidates() -> None:
+    computer = MinimalComputer()
+    computer.run(
+        MinimalComputer.program_builder().lda(0x01).hlt(), engine="instruction"
+    )
+    assert 0x0000 in computer.block_cache
+    computer.memory[Word(0x0001)] = Byte(0x02)
+    assert 0x0000 not in computer.block_cache
+    assert computer.block_cache.invalidations == 1
+    # Writes outside of cached code don't invalidate anything.
+    computer.memory[Word(0x0100)] = Byte(0x02)
+    assert computer.block_cache.invalidations == 1
+
+
+def test_reload_invalidates() -> None:
+    computer = MinimalComputer()
+    computer.run(
+        MinimalComputer.program_builder().lda(0x01).hlt(), engine="instruction"
+    )
+    computer.halt = False
+    computer.program_counter.value = Word(0)
+    computer.run(
+        MinimalComputer.program_builder().lda(0x02).hlt(), engine="instruction"
+    )
+    assert computer.a.value == Byte(0x02)
+
+
+def test_max_cycles() -> None:
+    computer = MinimalComputer()
+    computer.load(_loop())
+    for max_cycles in (1, 7, 50, 123):
+        expected = InstructionEngine.State.capture(computer)
+        actual = InstructionEngine.State.capture(computer)
+        assert computer.block_cache.run(
+            actual, max_cycles
+        ) == computer.instruction_engine.run(expected, max_cycles)
+        assert not actual.diff(expected)
+
+
+def test_unknown_opcode() -> None:
+    computer = MinimalComputer(
+        data={Word(0x0000): Byte(0x00), Word(0x0001): Byte(0xFF)}
+    )
+    state = InstructionEngine.State.capture(computer)
+    # The nop is cached and the unknown opcode is reported once it's reached.
+    with pytest.raises(InstructionEngine.DecodeError):
+        computer.block_cache.run(state)
+    assert state.program_counter == 0x0001
+
+
+def test_max_block_instructions() -> None:
+    computer = MinimalComputer()
+    with pytest.raises(BlockCache.Error):
+        BlockCache(computer.instruction_engine, max_block_instructions=0)
+    computer.load(MinimalComputer.program_builder().nop().nop().nop().hlt())
+    cache = BlockCache(computer.instruction_engine, max_block_instructions=2)
+    state = InstructionEngine.State.capture(computer)
+    assert cache.run(state) == computer.instruction_engine.cycles(0x00, 0) * 3 + (
+        computer.instruction_engine.cycles(0x01, 0)
+    )
+    assert cache.misses == 2
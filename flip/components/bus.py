@@ -42,7 +42,10 @@ class Bus(component.Component):
         self.__value = value
         self.__setter = setter
 
-    @override
-    def _tick_clear(self) -> None:
+    def clear(self) -> None:
         self.__value = None
         self.__setter = None
+
+    @override
+    def _tick_clear(self) -> None:
+        self.clear()
@@ -1,7 +1,20 @@
 from collections.abc import Mapping
 from contextlib import contextmanager
-from typing import Iterable, Iterator, Optional, Type, final, override
-
+from typing import (
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Type,
+    cast,
+    final,
+    override,
+)
+
+from flip.components.control_state import ControlState
+from flip.components.tick_profiler import TickProfiler
+from flip.components.trace import Sink, Tracer
 from flip.core import Error, Validatable
 
 
@@ -20,7 +33,11 @@ class Component(Validatable):
         self.__name = name or self.__class__.__name__
         self.__parent: Optional[Component] = None
         self.__children: frozenset[Component] = frozenset()
-        self.__enable_logging: bool = False
+        # The tracer of a traced root. Sinks can only be attached to roots.
+        self.__tracer: Optional[Tracer] = None
+        # The root's tracer, handed out by the root before it ticks.
+        self._tracer: Optional[Tracer] = None
+        self.__profiler: Optional[TickProfiler] = None
 
         self.__path: Optional[str] = None
         self.__children_by_name: Optional[Mapping[str, Component]] = None
@@ -28,6 +45,8 @@ class Component(Validatable):
         self.__controls_by_path: Optional[Mapping[str, "control.Control"]] = None
         self.__statuses: Optional[frozenset["status.Status"]] = None
         self.__statuses_by_path: Optional[Mapping[str, "status.Status"]] = None
+        self.__tick_schedule: Optional[Component.TickSchedule] = None
+        self.__control_state: Optional[ControlState] = None
 
         with self._pause_validation():
             if parent is not None:
@@ -42,16 +61,23 @@ class Component(Validatable):
         if traversed is not None and self in traversed:
             return
         traversed_ = (traversed or frozenset()) | (frozenset({self}))
+        self.__clear_cache()
+        if self.parent is not None:
+            self.parent._invalidate_cache(traversed_)
+        for child in self.children:
+            child._invalidate_cache(traversed_)
+
+    def __clear_cache(self) -> None:
         self.__path = None
         self.__children_by_name = None
         self.__controls = None
         self.__controls_by_path = None
         self.__statuses = None
         self.__statuses_by_path = None
-        if self.parent is not None:
-            self.parent._invalidate_cache(traversed_)
-        for child in self.children:
-            child._invalidate_cache(traversed_)
+        self.__tick_schedule = None
+        self.__control_state = None
+        # Rebound by the root, which may have changed.
+        self._tracer = None
 
     @override
     def __eq__(self, other: object) -> bool:
@@ -139,6 +165,73 @@ class Component(Validatable):
     def remove_child(self, child: "Component") -> None:
         self.children -= {child}
 
+    def _copy_tree(self) -> "Component":
+        """Copy this subtree into a new, independent tree.
+
+        Every component is copied shallowly with _copy, and then references
+        between components of the subtree, including inside lists, tuples,
+        sets and dicts, are pointed at the copies. Anything outside the
+        subtree, like a controller's ROM, is shared.
+        """
+        # Bind the original's controls before copying their masks.
+        original = self.root.control_state
+        copies = {id(component): component._copy() for component in self.walk()}
+        for copy in copies.values():
+            copy.__remap(copies)
+        root = copies[id(self)]
+        root.__parent = None
+        root._invalidate_cache()
+        # Rebind the copied controls to a ControlState of their own, so they
+        # stop sharing bits with the originals. A whole tree keeps its layout.
+        if self.parent is None:
+            state = ControlState(
+                indices=original.indices,
+                auto_clear_mask=original.auto_clear_mask,
+                bits=original.bits,
+            )
+            for copy in copies.values():
+                if isinstance(copy, control.Control):
+                    copy.bind(state, copy.mask)
+            root.__control_state = state
+        else:
+            root.__control_state = root.__bind_controls()
+        return root
+
+    def _copy(self) -> "Component":
+        """A shallow copy of this component, for _copy_tree.
+
+        Components with mutable state that isn't a reference to another
+        component override this to copy it.
+        """
+        copy = object.__new__(type(self))
+        vars(copy).update(vars(self))
+        # Drop caches up front rather than remapping them.
+        copy.__clear_cache()
+        # Sinks and profiles stay with the original tree.
+        copy.__tracer = None
+        copy.__profiler = None
+        return copy
+
+    def __remap(self, copies: Mapping[int, "Component"]) -> None:
+        attributes: dict[str, object] = vars(self)
+        for name, value in attributes.items():
+            if (copy := copies.get(id(value))) is not None:
+                attributes[name] = copy
+            elif type(value) in (list, tuple, frozenset):
+                items = cast(
+                    list[object] | tuple[object, ...] | frozenset[object], value
+                )
+                if any(id(item) in copies for item in items):
+                    attributes[name] = type(items)(
+                        copies.get(id(item), item) for item in items
+                    )
+            elif type(value) is dict:
+                values = cast(dict[object, object], value)
+                if any(id(item) in copies for item in values.values()):
+                    attributes[name] = {
+                        key: copies.get(id(item), item) for key, item in values.items()
+                    }
+
     @property
     def children_by_name(self) -> Mapping[str, "Component"]:
         if self.__children_by_name is None:
@@ -198,94 +291,222 @@ class Component(Validatable):
             self.__statuses_by_path = {status.path: status for status in self.statuses}
         return self.__statuses_by_path
 
+    @property
+    def control_state(self) -> ControlState:
+        """The bitmask holding the value of every control in this tree.
+
+        The root builds it lazily, binding every control in the tree to one
+        of its bits, and _invalidate_cache drops it whenever the tree changes.
+        Controls keep their values when they're rebound.
+        """
+        root = self.root
+        if root.__control_state is None:
+            root.__control_state = root.__bind_controls()
+        return root.__control_state
+
+    def _control_indices(self) -> Mapping[str, int]:
+        """Bit indices this component would like root controls to have.
+
+        Controllers use this to lay controls out the same way as their ROM
+        words. Paths are relative to the root.
+        """
+        return {}
+
+    def __bind_controls(self) -> ControlState:
+        controls = self.controls_by_path
+        indices = dict[str, int]()
+        next_index = 0
+        for component in self.walk():
+            for path, index in component._control_indices().items():
+                next_index = max(next_index, index + 1)
+                if path in controls and path not in indices:
+                    indices[path] = index
+        if len(set(indices.values())) != len(indices):
+            # Components disagree about the layout, so keep the first claim.
+            claimed = dict[int, str]()
+            for path, index in list(indices.items()):
+                if claimed.setdefault(index, path) != path:
+                    del indices[path]
+        for path in sorted(controls):
+            if path not in indices:
+                indices[path] = next_index
+                next_index += 1
+        state = ControlState(
+            indices=indices,
+            auto_clear_mask=sum(
+                1 << indices[path]
+                for path, control_ in controls.items()
+                if control_.auto_clear
+            ),
+        )
+        for path, control_ in controls.items():
+            control_.bind(state, 1 << indices[path])
+        return state
+
     @final
     def tick_control(self) -> None:
-        with self._log_context("tick_control"):
-            self._tick_control()
-            for child in self.children:
-                child.tick_control()
+        self._tick_control()
+        for child in self.children:
+            child.tick_control()
 
     def _tick_control(self) -> None: ...
 
     @final
     def tick_write(self) -> None:
-        with self._log_context("tick_write"):
-            self._tick_write()
-            for child in self.children:
-                child.tick_write()
+        self._tick_write()
+        for child in self.children:
+            child.tick_write()
 
     def _tick_write(self) -> None: ...
 
     @final
     def tick_read(self) -> None:
-        with self._log_context("tick_read"):
-            self._tick_read()
-            for child in self.children:
-                child.tick_read()
+        self._tick_read()
+        for child in self.children:
+            child.tick_read()
 
     def _tick_read(self) -> None: ...
 
     @final
     def tick_process(self) -> None:
-        with self._log_context("tick_process"):
-            self._tick_process()
-            for child in self.children:
-                child.tick_process()
+        self._tick_process()
+        for child in self.children:
+            child.tick_process()
 
     def _tick_process(self) -> None: ...
 
     @final
     def tick_clear(self) -> None:
-        with self._log_context("tick_clear"):
-            self._tick_clear()
-            for child in self.children:
-                child.tick_clear()
+        self._tick_clear()
+        for child in self.children:
+            child.tick_clear()
 
     def _tick_clear(self) -> None: ...
 
+    type TickSchedule = tuple[tuple[Callable[[], None], ...], ...]
+
+    _TICK_PHASES = (
+        "_tick_control",
+        "_tick_write",
+        "_tick_read",
+        "_tick_process",
+        "_tick_clear",
+    )
+
+    def _ticks(self, phase: str) -> bool:
+        """Whether this component's hook for phase needs to run every tick."""
+        return getattr(type(self), phase) is not getattr(Component, phase)
+
+    def walk(self) -> Iterator["Component"]:
+        """Iterate this component and all its descendants in tick order."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def _tick_schedule(self) -> TickSchedule:
+        """The flattened per-phase tick hooks of this subtree.
+
+        Each phase holds the bound _tick_* methods of every component in
+        the subtree whose _ticks says it needs that hook, in the same pre-order
+        that the recursive tick_* methods visit them. The schedule is built
+        lazily and dropped by _invalidate_cache whenever the tree changes.
+        """
+        if self.__tick_schedule is None:
+            components = list(self.walk())
+            self.__tick_schedule = tuple(
+                tuple(
+                    getattr(component, phase)
+                    for component in components
+                    if component._ticks(phase)
+                )
+                for phase in self._TICK_PHASES
+            )
+        return self.__tick_schedule
+
     def __tick(self) -> None:
-        with self._log_context("tick"):
-            self.tick_control()
-            self.tick_write()
-            self.tick_read()
-            self.tick_process()
-            self.tick_clear()
+        if (tracer := self.__tracer) is not None:
+            if self._tracer is None:
+                self.__bind_tracer()
+            tracer.cycle += 1
+        control_state = self.control_state
+        if (profiler := self.__profiler) is not None:
+            profiler.tick(self._tick_schedule, self._TICK_PHASES)
+        else:
+            for phase in self._tick_schedule:
+                for tick in phase:
+                    tick()
+        control_state.clear_auto()
 
     @final
     def tick(self) -> None:
         self.root.__tick()
 
-    __log_context = list[str]()
-
     @property
-    def enable_logging(self) -> bool:
-        return self.__enable_logging
+    def profiler(self) -> Optional[TickProfiler]:
+        """The tick profiler of this tree, if it's being profiled."""
+        return self.root.__profiler
 
-    @enable_logging.setter
-    def enable_logging(self, enable_logging: bool) -> None:
-        self.__enable_logging = enable_logging
-        if self.parent is not None:
-            self.parent.enable_logging = enable_logging
+    def enable_profiling(self) -> TickProfiler:
+        """Start counting and timing the tick hooks of this tree.
+
+        See TickProfiler. Returns the tree's profiler, which carries on from
+        where it was if profiling is already enabled.
+        """
+        root = self.root
+        if root.__profiler is None:
+            root.__profiler = TickProfiler(root.name)
+        return root.__profiler
+
+    def disable_profiling(self) -> None:
+        self.root.__profiler = None
+
+    @property
+    def tracer(self) -> Optional[Tracer]:
+        """The tracer of this tree, if it has any sinks."""
+        return self.root.__tracer
+
+    def add_trace_sink(self, sink: Sink) -> None:
+        """Send the events of every component in this tree to sink."""
+        root = self.root
+        if root.__tracer is None:
+            root.__tracer = Tracer(cycle=root._trace_cycle())
+        root.__tracer.add_sink(sink)
+        root.__bind_tracer()
+
+    def remove_trace_sink(self, sink: Sink) -> None:
+        """Stop sending events to sink, and close it."""
+        root = self.root
+        if root.__tracer is None or sink not in root.__tracer.sinks:
+            raise self._error(f"Unknown trace sink {sink}.", self.Error)
+        root.__tracer.remove_sink(sink)
+        if not root.__tracer.sinks:
+            root.__tracer = None
+        root.__bind_tracer()
 
-    @final
     @contextmanager
-    def _log_context(self, message: str) -> Iterator[None]:
-        path = self.path
+    def pause_tracing(self) -> Generator[None]:
+        """Stop sending this tree's events to its sinks until the context exits."""
+        root = self.root
+        if (tracer := root.__tracer) is None:
+            yield
+            return
+        root.__tracer = None
+        root.__bind_tracer()
         try:
-            if path != "":
-                self.__log_context.append(f"{path}.{message}")
             yield
         finally:
-            if path != "":
-                self.__log_context.pop()
+            root.__tracer = tracer
+            tracer.cycle = root._trace_cycle()
+            root.__bind_tracer()
 
-    @final
-    def _log(self, message: str) -> None:  # pragma: no cover
-        if not self.enable_logging:
-            return
-        for tabs, context in enumerate(self.__log_context):
-            print(f'{"  " * tabs}{context}')
-        print(f'{"  "*len(self.__log_context)}{message}')
+    def _trace_cycle(self) -> int:
+        """The cycle a new tracer starts counting ticks from."""
+        return 0
+
+    def __bind_tracer(self) -> None:
+        for component in self.walk():
+            component._tracer = self.__tracer
 
     @override
     def _error[E: Error](self, message: str, type: Type[E] = Error) -> E:
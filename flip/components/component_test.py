@@ -3,6 +3,7 @@ from typing import override
 import pytest
 
 from flip.components import Component, Control, Status
+from flip.components.trace import RingBufferSink
 
 
 def test_ctor_name() -> None:
@@ -194,28 +195,34 @@ def test_duplicate_child_names() -> None:
         Component(name="p", children=[c1, c2])
 
 
-def test_set_enable_logging() -> None:
-    c = Component(name="c")
-    assert not c.enable_logging
-    with c._log_context("test_context"):  # type:ignore
-        c._log("test")  # type:ignore
-    c.enable_logging = True
-    assert c.enable_logging
-    with c._log_context("test_context"):  # type:ignore
-        c._log("test")  # type:ignore
-    c.enable_logging = False
-    assert not c.enable_logging
-
-
-def test_setting_enable_logging_sets_parent_enable_logging() -> None:
+def test_trace_sinks() -> None:
     c = Component(name="c")
     p = Component(name="p", children=[c])
-    c.enable_logging = True
-    assert c.enable_logging
-    assert p.enable_logging
-    c.enable_logging = False
-    assert not p.enable_logging
-    assert not c.enable_logging
+    assert p.tracer is None
+    assert c._tracer is None  # type: ignore
+    sink = RingBufferSink()
+    c.add_trace_sink(sink)
+    assert p.tracer is not None
+    assert p.tracer.sinks == (sink,)
+    assert c._tracer is p.tracer  # type: ignore
+    p.tick()
+    p.tick()
+    assert p.tracer.cycle == 2
+    p.remove_trace_sink(sink)
+    assert p.tracer is None
+    assert c._tracer is None  # type: ignore
+    with pytest.raises(Component.Error):
+        p.remove_trace_sink(sink)
+
+
+def test_trace_binds_new_children() -> None:
+    p = Component(name="p")
+    p.add_trace_sink(RingBufferSink())
+    c = Component(name="c", parent=p)
+    p.tick()
+    assert c._tracer is p.tracer  # type: ignore
+    c.parent = None
+    assert c._tracer is None  # type: ignore
 
 
 def test_children_by_name_cache_invalidation() -> None:
@@ -253,3 +260,110 @@ def test_status_cache_invalidation() -> None:
     s2 = Status(name="s2", parent=c)
     assert c.statuses == {s1, s2}
     assert c.statuses_by_path == {"s1": s1, "s2": s2}
+
+
+def test_tick_schedule_only_includes_overridden_hooks() -> None:
+    class Processor(Component):
+        @override
+        def _tick_process(self) -> None: ...
+
+    p = Component(name="p")
+    c = Processor(name="c", parent=p)
+    control, write, read, process, clear = p._tick_schedule  # type: ignore
+    assert control == write == read == clear == ()
+    assert process == (c._tick_process,)  # type: ignore
+
+
+def test_tick_schedule_is_pre_order() -> None:
+    calls = list[str]()
+
+    class Recorder(Component):
+        @override
+        def _tick_control(self) -> None:
+            calls.append(self.path)
+
+    g = Recorder(name="g")
+    p = Recorder(name="p", parent=g)
+    Recorder(name="c", parent=p)
+    g.tick()
+    assert calls == ["", "p", "p.c"]
+
+
+def test_tick_schedule_cache_invalidation() -> None:
+    calls = list[str]()
+
+    class Recorder(Component):
+        @override
+        def _tick_control(self) -> None:
+            calls.append(self.name)
+
+    p = Component(name="p")
+    Recorder(name="c1", parent=p)
+    p.tick()
+    assert calls == ["c1"]
+    Recorder(name="c2", parent=p)
+    calls.clear()
+    p.tick()
+    assert sorted(calls) == ["c1", "c2"]
+
+
+def test_control_state() -> None:
+    p = Component(name="p")
+    c1 = Control(name="c1", parent=p)
+    c2 = Control(name="c2", parent=p, auto_clear=False)
+    state = p.control_state
+    assert c1.control_state is state
+    assert state.indices == {"c1": 0, "c2": 1, "c2.clear": 2}
+    assert state.auto_clear_mask == 0b101
+    c1.value = True
+    c2.value = True
+    assert state.bits == 0b011
+    state.bits |= 0b100
+    assert c2.clear
+    p.tick()
+    assert not c1.value
+    assert not c2.value
+    assert state.bits == 0
+
+
+def test_control_state_rebinding_keeps_values() -> None:
+    p = Component(name="p")
+    c1 = Control(name="c1", parent=p, auto_clear=False)
+    c1.value = True
+    state = p.control_state
+    assert state.bits == 0b01
+    c2 = Control(name="c2", parent=p, auto_clear=False)
+    c2.value = True
+    assert p.control_state is not state
+    assert c1.value
+    assert c2.value
+    g = Component(name="g")
+    p.parent = g
+    assert g.control_state.indices["p.c1"] == 0
+    assert c1.value
+    assert c2.value
+
+
+def test_control_state_indices() -> None:
+    class Layout(Component):
+        @override
+        def _control_indices(self) -> dict[str, int]:
+            return {"b": 3, "missing": 5}
+
+    p = Layout(name="p")
+    Control(name="a", parent=p)
+    Control(name="b", parent=p)
+    # Unclaimed controls go after every claimed index.
+    assert p.control_state.indices == {"a": 6, "b": 3}
+
+
+def test_tick_schedule_skips_auto_clear() -> None:
+    p = Component(name="p")
+    c = Control(name="c", parent=p)
+    d = Control(name="d", parent=p, auto_clear=False)
+    _, _, _, process, clear = p._tick_schedule  # type: ignore
+    assert process == (d._tick_process,)  # type: ignore
+    assert clear == ()
+    c.value = True
+    p.tick()
+    assert not c.value
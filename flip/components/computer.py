@@ -1,5 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, Mapping, Optional
+from contextlib import contextmanager
+from enum import Enum, auto
+from pathlib import Path
+from typing import (
+    Callable,
+    Generator,
+    Iterable,
+    Mapping,
+    Optional,
+    Self,
+    override,
+)
 
 from flip.bytes import Byte, Word
 from flip.components.alu import Alu
@@ -22,14 +33,30 @@ from flip.components.control import Control
 from flip.components.controller.controller import Controller
 from flip.components.memory import Memory
 from flip.components.program_counter import ProgramCounter
+from flip.components.program_profiler import ProgramProfiler
 from flip.components.register import Register
 from flip.components.result_analyzer import ResultAnalyzer
+from flip.components.reverse_execution import ReverseExecution
+from flip.components.snapshot import Snapshot
+from flip.components.trace_recorder import TraceRecorder
 from flip.components.word_register import WordRegister
 from flip.instructions import InstructionSet
 from flip.programs import Program, ProgramBuilder
 
 
 class Computer(Component, ABC):
+    class Error(Component.Error): ...
+
+    class Engine(Enum):
+        """How Computer.run executes a program."""
+
+        # Tick every microcode step through the component tree.
+        MICROCODE = auto()
+        # Execute whole instructions at once with an InstructionEngine.
+        INSTRUCTION = auto()
+        # Run both engines in lockstep and raise on the first divergence.
+        VERIFY = auto()
+
     @classmethod
     @abstractmethod
     def instruction_set(cls) -> InstructionSet:
@@ -69,6 +96,7 @@ class Computer(Component, ABC):
         name: Optional[str] = None,
         children: Optional[Iterable[Component]] = None,
         data: Optional[Mapping[Word, Byte] | Program | ProgramBuilder] = None,
+        memory_backend: Memory.Backend | str = Memory.Backend.SPARSE,
     ) -> None:
         super().__init__(name=name, children=children)
         self.__bus = Bus(name="bus", parent=self)
@@ -76,6 +104,7 @@ class Computer(Component, ABC):
             name="memory",
             bus=self.__bus,
             parent=self,
+            backend=memory_backend,
         )
         self.__program_counter = ProgramCounter(
             name="program_counter", bus=self.__bus, parent=self
@@ -98,9 +127,123 @@ class Computer(Component, ABC):
             parent=self,
         )
         self.__halt = Control(name="halt", parent=self, auto_clear=False)
+        self.__cycles = 0
+        self.__snapshot: Optional[Snapshot] = None
+        self.__reverse_execution: Optional[ReverseExecution] = None
+        self.__recorder: Optional[TraceRecorder] = None
         if data is not None:
             self.load(data)
 
+    @override
+    def _invalidate_cache(
+        self,
+        traversed: Optional[frozenset[Component]] = None,
+    ) -> None:
+        # The snapshot layout depends on the tree.
+        self.__snapshot = None
+        super()._invalidate_cache(traversed)
+
+    @override
+    def _copy(self) -> Component:
+        copy = super()._copy()
+        assert isinstance(copy, Computer)
+        # Checkpoints belong to this computer's history, not the copy's.
+        copy.__reverse_execution = None
+        copy.__recorder = None
+        return copy
+
+    def fork(self) -> Self:
+        """An independent copy of this computer in its current state.
+
+        Only the component tree is copied. Paged memories share their pages
+        with the fork copy-on-write, and other memories are copied.
+        """
+        fork = self._copy_tree()
+        assert isinstance(fork, type(self))
+        return fork
+
+    def snapshot(self) -> bytes:
+        """Pack the state of the whole computer into bytes.
+
+        See Snapshot for the layout.
+        """
+        if self.__snapshot is None:
+            self.__snapshot = Snapshot(self)
+        return self.__snapshot.capture(self.__cycles)
+
+    def restore(self, snapshot: bytes | memoryview) -> None:
+        """Restore the state of the computer from snapshot, in place."""
+        if self.__snapshot is None:
+            self.__snapshot = Snapshot(self)
+        self.__cycles = self.__snapshot.restore(snapshot)
+
+    @property
+    def reverse_execution(self) -> Optional[ReverseExecution]:
+        return self.__reverse_execution
+
+    def enable_reverse_execution(
+        self, interval: int = 1000, max_bytes: int = 1 << 26
+    ) -> ReverseExecution:
+        """Start checkpointing every interval ticks so ticks can be undone.
+
+        Checkpoints are evicted oldest first once they take more than
+        max_bytes. See ReverseExecution.
+        """
+        self.__reverse_execution = ReverseExecution(self, interval, max_bytes)
+        return self.__reverse_execution
+
+    def disable_reverse_execution(self) -> None:
+        self.__reverse_execution = None
+
+    def __require_reverse_execution(self) -> ReverseExecution:
+        if self.__reverse_execution is None:
+            raise self._error("Reverse execution isn't enabled.", self.Error)
+        return self.__reverse_execution
+
+    def step_back(self, ticks: int = 1) -> None:
+        """Return to the state this computer was in ticks ticks ago."""
+        self.__require_reverse_execution().step_back(ticks)
+
+    def run_back_until(self, predicate: Callable[[Self], bool]) -> bool:
+        """Return to the latest earlier state where predicate holds.
+
+        Returns False, leaving the computer at its earliest checkpoint, if
+        there's no such state.
+        """
+        return self.__require_reverse_execution().run_back_until(
+            lambda _: predicate(self)
+        )
+
+    @property
+    def recorder(self) -> Optional[TraceRecorder]:
+        return self.__recorder
+
+    def record(self, path: str | Path, chunk_size: int = 1 << 16) -> TraceRecorder:
+        """Start recording every tick to a file.
+
+        See TraceRecorder for the format. The recorder can be used as a
+        context manager, which stops recording on exit.
+        """
+        self.stop_recording()
+        self.__recorder = TraceRecorder(self, path, chunk_size)
+        return self.__recorder
+
+    def stop_recording(self) -> None:
+        """Stop recording, if recording, and close the recorder."""
+        if self.__recorder is not None:
+            self.__recorder.close()
+            self.__recorder = None
+
+    @contextmanager
+    def pause_recording(self) -> Generator[None]:
+        """Stop recording ticks until the context exits."""
+        recorder = self.__recorder
+        self.__recorder = None
+        try:
+            yield
+        finally:
+            self.__recorder = recorder
+
     @property
     def _bus(self) -> Bus:
         return self.__bus
@@ -113,9 +256,87 @@ class Computer(Component, ABC):
     def halt(self, value: bool) -> None:
         self.__halt.value = value
 
-    def tick_until_halt(self) -> None:
-        while not self.halt:
+    @property
+    def cycles(self) -> int:
+        """The number of ticks this computer has executed."""
+        return self.__cycles
+
+    @cycles.setter
+    def cycles(self, cycles: int) -> None:
+        self.__cycles = cycles
+
+    @override
+    def _tick_control(self) -> None:
+        # This runs before any other component's ticks, so the tree is still
+        # in the state it ended the last tick in.
+        if self.__reverse_execution is not None:
+            self.__reverse_execution.begin_tick()
+        self.__cycles += 1
+        if (tracer := self._tracer) is not None:
+            tracer.cycle = self.__cycles
+        if self.__recorder is not None:
+            self.__recorder.begin_tick()
+
+    @override
+    def _tick_clear(self) -> None:
+        # This runs before any other component's clear, so the tick's controls
+        # and bus are still set.
+        if self.__recorder is not None:
+            self.__recorder.end_tick()
+
+    @override
+    def _trace_cycle(self) -> int:
+        return self.__cycles
+
+    def tick_until_halt(
+        self,
+        max_cycles: Optional[int] = None,
+        profiler: Optional[ProgramProfiler] = None,
+    ) -> None:
+        """Tick until halt, or until max_cycles more ticks have run.
+
+        If given a ProgramProfiler, it profiles the ticks. Keeping it out of the
+        plain loops means profiling costs nothing when it's off.
+        """
+        if profiler is not None:
+            end = None if max_cycles is None else self.__cycles + max_cycles
+            while not self.halt and (end is None or self.__cycles < end):
+                profiler.before_tick(self)
+                self.tick()
+            if self.halt:
+                profiler.finish(self)
+            return
+        if max_cycles is None:
+            while not self.halt:
+                self.tick()
+            return
+        end = self.__cycles + max_cycles
+        while not self.halt and self.__cycles < end:
+            self.tick()
+
+    def tick_instruction(self) -> int:
+        """Tick until the controller finishes the current instruction.
+
+        Returns the number of ticks the instruction took.
+        """
+        cycles = self.__cycles
+        self.tick()
+        while self.controller.step_counter.value.unsigned_value != 0:
             self.tick()
+        return self.__cycles - cycles
+
+    def _run_instruction_engine(
+        self, verify: bool, max_cycles: Optional[int] = None
+    ) -> None:
+        """Run until halt with an instruction-level engine.
+
+        If verify is True, the engine runs in lockstep with the microcode and
+        raises on the first divergence. Subclasses that have an instruction
+        engine override this.
+        """
+        raise self._error(
+            f"{self.__class__.__name__} has no instruction engine.", self.Error
+        )
 
     def _create_register(self, name: str) -> Register:
         return Register(name=name, bus=self.__bus, parent=self)
@@ -139,8 +360,11 @@ class Computer(Component, ABC):
     def controller(self) -> Controller:
         return self.__controller
 
+    @property
+    def result_analyzer(self) -> ResultAnalyzer:
+        return self.__result_analyzer
+
     def load(self, data: Mapping[Word, Byte] | Program | ProgramBuilder) -> None:
-        self._log(f"loading data {data}")
         match data:
             case Program():
                 data_ = data.assemble().memory
@@ -148,9 +372,27 @@ class Computer(Component, ABC):
                 data_ = data.build().assemble().memory
             case _:
                 data_ = data
-        self._log(f"loading memory {data_}")
         self.memory.load(data_)
 
-    def run(self, program: Program | ProgramBuilder) -> None:
+    def run(
+        self,
+        program: Program | ProgramBuilder,
+        engine: "Computer.Engine | str" = Engine.MICROCODE,
+        max_cycles: Optional[int] = None,
+    ) -> int:
+        """Load and run a program until halt, or for at most max_cycles.
+
+        Returns the number of cycles the program took.
+        """
         self.load(program)
-        self.tick_until_halt()
+        if isinstance(engine, str):
+            engine = self.Engine[engine.upper()]
+        cycles = self.__cycles
+        match engine:
+            case Computer.Engine.MICROCODE:
+                self.tick_until_halt(max_cycles)
+            case Computer.Engine.INSTRUCTION:
+                self._run_instruction_engine(verify=False, max_cycles=max_cycles)
+            case Computer.Engine.VERIFY:
+                self._run_instruction_engine(verify=True, max_cycles=max_cycles)
+        return self.__cycles - cycles
@@ -1,17 +1,25 @@
 from typing import Optional, override
 
 from flip.components import component
+from flip.components.control_state import ControlState
 
 
 class Control(component.Component):
+    """A control line.
+
+    A control's value is one bit of its root's ControlState. Until the root
+    binds it, a control has a ControlState of its own.
+    """
+
     def __init__(
         self,
         name: str,
         parent: Optional[component.Component] = None,
         auto_clear: bool = True,
     ) -> None:
+        self.__state = ControlState()
+        self.__mask = 1
         super().__init__(name=name, parent=parent)
-        self.__value = False
         self.__auto_clear = auto_clear
         self.__clear: Optional[Control] = (
             Control(
@@ -29,11 +37,37 @@ class Control(component.Component):
 
     @property
     def value(self) -> bool:
-        return self.__value
+        return (self.__state.bits & self.__mask) != 0
 
     @value.setter
     def value(self, value: bool) -> None:
-        self.__value = value
+        if value:
+            self.__state.bits |= self.__mask
+        else:
+            self.__state.bits &= ~self.__mask
+
+    @property
+    def auto_clear(self) -> bool:
+        return self.__auto_clear
+
+    @property
+    def state(self) -> ControlState:
+        return self.__state
+
+    @property
+    def mask(self) -> int:
+        """The bit of this control in its state."""
+        return self.__mask
+
+    def bind(self, state: ControlState, mask: int) -> None:
+        """Move this control's value to the given bit of state.
+
+        The root binds its controls when it lays out its ControlState.
+        """
+        value = self.value
+        self.__state = state
+        self.__mask = mask
+        self.value = value
 
     @property
     def clear(self) -> Optional[bool]:
@@ -49,6 +83,18 @@ class Control(component.Component):
     def controls(self) -> frozenset["Control"]:
         return super().controls | frozenset({self})
 
+    @override
+    def _ticks(self, phase: str) -> bool:
+        match phase:
+            case "_tick_clear":
+                # The root clears every auto-clearing control at once with
+                # its ControlState at the end of a scheduled tick.
+                return False
+            case "_tick_process":
+                return self.__clear is not None
+            case _:
+                return super()._ticks(phase)
+
     @override
     def _tick_clear(self) -> None:
         if self.__auto_clear:
@@ -0,0 +1,44 @@
+from typing import Iterable, Mapping, Optional
+
+
+class ControlState:
+    """The values of every control in a component tree, as a single bitmask.
+
+    Each Control is a view onto one bit of its root's ControlState, so setting
+    a whole word of controls is a single OR into bits, and clearing every
+    auto-clearing control at the end of a tick is a single AND.
+
+    indices maps control paths, relative to the root, to bit indices.
+    """
+
+    __slots__ = ("bits", "__indices", "__auto_clear_mask", "__keep_mask")
+
+    def __init__(
+        self,
+        indices: Optional[Mapping[str, int]] = None,
+        auto_clear_mask: int = 0,
+        bits: int = 0,
+    ) -> None:
+        self.bits = bits
+        self.__indices: Mapping[str, int] = dict(indices or {})
+        self.__auto_clear_mask = auto_clear_mask
+        self.__keep_mask = ~auto_clear_mask
+
+    @property
+    def indices(self) -> Mapping[str, int]:
+        return self.__indices
+
+    @property
+    def auto_clear_mask(self) -> int:
+        return self.__auto_clear_mask
+
+    def mask(self, paths: Iterable[str]) -> int:
+        """The bits of the controls at the given paths."""
+        mask = 0
+        for path in paths:
+            mask |= 1 << self.__indices[path]
+        return mask
+
+    def clear_auto(self) -> None:
+        """Clear every auto-clearing control."""
+        self.bits &= self.__keep_mask
@@ -0,0 +1,17 @@
+import pytest
+
+from flip.components.control_state import ControlState
+
+
+def test_mask() -> None:
+    state = ControlState(indices={"a": 0, "b": 2})
+    assert state.mask([]) == 0
+    assert state.mask(["a", "b"]) == 0b101
+    with pytest.raises(KeyError):
+        state.mask(["c"])
+
+
+def test_clear_auto() -> None:
+    state = ControlState(indices={"a": 0, "b": 1}, auto_clear_mask=0b01, bits=0b11)
+    state.clear_auto()
+    assert state.bits == 0b10
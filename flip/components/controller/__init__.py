@@ -5,5 +5,7 @@ from .instruction_memory import InstructionMemory as InstructionMemory
 from .instruction_memory_format import (
     InstructionMemoryFormat as InstructionMemoryFormat,
 )
+from .microcode_compiler import MicrocodeCompiler as MicrocodeCompiler
+from .rom_cache import RomCache as RomCache
 from .status_mapping import StatusMapping as StatusMapping
 from .status_register import StatusRegister as StatusRegister
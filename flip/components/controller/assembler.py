@@ -1,3 +1,8 @@
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
 from flip.bytes import Byte
 from flip.components.controller.instruction_memory import InstructionMemory
 from flip.components.controller.instruction_memory_format import InstructionMemoryFormat
@@ -6,13 +11,47 @@ from flip.instructions import InstructionSet
 
 
 class Assembler(Errorable):
+    """Assembles an InstructionSet into its microcode ROM.
+
+    By default the ROM is built serially. With more than one worker, the
+    instruction set's opcodes are split across a process pool: each worker
+    assembles whole opcodes and sends back their addresses and control words
+    as packed arrays, and the parent merges them into the ROM. Opcodes own
+    disjoint address ranges, so the ROM is the same either way.
+    """
+
     class Error(Error): ...
 
+    # Environment variable that sets default_workers, for instruction sets
+    # that are slow to assemble.
+    ENVIRONMENT_VARIABLE = "FLIP_ASSEMBLER_WORKERS"
+
     def __init__(self, instruction_set: InstructionSet) -> None:
         self.__instruction_set = instruction_set
         self.__format = InstructionMemoryFormat(instruction_set)
+        self.__modes = {
+            mode.opcode.unsigned_value: mode
+            for instruction in instruction_set
+            for mode in instruction
+        }
+
+    @classmethod
+    def default_workers(cls) -> int:
+        """The number of workers set by $FLIP_ASSEMBLER_WORKERS, or 1."""
+        workers = os.environ.get(cls.ENVIRONMENT_VARIABLE) or "1"
+        if not workers.isdigit() or int(workers) < 1:
+            raise cls.Error(f"Invalid {cls.ENVIRONMENT_VARIABLE} {workers!r}.")
+        return int(workers)
+
+    def _expand_statuses(
+        self, statuses: dict[str, bool], branch_statuses: frozenset[str]
+    ) -> list[dict[str, bool]]:
+        """Every combination of the branch statuses that statuses leaves open.
+
+        Statuses the mode doesn't branch on are masked out of its addresses,
+        so they aren't expanded.
+        """
 
-    def _expand_statuses(self, statuses: dict[str, bool]) -> list[dict[str, bool]]:
         def expand(statuses: dict[str, bool], status: str) -> list[dict[str, bool]]:
             if status in statuses:
                 return [statuses]
@@ -24,23 +63,85 @@ class Assembler(Errorable):
 
         result = [statuses]
         for status in self.__format.statuses:
+            if status not in branch_statuses:
+                continue
             new_result = list[dict[str, bool]]()
             for statuses in result:
                 new_result.extend(expand(statuses, status))
             result = new_result
         return result
 
-    def assemble(self) -> InstructionMemory:
+    def __assemble_opcode(self, opcode: int) -> Iterator[tuple[int, int]]:
+        mode = self.__modes[opcode]
+        for impl in mode:
+            for statuses in self._expand_statuses(dict(impl.statuses), mode.statuses):
+                for step_index, step in enumerate(impl):
+                    address = self.__format.encode_address(
+                        opcode=mode.opcode,
+                        statuses=statuses,
+                        step_index=Byte(step_index),
+                    )
+                    yield address, self.__format.encode_controls(step)
+
+    @property
+    def __word_size(self) -> int:
+        # Bytes per packed control word.
+        return max(1, (self.__format.control_size + 7) // 8)
+
+    def pack_opcode(self, opcode: int) -> tuple[bytes, bytes]:
+        """The addresses and control words of an opcode, as packed arrays.
+
+        Addresses are little-endian 32-bit unsigned ints, like in RomCache
+        entries, and words are little-endian, word_size bytes each.
+        """
+        addresses: list[int] = []
+        words = bytearray()
+        word_size = self.__word_size
+        for address, word in self.__assemble_opcode(opcode):
+            addresses.append(address)
+            words += word.to_bytes(word_size, "little")
+        return struct.pack(f"<{len(addresses)}I", *addresses), bytes(words)
+
+    def assemble(self, workers: int = 1) -> InstructionMemory:
+        """Assemble the ROM, across a pool of processes if workers > 1."""
+        if workers < 1:
+            raise self._error(f"Invalid workers {workers}.", self.Error)
+        opcodes = list(self.__modes)
         data: dict[int, int] = {}
-        for instruction in self.__instruction_set:
-            for mode in instruction:
-                for impl in mode:
-                    for statuses in self._expand_statuses(dict(impl.statuses)):
-                        for step_index, step in enumerate(impl):
-                            address = self.__format.encode_address(
-                                opcode=mode.opcode,
-                                statuses=statuses,
-                                step_index=Byte(step_index),
-                            )
-                            data[address] = self.__format.encode_controls(step)
+        if workers == 1 or len(opcodes) < 2:
+            for opcode in opcodes:
+                data.update(self.__assemble_opcode(opcode))
+            return InstructionMemory(data=data, format=self.__format)
+        word_size = self.__word_size
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(opcodes)),
+            initializer=_initialize,
+            initargs=(self.__instruction_set,),
+        ) as executor:
+            # Chunks of a few opcodes each, so slow opcodes even out.
+            for packed_addresses, words in executor.map(
+                _pack_opcode,
+                opcodes,
+                chunksize=-(-len(opcodes) // (4 * workers)),
+            ):
+                for i, (address,) in enumerate(
+                    struct.iter_unpack("<I", packed_addresses)
+                ):
+                    data[address] = int.from_bytes(
+                        words[i * word_size : (i + 1) * word_size], "little"
+                    )
         return InstructionMemory(data=data, format=self.__format)
+
+
+# The assembler of each worker process, built once by _initialize.
+_assembler: Optional[Assembler] = None
+
+
+def _initialize(instruction_set: InstructionSet) -> None:
+    global _assembler
+    _assembler = Assembler(instruction_set)
+
+
+def _pack_opcode(opcode: int) -> tuple[bytes, bytes]:
+    assert _assembler is not None
+    return _assembler.pack_opcode(opcode)
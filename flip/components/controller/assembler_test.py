@@ -1,6 +1,10 @@
+import struct
+
+import pytest
 from pytest_subtests import SubTests
 
 from flip.bytes import Byte
+from flip.components import MinimalComputer
 from flip.components.controller import Assembler
 from flip.instructions import (
     AddressingMode,
@@ -114,3 +118,112 @@ def test_assemble(subtests: SubTests) -> None:
                 )
                 == controls
             )
+
+
+def test_assemble_only_expands_branch_statuses() -> None:
+    def instruction_set(num_statuses: int) -> InstructionSet:
+        branch = Instruction.create(name="b").with_mode(
+            InstructionMode.create(
+                mode=AddressingMode.IMMEDIATE,
+                opcode=Byte(1),
+                impls={
+                    InstructionImpl.create(
+                        statuses={"s0": value}, steps=[Step.create(controls={"c"})]
+                    )
+                    for value in (False, True)
+                },
+            )
+        )
+        # Branches on every status but s0.
+        others = Instruction.create(name="o").with_mode(
+            InstructionMode.create(
+                mode=AddressingMode.IMMEDIATE,
+                opcode=Byte(2),
+                impls={
+                    InstructionImpl.create(
+                        statuses={f"s{i}": True}, steps=[Step.create(controls={"d"})]
+                    )
+                    for i in range(1, num_statuses)
+                },
+            )
+        )
+        plain = Instruction.create_simple(
+            name="p",
+            mode=AddressingMode.NONE,
+            opcode=Byte(3),
+            steps=[Step.create(controls={"c"}), Step.create(controls={"d"})],
+        )
+        return InstructionSet.create(instructions={branch, others, plain})
+
+    sizes = [
+        len(Assembler(instruction_set(num_statuses)).assemble().data)
+        for num_statuses in (2, 4, 6)
+    ]
+    # b and p have 2 entries however many statuses there are. o branches on
+    # the other statuses, so it has an entry for each of their combinations
+    # that one of its impls matches: all but the one where they're all False.
+    assert sizes == [2 + 1 + 2, 2 + 7 + 2, 2 + 31 + 2]
+
+
+def _wide_instruction_set() -> InstructionSet:
+    # Control words wider than 64 bits, across several opcodes.
+    instruction_set = InstructionSet.create()
+    for opcode in range(4):
+        instruction_set = instruction_set.with_instruction(
+            Instruction.create_simple(
+                name=f"i{opcode}",
+                mode=AddressingMode.NONE,
+                opcode=Byte(opcode),
+                steps=[
+                    Step.create(controls={f"c{opcode * 40 + i}" for i in range(40)}),
+                    Step.create(controls={f"c{opcode}"}),
+                ],
+            )
+        )
+    return instruction_set
+
+
+def test_assemble_parallel(subtests: SubTests) -> None:
+    for name, instruction_set in list[tuple[str, InstructionSet]](
+        [
+            ("wide", _wide_instruction_set()),
+            ("minimal", MinimalComputer.instruction_set()),
+        ]
+    ):
+        with subtests.test(name=name):
+            serial = Assembler(instruction_set).assemble()
+            parallel = Assembler(instruction_set).assemble(workers=2)
+            assert parallel.data == serial.data
+            assert bytes(parallel.rom) == bytes(serial.rom)
+
+
+def test_pack_opcode() -> None:
+    instruction_set = MinimalComputer.instruction_set()
+    assembler = Assembler(instruction_set)
+    instruction_memory = assembler.assemble()
+    lda = instruction_set.instructions_by_name["lda"]
+    opcode = lda.modes_by_addressing_mode[AddressingMode.IMMEDIATE].opcode
+    packed_addresses, words = assembler.pack_opcode(opcode.unsigned_value)
+    addresses = [address for (address,) in struct.iter_unpack("<I", packed_addresses)]
+    assert addresses
+    word_size = len(words) // len(addresses)
+    assert [
+        int.from_bytes(words[i * word_size : (i + 1) * word_size], "little")
+        for i in range(len(addresses))
+    ] == [instruction_memory.data[address] for address in addresses]
+
+
+def test_assemble_invalid_workers() -> None:
+    with pytest.raises(Assembler.Error):
+        Assembler(_wide_instruction_set()).assemble(workers=0)
+
+
+def test_default_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(Assembler.ENVIRONMENT_VARIABLE, raising=False)
+    assert Assembler.default_workers() == 1
+    monkeypatch.setenv(Assembler.ENVIRONMENT_VARIABLE, "4")
+    assert Assembler.default_workers() == 4
+    for workers in ["0", "many"]:
+        monkeypatch.setenv(Assembler.ENVIRONMENT_VARIABLE, workers)
+        with pytest.raises(Assembler.Error):
+            Assembler.default_workers()
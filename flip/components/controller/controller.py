@@ -1,10 +1,18 @@
+from dataclasses import dataclass
+from enum import Enum, auto
 from functools import cache
-from typing import Optional, override
+from typing import Mapping, Optional, override
 
+from flip.bytes import Byte
+from flip.components import trace
 from flip.components.bus import Bus
 from flip.components.component import Component
+from flip.components.control import Control
+from flip.components.control_state import ControlState
 from flip.components.controller.assembler import Assembler
 from flip.components.controller.instruction_memory import InstructionMemory
+from flip.components.controller.microcode_compiler import MicrocodeCompiler
+from flip.components.controller.rom_cache import RomCache
 from flip.components.controller.status_register import StatusRegister
 from flip.components.counter import Counter
 from flip.components.register import Register
@@ -20,12 +28,55 @@ class Controller(Component):
 
     class MissingControlError(KeyError): ...
 
+    class CrossCheckError(Error): ...
+
+    class Engine(Enum):
+        """How the controller turns ROM control words into asserted controls."""
+
+        # Look up the instruction state's controls and assert each by path.
+        REFERENCE = auto()
+        # OR each word directly into the root's ControlState.
+        BITMASK = auto()
+        # Call each word's compiled function, which does the word's register
+        # transfers itself. See MicrocodeCompiler.
+        COMPILED = auto()
+        # Run the compiled and reference engines each tick and raise if they
+        # disagree.
+        CROSS_CHECK = auto()
+
+    @dataclass(frozen=True, kw_only=True)
+    class _Wiring:
+        """The ROM's controls, validated against the tree once.
+
+        masks has an entry for each word in the ROM's words: the bits of the
+        root's ControlState it sets, including the step counter's increment
+        control.
+        """
+
+        state: ControlState
+        masks: tuple[int, ...]
+
+    @dataclass(frozen=True, kw_only=True)
+    class _Check:
+        """What a cross-checked word's compiled function did, to compare with
+        the reference engine after the read phase."""
+
+        word: MicrocodeCompiler.Word
+        registers: tuple[Byte, ...]
+        buses: tuple[tuple[Optional[Byte], Optional[str]], ...]
+        description: str
+
     @staticmethod
     @cache
     def _assemble_instruction_memory(
         instruction_set: InstructionSet,
     ) -> InstructionMemory:
-        return Assembler(instruction_set).assemble()
+        # Shared by every controller in the process, and across processes
+        # through the RomCache, unless FLIP_ROM_CACHE disables it. Misses are
+        # assembled across FLIP_ASSEMBLER_WORKERS processes.
+        if (rom_cache := RomCache.default()) is not None:
+            return rom_cache.get(instruction_set)
+        return Assembler(instruction_set).assemble(Assembler.default_workers())
 
     def __init__(
         self,
@@ -34,6 +85,7 @@ class Controller(Component):
         name: Optional[str] = None,
         parent: Optional[Component] = None,
         status_format: Optional[StatusRegister.Format] = None,
+        engine: "Controller.Engine" = Engine.BITMASK,
     ) -> None:
         super().__init__(name=name, parent=parent)
         self.__step_counter = Counter(
@@ -53,39 +105,280 @@ class Controller(Component):
             bus=bus,
             format=status_format,
         )
+        self.__engine = engine
+        # Tables that turn the instruction buffer, status register and step
+        # counter into a ROM slot with integer operations: the opcode's slot,
+        # and for each status register byte, the offset in the opcode's region
+        # of the statuses it branches on. Opcodes that branch on the same
+        # statuses share a table.
+        instruction_memory = self.__instruction_memory
+        status_bits = [
+            instruction_memory.format.statuses.encode_address(
+                self.__status.format.decode(Byte.of(status))
+            )
+            for status in range(0x100)
+        ]
+        self.__opcode_slots = [
+            instruction_memory.opcode_slot(Byte.of(opcode)) for opcode in range(0x100)
+        ]
+        status_slots: dict[int, list[int]] = {}
+        self.__status_slots: list[list[int]] = []
+        for opcode in map(Byte.of, range(0x100)):
+            mask = instruction_memory.status_mask(opcode)
+            if (slots := status_slots.get(mask)) is None:
+                slots = status_slots[mask] = [
+                    instruction_memory.status_slot(opcode, bits) for bits in status_bits
+                ]
+            self.__status_slots.append(slots)
+        self.__num_steps = 1 << instruction_memory.format.step_index_size
+        self.__wiring: Optional[Controller._Wiring] = None
+        self.__compiled: Optional[tuple[MicrocodeCompiler.Word, ...]] = None
+        # Controls of the compiled transfers of this tick, to assert after the
+        # read phase, and the cross-check still to be made.
+        self.__deferred = 0
+        self.__check: Optional[Controller._Check] = None
+
+    @override
+    def _invalidate_cache(
+        self,
+        traversed: Optional[frozenset[Component]] = None,
+    ) -> None:
+        # The wiring and the compiled words hold resolved components and the
+        # root's ControlState, all of which depend on the tree.
+        self.__wiring = None
+        self.__compiled = None
+        super()._invalidate_cache(traversed)
+
+    @override
+    def _control_indices(self) -> Mapping[str, int]:
+        # Lay out the root's controls like ROM words, so they can be ORed in.
+        return self.__instruction_memory.format.controls
 
     @property
     def status(self) -> StatusRegister:
         return self.__status
 
-    @override
-    def _tick_control(self) -> None:
-        opcode = self.__instruction_buffer.value
-        for status_path in self.__instruction_memory.format.statuses:
-            if status_path not in self.root.statuses_by_path:
+    @property
+    def step_counter(self) -> Counter:
+        return self.__step_counter
+
+    @property
+    def instruction_buffer(self) -> Register:
+        return self.__instruction_buffer
+
+    @property
+    def instruction_memory(self) -> InstructionMemory:
+        return self.__instruction_memory
+
+    @property
+    def engine(self) -> "Controller.Engine":
+        return self.__engine
+
+    @engine.setter
+    def engine(self, engine: "Controller.Engine") -> None:
+        self.__engine = engine
+
+    @property
+    def _wiring(self) -> "Controller._Wiring":
+        if (wiring := self.__wiring) is None:
+            wiring = self.__wiring = self._bind()
+        return wiring
+
+    def _bind(self) -> "Controller._Wiring":
+        """Validate the ROM's statuses and controls against the tree.
+
+        This runs on the first tick after the tree changes, so ticks can trust
+        that every status the ROM branches on and every control it asserts
+        exists. Raises MissingStatusError or MissingControlError otherwise.
+        """
+        format = self.__instruction_memory.format
+        statuses_by_path = self.root.statuses_by_path
+        for status_path in format.statuses:
+            if status_path not in statuses_by_path:
                 raise self._error(
                     f"Instruction status {status_path} not found in root statuses.",
                     self.MissingStatusError,
                 )
-        # statuses = {status.path: status.value for status in self.root.statuses}
-        statuses = self.__status.status_values
-        step_index = self.__step_counter.value
-        control_paths = self.__instruction_memory.get(
-            opcode=opcode,
-            statuses=statuses,
-            step_index=step_index,
+        for path in format.controls:
+            self._resolve_control(path)
+        increment_path = f"{self.__step_counter.path}.increment"
+        self._resolve_control(increment_path)
+        state = self.control_state
+        increment_mask = state.mask([increment_path])
+        identity = all(
+            state.indices[path] == index for path, index in format.controls.items()
         )
-        for control_path in control_paths:
-            if (control := self.root.controls_by_path.get(control_path)) is None:
-                raise self._error(
-                    f"Control {control_path} not found in root controls.",
-                    self.MissingControlError,
+        return self._Wiring(
+            state=state,
+            masks=tuple(
+                (word if identity else state.mask(paths)) | increment_mask
+                for word, paths in zip(
+                    self.__instruction_memory.words,
+                    self.__instruction_memory.word_controls,
+                    strict=True,
+                )
+            ),
+        )
+
+    @property
+    def _compiled(self) -> tuple[MicrocodeCompiler.Word, ...]:
+        """Each word in the ROM's words, compiled against the tree."""
+        if (compiled := self.__compiled) is None:
+            compiled = self.__compiled = self._compile()
+        return compiled
+
+    def _compile(self) -> tuple[MicrocodeCompiler.Word, ...]:
+        compiler = MicrocodeCompiler(self._wiring.state, self._resolve_control)
+        increment_path = f"{self.__step_counter.path}.increment"
+        return tuple(
+            compiler.compile((*paths, increment_path), name=f"word_{word:x}")
+            for word, paths in zip(
+                self.__instruction_memory.words,
+                self.__instruction_memory.word_controls,
+                strict=True,
+            )
+        )
+
+    def _resolve_control(self, control_path: str) -> Control:
+        if (control := self.root.controls_by_path.get(control_path)) is None:
+            raise self._error(
+                f"Control {control_path} not found in root controls.",
+                self.MissingControlError,
+            )
+        return control
+
+    def __word_index(self) -> int:
+        opcode = self.__instruction_buffer.value.unsigned_value
+        step_index = self.__step_counter.value.unsigned_value
+        if step_index < self.__num_steps and (
+            index := self.__instruction_memory.rom[
+                self.__opcode_slots[opcode]
+                + self.__status_slots[opcode][self.__status.value.unsigned_value]
+                + step_index
+            ]
+        ):
+            return index - 1
+        # Raise the same error as InstructionMemory.word_index.
+        return self.__instruction_memory.word_index(
+            self.__instruction_buffer.value,
+            self.__status.status_values,
+            self.__step_counter.value,
+        )
+
+    @override
+    def _tick_control(self) -> None:
+        wiring = self._wiring
+        match self.__engine:
+            case Controller.Engine.REFERENCE:
+                self.__tick_control_reference()
+            case Controller.Engine.BITMASK:
+                self.__tick_control_bitmask(wiring)
+            case Controller.Engine.COMPILED:
+                # Trace events come from the tick hooks that compiled
+                # transfers skip.
+                if self._tracer is None:
+                    self.__tick_control_compiled()
+                else:
+                    self.__tick_control_bitmask(wiring)
+            case Controller.Engine.CROSS_CHECK:
+                self.__tick_control_cross_check(wiring)
+        if (tracer := self._tracer) is not None:
+            tracer.emit(
+                trace.ControlSet(
+                    path=self.path,
+                    opcode=self.__instruction_buffer.value.unsigned_value,
+                    step_index=self.__step_counter.value.unsigned_value,
+                    statuses=dict(self.__status.status_values),
+                    controls=self.__instruction_memory.word_controls[
+                        self.__word_index()
+                    ],
                 )
-            control.value = True
+            )
+
+    def __tick_control_reference(self) -> None:
+        # Decode the instruction state and look up each control by path,
+        # independently of the wiring, so CROSS_CHECK can catch bind bugs.
+        for control_path in self.__instruction_memory.get(
+            opcode=self.__instruction_buffer.value,
+            statuses=self.__status.status_values,
+            step_index=self.__step_counter.value,
+        ):
+            self._resolve_control(control_path).value = True
         self.__step_counter.increment = True
-        self._log(
-            f"opcode = {opcode}, "
-            f"statuses = {statuses}, "
-            f"step_index = {step_index}, "
-            f"controls = {control_paths}"
+
+    def __tick_control_bitmask(self, wiring: "Controller._Wiring") -> None:
+        wiring.state.bits |= wiring.masks[self.__word_index()]
+
+    def __tick_control_compiled(self) -> None:
+        word = self._compiled[self.__word_index()]
+        word.function()
+        self.__deferred = word.deferred
+
+    def __tick_control_cross_check(self, wiring: "Controller._Wiring") -> None:
+        word = self._compiled[self.__word_index()]
+        state = wiring.state
+        before = state.bits
+        registers = [register.value for register in word.registers]
+        buses = [(bus.value, bus.setter) for bus in word.buses]
+        word.function()
+        actual = state.bits | word.deferred
+        self.__check = self._Check(
+            word=word,
+            registers=tuple(register.value for register in word.registers),
+            buses=tuple((bus.value, bus.setter) for bus in word.buses),
+            description=self.__describe(),
         )
+        # Undo the compiled transfers, so the tick runs on the reference engine.
+        for register, value in zip(word.registers, registers, strict=True):
+            register.value = value
+        for bus, (value, setter) in zip(word.buses, buses, strict=True):
+            bus.clear()
+            if value is not None and setter is not None:
+                bus.set(value, setter)
+        state.bits = before
+        self.__tick_control_reference()
+        if (expected := state.bits) != actual:
+            diffs = sorted(
+                f"{path}: expected {bool(expected >> index & 1)} "
+                f"got {bool(actual >> index & 1)}"
+                for path, index in state.indices.items()
+                if (actual ^ expected) >> index & 1
+            )
+            raise self._error(
+                f"Compiled microcode diverged from reference for "
+                f"{self.__describe()}: {', '.join(diffs)}.",
+                self.CrossCheckError,
+            )
+
+    def __describe(self) -> str:
+        opcode = self.__instruction_buffer.value
+        statuses = self.__status.status_values
+        step_index = self.__step_counter.value
+        return f"{opcode=}, {statuses=}, {step_index=}"
+
+    @override
+    def _tick_process(self) -> None:
+        # Every read hook has run, so the reference engine's transfers are
+        # done.
+        if deferred := self.__deferred:
+            self.__deferred = 0
+            self._wiring.state.bits |= deferred
+        if (check := self.__check) is not None:
+            self.__check = None
+            word = check.word
+            diffs = [
+                f"{register.path}: expected {register.value} got {value}"
+                for register, value in zip(word.registers, check.registers, strict=True)
+                if register.value != value
+            ] + [
+                f"{bus.path}: expected {bus.value} from {bus.setter} "
+                f"got {value} from {setter}"
+                for bus, (value, setter) in zip(word.buses, check.buses, strict=True)
+                if (bus.value, bus.setter) != (value, setter)
+            ]
+            if diffs:
+                raise self._error(
+                    f"Compiled microcode diverged from reference for "
+                    f"{check.description}: {', '.join(diffs)}.",
+                    self.CrossCheckError,
+                )
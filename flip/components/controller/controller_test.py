@@ -1,8 +1,11 @@
+import dataclasses
+from typing import override
+
 import pytest
 
 from flip.bytes import Byte
-from flip.components import Bus, Component, Register, Status
-from flip.components.controller import Controller
+from flip.components import Bus, Component, MinimalComputer, Register, Status
+from flip.components.controller import Controller, MicrocodeCompiler
 from flip.components.controller.status_register import StatusRegister
 from flip.instructions import (
     AddressingMode,
@@ -189,3 +192,214 @@ def test_unknown_control() -> None:
     )
     with pytest.raises(Controller.MissingControlError):
         root.tick()
+
+
+def _run_nested_jsr(engine: Controller.Engine) -> MinimalComputer:
+    computer = MinimalComputer()
+    computer.controller.engine = engine
+    computer.run(
+        MinimalComputer.program_builder()
+        .lda(0x01)
+        .ldx(0xFF)
+        .jsr("subroutine")
+        .hlt()
+        .label("subroutine")
+        .inc()
+        .inx()
+        .pha()
+        .pla()
+        .rts()
+    )
+    return computer
+
+
+def test_bitmask_engine() -> None:
+    reference = _run_nested_jsr(Controller.Engine.REFERENCE)
+    bitmask = _run_nested_jsr(Controller.Engine.BITMASK)
+    assert bitmask.a.value == reference.a.value == Byte(0x02)
+    assert bitmask.x.value == reference.x.value == Byte(0x00)
+    assert bitmask.program_counter.value == reference.program_counter.value
+    assert bitmask.controller.status.value == reference.controller.status.value
+    assert dict(bitmask.memory) == dict(reference.memory)
+
+
+def test_compiled_engine() -> None:
+    reference = _run_nested_jsr(Controller.Engine.REFERENCE)
+    compiled = _run_nested_jsr(Controller.Engine.COMPILED)
+    assert compiled.a.value == reference.a.value == Byte(0x02)
+    assert compiled.x.value == reference.x.value == Byte(0x00)
+    assert compiled.program_counter.value == reference.program_counter.value
+    assert compiled.controller.status.value == reference.controller.status.value
+    assert dict(compiled.memory) == dict(reference.memory)
+    assert compiled.cycles == reference.cycles
+
+
+def test_bitmask_layout() -> None:
+    computer = MinimalComputer()
+    assert computer.controller.engine == Controller.Engine.BITMASK
+    controls = computer.controller.instruction_memory.format.controls
+    indices = computer.control_state.indices
+    for path, index in controls.items():
+        assert indices[path] == index
+
+
+def test_cross_check_engine() -> None:
+    computer = _run_nested_jsr(Controller.Engine.CROSS_CHECK)
+    assert computer.a.value == Byte(0x02)
+
+
+def _tax_root() -> tuple[Component, Register, Register]:
+    root = Component()
+    bus = Bus(name="bus", parent=root)
+    a = Register(name="a", parent=root, bus=bus)
+    x = Register(name="x", parent=root, bus=bus)
+    Controller(
+        name="controller",
+        parent=root,
+        bus=bus,
+        instruction_set=InstructionSet.create(
+            instructions={
+                Instruction.create_simple(
+                    name="tax",
+                    mode=AddressingMode.NONE,
+                    opcode=Byte(0x00),
+                    steps=[
+                        Step.create(
+                            ["a.write", "x.read", "controller.step_counter.reset"]
+                        ),
+                    ],
+                )
+            },
+        ),
+        engine=Controller.Engine.CROSS_CHECK,
+    )
+    return root, a, x
+
+
+def test_cross_check_engine_transfer() -> None:
+    root, a, x = _tax_root()
+    a.value = Byte(0x01)
+    root.tick()
+    assert x.value == Byte(0x01)
+    # The tick ends with the same controls as the reference engine.
+    assert root.control_state.bits == 0
+
+
+def test_cross_check_engine_control_divergence(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    computer = MinimalComputer()
+    computer.controller.engine = Controller.Engine.CROSS_CHECK
+    compile = computer.controller._compile  # type: ignore
+
+    def compile_empty_masks() -> tuple[MicrocodeCompiler.Word, ...]:
+        # Compile every word to an empty mask, as if the layout were wrong.
+        return tuple(
+            dataclasses.replace(word, mask=0, deferred=0) for word in compile()
+        )
+
+    monkeypatch.setattr(computer.controller, "_compile", compile_empty_masks)
+    with pytest.raises(Controller.CrossCheckError, match="Compiled microcode"):
+        computer.tick()
+
+
+def test_cross_check_engine_transfer_divergence(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    root, a, x = _tax_root()
+    controller = root.child("controller")
+    assert isinstance(controller, Controller)
+    compile = controller._compile  # type: ignore
+
+    def compile_wrong_transfers() -> tuple[MicrocodeCompiler.Word, ...]:
+        # Move the wrong value, as if the generated code were wrong.
+        def wrong(word: MicrocodeCompiler.Word) -> MicrocodeCompiler.Word:
+            def function() -> None:
+                word.function()
+                x.value = Byte(0xFF)
+
+            return dataclasses.replace(word, function=function)
+
+        return tuple(map(wrong, compile()))
+
+    monkeypatch.setattr(controller, "_compile", compile_wrong_transfers)
+    a.value = Byte(0x01)
+    with pytest.raises(
+        Controller.CrossCheckError, match=r"x: expected Byte\(0x01\) got Byte\(0xFF\)"
+    ):
+        root.tick()
+
+
+def test_bitmask_engine_translated_layout() -> None:
+    # The root claims different bits for the ROM's controls, so the bitmask
+    # engine has to translate ROM words to the root's layout.
+    class Root(Component):
+        @override
+        def _control_indices(self) -> dict[str, int]:
+            return {"x.read": 0, "a.write": 1}
+
+    root = Root()
+    bus = Bus(name="bus", parent=root)
+    a = Register(name="a", parent=root, bus=bus)
+    x = Register(name="x", parent=root, bus=bus)
+    controller = Controller(
+        name="controller",
+        parent=root,
+        bus=bus,
+        instruction_set=InstructionSet.create(
+            instructions={
+                Instruction.create_simple(
+                    name="tax",
+                    mode=AddressingMode.NONE,
+                    opcode=Byte(0x00),
+                    steps=[
+                        Step.create(
+                            ["a.write", "x.read", "controller.step_counter.reset"]
+                        ),
+                    ],
+                )
+            },
+        ),
+    )
+    assert root.control_state.indices["a.write"] == 1
+    assert controller.instruction_memory.format.controls["a.write"] == 0
+    a.value = Byte(0x01)
+    root.tick()
+    assert x.value == Byte(0x01)
+
+
+def test_bind_validates_every_word() -> None:
+    # The tree is missing register x, which only an instruction that never
+    # runs uses. The controller still refuses to tick until it's added.
+    root = Component()
+    bus = Bus(name="bus", parent=root)
+    Register(name="a", parent=root, bus=bus)
+    Controller(
+        name="controller",
+        parent=root,
+        bus=bus,
+        instruction_set=InstructionSet.create(
+            instructions={
+                Instruction.create_simple(
+                    name="nop",
+                    mode=AddressingMode.NONE,
+                    opcode=Byte(0x00),
+                    steps=[Step.create(["controller.step_counter.reset"])],
+                ),
+                Instruction.create_simple(
+                    name="tax",
+                    mode=AddressingMode.NONE,
+                    opcode=Byte(0x01),
+                    steps=[
+                        Step.create(
+                            ["a.write", "x.read", "controller.step_counter.reset"]
+                        ),
+                    ],
+                ),
+            },
+        ),
+    )
+    with pytest.raises(Controller.MissingControlError):
+        root.tick()
+    Register(name="x", parent=root, bus=bus)
+    root.tick()
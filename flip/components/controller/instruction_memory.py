@@ -1,11 +1,37 @@
-from typing import Mapping, Optional
+from array import array
+from typing import Mapping, Optional, Sequence
 
 from flip.bytes import Byte
 from flip.components import component
 from flip.components.controller.instruction_memory_format import InstructionMemoryFormat
 
 
+def _compress(bits: int, mask: int) -> int:
+    """Gather the bits of bits that are set in mask into the low bits."""
+    compressed = 0
+    shift = 0
+    while mask:
+        low = mask & -mask
+        if bits & low:
+            compressed |= 1 << shift
+        shift += 1
+        mask ^= low
+    return compressed
+
+
 class InstructionMemory(component.Component):
+    """The microcode ROM, mapping encoded addresses to encoded control words.
+
+    The ROM is held densely: rom is an array of indices into words, the ROM's
+    distinct control words, offset by one so that 0 marks a slot with no
+    word. Each opcode only branches on some statuses, so rom doesn't span the
+    address space. Each opcode in the ROM gets a region of slots for the
+    status bits it branches on and its steps, and opcodes with no words share
+    an empty region at the start. A slot is the opcode's slot, plus its status
+    slot, plus the step index. Each distinct word's controls are decoded once
+    up front, so lookups are an array index and a tuple index.
+    """
+
     class KeyError(component.Component.KeyError, KeyError): ...
 
     def __init__(
@@ -18,37 +44,156 @@ class InstructionMemory(component.Component):
         super().__init__(name=name, parent=parent)
         self.__format = format
         self.__data = data
+        self.__words = tuple(sorted(set(data.values())))
+        indices = {word: i for i, word in enumerate(self.__words, 1)}
+        # The status bits each opcode in the ROM branches on: the format's, and
+        # any others the data sets. Opcodes with no words have no region.
+        self.__status_masks = [0] * 0x100
+        for address in data:
+            opcode, status_bits, _ = format.unpack_address(address)
+            self.__status_masks[opcode] |= status_bits
+        opcodes = {format.unpack_address(address)[0] for address in data}
+        for opcode in opcodes:
+            self.__status_masks[opcode] |= format.status_mask(Byte.of(opcode))
+        num_steps = 1 << format.step_index_size
+        self.__opcode_slots = [0] * 0x100
+        size = num_steps
+        for opcode in sorted(opcodes):
+            self.__opcode_slots[opcode] = size
+            size += num_steps << self.__status_masks[opcode].bit_count()
+        typecode = next(
+            typecode
+            for typecode in "BHI"
+            if len(indices) < 1 << 8 * array(typecode).itemsize
+        )
+        self.__rom = array(typecode, bytes(array(typecode).itemsize * size))
+        for address, word in data.items():
+            opcode, status_bits, step_index = format.unpack_address(address)
+            self.__rom[
+                self.__opcode_slots[opcode]
+                + self.__status_slot(opcode, status_bits)
+                + step_index
+            ] = indices[word]
+        self.__word_controls = tuple(
+            tuple(sorted(format.decode_controls(word))) for word in self.__words
+        )
+        self.__control_sets = tuple(
+            frozenset(controls) for controls in self.__word_controls
+        )
 
     @property
     def format(self) -> InstructionMemoryFormat:
         return self.__format
 
-    def _get(self, address: int) -> int:
-        try:
-            return self.__data[address]
-        except KeyError as e:
-            raise self._error(
-                f"Address {address} {address:X} {address:b} not found.", self.KeyError
-            ) from e
+    @property
+    def data(self) -> Mapping[int, int]:
+        """The raw ROM, mapping encoded addresses to encoded control words."""
+        return self.__data
 
-    def get(
+    @property
+    def rom(self) -> Sequence[int]:
+        """One more than the index in words of each slot's word, or 0."""
+        return self.__rom
+
+    @property
+    def words(self) -> Sequence[int]:
+        """The distinct control words in the ROM, in ascending order."""
+        return self.__words
+
+    @property
+    def word_controls(self) -> Sequence[tuple[str, ...]]:
+        """The sorted control paths of each word in words."""
+        return self.__word_controls
+
+    def status_mask(self, opcode: Byte) -> int:
+        """The status bits an opcode's slots are indexed by.
+
+        These are the format's status_mask, and any others the data sets, or
+        none for an opcode with no words.
+        """
+        return self.__status_masks[opcode.unsigned_value]
+
+    def opcode_slot(self, opcode: Byte) -> int:
+        """The first slot of an opcode's region in rom."""
+        return self.__opcode_slots[opcode.unsigned_value]
+
+    def status_slot(self, opcode: Byte, status_bits: int) -> int:
+        """The offset in an opcode's region of the slots for some status bits.
+
+        status_bits are the statuses as encoded by the StatusMapping. Bits the
+        opcode doesn't branch on are ignored.
+        """
+        return self.__status_slot(opcode.unsigned_value, status_bits)
+
+    def __status_slot(self, opcode: int, status_bits: int) -> int:
+        return (
+            _compress(status_bits, self.__status_masks[opcode])
+            << self.__format.step_index_size
+        )
+
+    def address(
         self,
         opcode: Byte,
         statuses: Mapping[str, bool],
         step_index: Byte,
-    ) -> frozenset[str]:
+    ) -> int:
+        return self.__format.encode_address(opcode, statuses, step_index)
+
+    def word_index(
+        self,
+        opcode: Byte,
+        statuses: Mapping[str, bool],
+        step_index: Byte,
+    ) -> int:
+        """The index in words of the word for the given instruction state."""
         try:
-            return self.__format.decode_controls(
-                self._get(
-                    self.__format.encode_address(
-                        opcode,
-                        statuses,
-                        step_index,
-                    ),
-                ),
-            )
+            return self.word_index_at(self.address(opcode, statuses, step_index))
         except self.KeyError as e:
             raise self._error(
                 f"Unable to get controls for {opcode=}, {statuses=}, {step_index=}.",
                 self.KeyError,
             ) from e
+
+    def word(
+        self,
+        opcode: Byte,
+        statuses: Mapping[str, bool],
+        step_index: Byte,
+    ) -> int:
+        """Get the encoded control word for the given instruction state."""
+        return self.__words[self.word_index(opcode, statuses, step_index)]
+
+    def word_index_at(self, address: int) -> int:
+        """The index in words of the word at an address."""
+        if address >= 0:
+            opcode, status_bits, step_index = self.__format.unpack_address(address)
+            if (
+                opcode < 0x100
+                and not status_bits & ~self.__status_masks[opcode]
+                and (
+                    index := self.__rom[
+                        self.__opcode_slots[opcode]
+                        + self.__status_slot(opcode, status_bits)
+                        + step_index
+                    ]
+                )
+            ):
+                return index - 1
+        raise self._error(
+            f"Address {address} {address:X} {address:b} not found.", self.KeyError
+        )
+
+    def word_at(self, address: int) -> int:
+        return self.__words[self.word_index_at(address)]
+
+    def controls_at(self, address: int) -> tuple[str, ...]:
+        """The sorted control paths of the word at an address."""
+        return self.__word_controls[self.word_index_at(address)]
+
+    def get(
+        self,
+        opcode: Byte,
+        statuses: Mapping[str, bool],
+        step_index: Byte,
+    ) -> frozenset[str]:
+        return self.__control_sets[self.word_index(opcode, statuses, step_index)]
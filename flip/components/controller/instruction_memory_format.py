@@ -8,9 +8,28 @@ from flip.instructions import InstructionSet
 
 
 class InstructionMemoryFormat:
+    """How instruction states are encoded into ROM addresses and control words.
+
+    An address is the opcode, then a bit for each status in the instruction
+    set, then the step index. Each opcode only branches on some statuses, so
+    the others are don't-care bits: they're masked to 0 when an address is
+    encoded, and the ROM only holds the masked addresses. Adding a status to
+    the instruction set only adds ROM entries for the instructions that branch
+    on it.
+    """
+
     def __init__(self, instruction_set: InstructionSet) -> None:
         self.__controls = ControlMapping(instruction_set)
         self.__statuses = StatusMapping(instruction_set)
+        # Status bits each opcode branches on, by opcode.
+        self.__status_masks = [0] * 256
+        for instruction in instruction_set:
+            for mode in instruction:
+                self.__status_masks[mode.opcode.unsigned_value] = (
+                    self.__statuses.encode_address(
+                        {status: True for status in mode.statuses}
+                    )
+                )
         self.__num_status_bits = len(self.__statuses)
         self.__num_step_index_bits = math.ceil(math.log2(instruction_set.max_num_steps))
         self.__num_opcode_bits = 8
@@ -21,19 +40,56 @@ class InstructionMemoryFormat:
         statuses: Mapping[str, bool],
         step_index: Byte,
     ) -> int:
+        return self.pack_address(
+            opcode.unsigned_value,
+            self.__statuses.encode_address(statuses)
+            & self.__status_masks[opcode.unsigned_value],
+            step_index.unsigned_value,
+        )
+
+    def pack_address(self, opcode: int, status_bits: int, step_index: int) -> int:
+        """Pack an address from fields that are already encoded.
+
+        status_bits are the statuses as encoded by the StatusMapping. They
+        aren't masked, so the caller has to mask them with status_mask.
+        """
         return (
-            opcode.unsigned_value
-            << (self.__num_status_bits + self.__num_step_index_bits)
-            | self.__statuses.encode_address(statuses) << self.__num_step_index_bits
-            | step_index.unsigned_value
+            opcode << (self.__num_status_bits + self.__num_step_index_bits)
+            | status_bits << self.__num_step_index_bits
+            | step_index
+        )
+
+    def unpack_address(self, address: int) -> tuple[int, int, int]:
+        """Unpack an address into its opcode, status bits and step index."""
+        return (
+            address >> (self.__num_status_bits + self.__num_step_index_bits),
+            address >> self.__num_step_index_bits & ((1 << self.__num_status_bits) - 1),
+            address & ((1 << self.__num_step_index_bits) - 1),
         )
 
     def decode_address(self, address: int) -> tuple[Byte, Mapping[str, bool], Byte]:
-        opcode = Byte(address >> (self.__num_status_bits + self.__num_step_index_bits))
-        statuses = self.__statuses.decode_address(address >> self.__num_step_index_bits)
-        step_index = Byte(address & ((1 << self.__num_step_index_bits) - 1))
+        """Decode an address into its opcode, statuses and step index.
+
+        Only the statuses the opcode branches on are decoded.
+        """
+        opcode = Byte.of(
+            address >> (self.__num_status_bits + self.__num_step_index_bits)
+        )
+        status_mask = self.__status_masks[opcode.unsigned_value]
+        statuses = {
+            status: value
+            for status, value in self.__statuses.decode_address(
+                address >> self.__num_step_index_bits
+            ).items()
+            if status_mask >> self.__statuses[status] & 1
+        }
+        step_index = Byte.of(address & ((1 << self.__num_step_index_bits) - 1))
         return opcode, statuses, step_index
 
+    def status_mask(self, opcode: Byte) -> int:
+        """The status bits an opcode branches on, as encoded in an address."""
+        return self.__status_masks[opcode.unsigned_value]
+
     def encode_controls(self, controls: Iterable[str]) -> int:
         return self.__controls.encode_value(controls)
 
@@ -46,6 +102,10 @@ class InstructionMemoryFormat:
             self.__num_opcode_bits + self.__num_status_bits + self.__num_step_index_bits
         )
 
+    @property
+    def step_index_size(self) -> int:
+        return self.__num_step_index_bits
+
     @property
     def control_size(self) -> int:
         return len(self.__controls)
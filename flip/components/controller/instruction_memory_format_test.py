@@ -1,3 +1,5 @@
+from pytest_subtests import SubTests
+
 from flip.bytes import Byte
 from flip.components.controller import InstructionMemoryFormat
 from flip.instructions import (
@@ -34,7 +36,30 @@ imf = InstructionMemoryFormat(
                                 ],
                             ),
                         },
-                    )
+                    ),
+                    InstructionMode.create(
+                        mode=AddressingMode.ZERO_PAGE,
+                        opcode=Byte(3),
+                        impls={
+                            InstructionImpl.create(
+                                statuses={"s1": True, "s2": True},
+                                steps=[Step.create(controls={"c1"})],
+                            ),
+                            InstructionImpl.create(
+                                statuses={"s1": False},
+                                steps=[Step.create(controls={"c2"})],
+                            ),
+                        },
+                    ),
+                    InstructionMode.create(
+                        mode=AddressingMode.ABSOLUTE,
+                        opcode=Byte(2),
+                        impls={
+                            InstructionImpl.create(
+                                steps=[Step.create(controls={"c3"})],
+                            ),
+                        },
+                    ),
                 },
             ),
         }
@@ -56,11 +81,41 @@ def test_encode_address() -> None:
 def test_decode_address() -> None:
     assert imf.decode_address(0b11_011_1) == (
         Byte(3),
+        {"s1": True, "s2": True},
+        Byte(1),
+    )
+    assert imf.decode_address(0b00_011_1) == (
+        Byte(0),
         {"s1": True, "s2": True, "s3": False},
         Byte(1),
     )
 
 
+def test_status_mask() -> None:
+    assert imf.status_mask(Byte(3)) == 0b011
+    assert imf.status_mask(Byte(2)) == 0b000
+    assert imf.status_mask(Byte(0)) == 0b111
+    # Opcodes that aren't in the instruction set don't branch.
+    assert imf.status_mask(Byte(1)) == 0b000
+
+
+def test_encode_address_masks_other_statuses(subtests: SubTests) -> None:
+    for opcode, statuses, expected in list[tuple[Byte, dict[str, bool], int]](
+        [
+            (Byte(3), {"s1": True, "s2": False, "s3": True}, 0b11_001_0),
+            (Byte(3), {"s3": True}, 0b11_000_0),
+            (Byte(2), {"s1": True, "s2": True, "s3": True}, 0b10_000_0),
+            (Byte(2), {}, 0b10_000_0),
+        ]
+    ):
+        with subtests.test(opcode=opcode, statuses=statuses):
+            assert imf.encode_address(opcode, statuses, Byte(0)) == expected
+
+
+def test_decode_address_masks_other_statuses() -> None:
+    assert imf.decode_address(0b10_000_1) == (Byte(2), {}, Byte(1))
+
+
 def test_encode_controls() -> None:
     assert imf.encode_controls({"c1", "c2", "c4"}) == 0b01011
 
@@ -73,6 +128,10 @@ def test_address_size() -> None:
     assert imf.address_size == 12
 
 
+def test_step_index_size() -> None:
+    assert imf.step_index_size == 1
+
+
 def test_control_size() -> None:
     assert imf.control_size == 5
 
@@ -83,3 +142,15 @@ def test_statuses() -> None:
 
 def test_controls() -> None:
     assert imf.controls == {"c1": 0, "c2": 1, "c3": 2, "c4": 3, "c5": 4}
+
+
+def test_pack_address() -> None:
+    assert imf.pack_address(3, 0b101, 1) == 0b11_101_1
+    assert imf.pack_address(
+        3, imf.statuses.encode_address({"s1": True}) & imf.status_mask(Byte(3)), 1
+    ) == imf.encode_address(Byte(3), {"s1": True}, Byte(1))
+
+
+def test_unpack_address() -> None:
+    assert imf.unpack_address(0b11_101_1) == (3, 0b101, 1)
+    assert imf.unpack_address(imf.pack_address(2, 0b010, 0)) == (2, 0b010, 0)
@@ -16,7 +16,8 @@ def test_get(subtests: SubTests) -> None:
             0b0_010_0: 0b00011,
             0b0_110_0: 0b00011,
             0b0_010_1: 0b00110,
-            0b1_010_0: 0b01100,
+            # Opcode 1 doesn't branch, so its statuses are masked out.
+            0b1_000_0: 0b01100,
         },
     )
     for opcode, statuses, step_index, controls in list[
@@ -74,3 +75,53 @@ def test_not_found() -> None:
     im = InstructionMemory(format=imf, data={})
     with pytest.raises(InstructionMemory.KeyError):
         im.get(Byte(0), {}, Byte(0))
+
+
+def test_dense_rom() -> None:
+    im = InstructionMemory(
+        format=imf,
+        data={0b0_010_0: 0b00011, 0b0_110_0: 0b00011, 0b0_010_1: 0b00110},
+    )
+    assert im.words == (0b00011, 0b00110)
+    assert im.word_controls == (("c1", "c2"), ("c2", "c3"))
+    # The ROM is a component with no controls of its own.
+    assert im.controls_by_path == {}
+    # An empty region for opcodes with no words, then opcode 0's 3 status bits
+    # and 1 step bit.
+    assert len(im.rom) == 2 + (2 << 3)
+    assert im.opcode_slot(Byte(0)) == 2
+    assert im.opcode_slot(Byte(1)) == 0
+    assert im.status_mask(Byte(1)) == 0
+    assert [slot for slot, index in enumerate(im.rom) if index] == [
+        2 + 0b010_0,
+        2 + 0b010_1,
+        2 + 0b110_0,
+    ]
+    assert im.word_index_at(0b0_110_0) == 0
+    assert im.word_at(0b0_010_1) == 0b00110
+    assert im.controls_at(0b0_010_1) == ("c2", "c3")
+    assert im.word_index(Byte(0), {"s2": True}, Byte(1)) == 1
+    for address in (0b0_000_0, -1, 1 << imf.address_size):
+        with pytest.raises(InstructionMemory.KeyError):
+            im.word_at(address)
+
+
+def test_compact_rom() -> None:
+    im = InstructionMemory(
+        format=imf,
+        data={
+            # Opcode 2 doesn't branch, and opcode 3 branches on s1 and s2.
+            imf.pack_address(2, 0b000, 0): 0b00100,
+            imf.pack_address(3, 0b011, 0): 0b00001,
+        },
+    )
+    assert len(im.rom) == 2 + 2 + (2 << 2)
+    assert im.opcode_slot(Byte(2)) == 2
+    assert im.opcode_slot(Byte(3)) == 4
+    assert im.status_mask(Byte(3)) == 0b011
+    # s3 isn't a status opcode 3 branches on, so it's ignored.
+    assert im.status_slot(Byte(3), 0b111) == 0b11_0
+    assert im.word_at(imf.pack_address(2, 0b000, 0)) == 0b00100
+    assert im.word_at(imf.pack_address(3, 0b011, 0)) == 0b00001
+    with pytest.raises(InstructionMemory.KeyError):
+        im.word_at(imf.pack_address(3, 0b111, 0))
@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, TypeIs, cast
+
+from flip.components.bus import Bus
+from flip.components.component import Component
+from flip.components.control import Control
+from flip.components.control_state import ControlState
+from flip.components.register import Register
+
+
+class MicrocodeCompiler:
+    """Compiles ROM control words into Python functions that run them directly.
+
+    Each word's function is generated from the word's controls, resolved in
+    the tree. Where the word moves a register's value across a bus to other
+    registers, the function does the transfer itself, in the control phase,
+    instead of asserting read and write controls for the registers' tick hooks
+    to act on. The word's other controls are ORed into the root's
+    ControlState, like the bitmask engine does, and left to the tree.
+
+    Doing a transfer early is only safe when nothing else can see the
+    difference, so a transfer is compiled only where:
+
+    - The bus has exactly one writer, and it and the readers are Registers
+      with Register's write and read hooks.
+    - A reader has no other controls in the word, so no process hook of its
+      own changes it after the read phase.
+    - Neither the writer nor the readers are in the subtree of another
+      component that has controls in the word and write or read hooks of its
+      own, like a memory or an ALU, since those hooks may use them before the
+      reference engine would have moved the value.
+
+    Every value is read before any is written, so transfers between registers
+    that swap values across buses behave as they do across tick phases. The
+    compiled transfers' read and write controls are deferred rather than
+    dropped: the controller asserts them after the read phase, so every tick
+    ends with the same ControlState as the reference engine.
+    """
+
+    @dataclass(frozen=True, kw_only=True)
+    class Word:
+        """A control word compiled into a function."""
+
+        function: Callable[[], None]
+        # The generated source of function.
+        source: str
+        # The controls function asserts, and those of the transfers it does
+        # directly instead, which are asserted after the read phase.
+        mask: int
+        deferred: int
+        # The registers and buses function sets.
+        registers: tuple[Register, ...]
+        buses: tuple[Bus, ...]
+
+    def __init__(self, state: ControlState, resolve: Callable[[str], Control]) -> None:
+        """Create a compiler for the tree state is the ControlState of.
+
+        resolve maps a control path to the control it drives, raising if the
+        control doesn't exist.
+        """
+        self.__state = state
+        self.__resolve = resolve
+
+    @staticmethod
+    def __transfers(component: Optional[Component]) -> TypeIs[Register]:
+        # Whether a component is a Register that only moves values across its
+        # bus in the write and read phases.
+        return isinstance(component, Register) and not _overrides_hooks(
+            component, Register
+        )
+
+    def compile(self, paths: Iterable[str], name: str = "word") -> Word:
+        """Compile the word asserting the controls at paths into a function."""
+        writers: dict[Bus, list[tuple[str, Register]]] = {}
+        readers: dict[Bus, list[tuple[str, Register]]] = {}
+        others: list[Control] = []
+        paths = sorted(paths)
+        for path in paths:
+            control = self.__resolve(path)
+            if self.__transfers(owner := control.parent):
+                if control.name == "write":
+                    writers.setdefault(owner.bus, []).append((path, owner))
+                    continue
+                if control.name == "read":
+                    readers.setdefault(owner.bus, []).append((path, owner))
+                    continue
+            others.append(control)
+        # Components whose write and read hooks may use their subtrees.
+        hazards = frozenset(
+            owner
+            for control in others
+            if (owner := control.parent) is not None
+            and not self.__transfers(owner)
+            and _overrides_hooks(owner, Component)
+        )
+
+        def safe(register: Register) -> bool:
+            component: Optional[Component] = register
+            while component is not None:
+                if component in hazards:
+                    return False
+                component = component.parent
+            return True
+
+        transfers = {
+            bus: bus_writers[0]
+            for bus, bus_writers in writers.items()
+            if len(bus_writers) == 1 and safe(bus_writers[0][1])
+        }
+        # Registers that act on other controls after the control phase, which
+        # would see a value read early.
+        busy = frozenset(control.parent for control in others) | frozenset(
+            writer
+            for bus, bus_writers in writers.items()
+            if bus not in transfers
+            for _, writer in bus_writers
+        )
+        namespace: dict[str, object] = {"state": self.__state}
+        loads: list[str] = []
+        sets: list[str] = []
+        stores: list[str] = []
+        deferred: set[str] = set()
+        registers: list[Register] = []
+        for i, (bus, (path, writer)) in enumerate(transfers.items()):
+            namespace[f"bus_{i}"] = bus
+            namespace[f"writer_{i}"] = writer
+            loads.append(f"    value_{i} = writer_{i}.value")
+            sets.append(f"    bus_{i}.set(value_{i}, {writer.path!r})")
+            deferred.add(path)
+            for path, reader in readers.get(bus, []):
+                if reader in busy or not safe(reader):
+                    continue
+                namespace[f"reader_{len(registers)}"] = reader
+                stores.append(f"    reader_{len(registers)}.value = value_{i}")
+                deferred.add(path)
+                registers.append(reader)
+        mask = self.__state.mask(path for path in paths if path not in deferred)
+        source = "\n".join(
+            [f"def {name}() -> None:", f"    state.bits |= {mask:#x}"]
+            + loads
+            + sets
+            + stores
+        )
+        exec(compile(source, f"<microcode {name}>", "exec"), namespace)
+        return self.Word(
+            function=cast(Callable[[], None], namespace[name]),
+            source=source,
+            mask=mask,
+            deferred=self.__state.mask(deferred),
+            registers=tuple(registers),
+            buses=tuple(transfers),
+        )
+
+
+def _overrides_hooks(component: Component, base: type[Component]) -> bool:
+    """Whether component's class overrides base's write or read tick hooks."""
+    mro = type(component).__mro__
+    return any(
+        "_tick_write" in vars(cls) or "_tick_read" in vars(cls)
+        for cls in mro[: mro.index(base)]
+    )
@@ -0,0 +1,63 @@
+from flip.bytes import Byte
+from flip.components import Bus, MinimalComputer
+from flip.components.controller import MicrocodeCompiler
+
+
+def _compiler(computer: MinimalComputer) -> MicrocodeCompiler:
+    return MicrocodeCompiler(
+        computer.control_state, lambda path: computer.controls_by_path[path]
+    )
+
+
+def test_compile_transfer() -> None:
+    computer = MinimalComputer()
+    state = computer.control_state
+    word = _compiler(computer).compile(["a.write", "x.read", "y.read"])
+    assert word.mask == 0
+    assert word.deferred == state.mask(["a.write", "x.read", "y.read"])
+    assert word.buses == (computer.child("bus"),)
+    assert set(word.registers) == {computer.x, computer.y}
+    computer.a.value = Byte(0x12)
+    word.function()
+    assert computer.x.value == computer.y.value == Byte(0x12)
+    assert isinstance(bus := computer.child("bus"), Bus)
+    assert bus.value == Byte(0x12)
+    assert bus.setter == "a"
+    assert state.bits == 0
+
+
+def test_compile_other_controls() -> None:
+    computer = MinimalComputer()
+    state = computer.control_state
+    word = _compiler(computer).compile(["a.write", "x.read", "x.reset", "halt"])
+    # x resets itself after the read phase, so its read is left to the tree.
+    assert word.registers == ()
+    assert word.deferred == state.mask(["a.write"])
+    assert word.mask == state.mask(["x.read", "x.reset", "halt"])
+    word.function()
+    assert state.bits == word.mask
+
+
+def test_compile_hazards() -> None:
+    computer = MinimalComputer()
+    state = computer.control_state
+    # The ALU sets rhs in its read hook, so its registers aren't set early.
+    word = _compiler(computer).compile(["a.write", "alu.rhs.read", "alu.rhs_one"])
+    assert word.registers == ()
+    assert word.deferred == state.mask(["a.write"])
+    # Two writers conflict, so neither is compiled and the tree raises.
+    word = _compiler(computer).compile(["a.write", "x.write", "y.read"])
+    assert word.buses == ()
+    assert word.deferred == 0
+    assert word.mask == state.mask(["a.write", "x.write", "y.read"])
+    # The memory writes the bus in its write hook, so nothing is compiled.
+    word = _compiler(computer).compile(["memory.write", "a.read"])
+    assert word.buses == ()
+    assert word.deferred == 0
+
+
+def test_compile_source() -> None:
+    computer = MinimalComputer()
+    word = _compiler(computer).compile(["a.write", "x.read"], name="tax")
+    assert word.source.startswith("def tax() -> None:")
+    assert "reader_0.value = value_0" in word.source
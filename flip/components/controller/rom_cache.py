@@ -0,0 +1,243 @@
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from flip.components.controller.assembler import Assembler
+from flip.components.controller.instruction_memory import InstructionMemory
+from flip.components.controller.instruction_memory_format import InstructionMemoryFormat
+from flip.core import Error, Errorable
+from flip.instructions import InstructionSet
+
+_MAGIC = b"FLIPROM\0"
+# Bump when the Assembler or InstructionMemoryFormat changes what a given
+# InstructionSet assembles to, so entries from older versions are evicted.
+_VERSION = 2
+# magic, version, header size, words per control word, entry count
+_HEADER = struct.Struct("<8sIIII")
+# The address and word arrays start on a multiple of this.
+_ALIGNMENT = 64
+
+
+class RomCache(Errorable):
+    """A content-addressed disk cache of assembled microcode ROMs.
+
+    Entries are keyed by a fingerprint of the InstructionSet, so a changed
+    instruction set gets a new entry and its old entry is never read again.
+    Each entry is a file holding a header, the ROM's control and status
+    mappings as JSON, and the ROM itself as a sorted array of little-endian
+    32-bit addresses followed by an array of control words, each stored as
+    little-endian 64-bit words. Loading maps the file and unpacks each array
+    with a single struct call, so entries read the same on any platform.
+
+    Entries are written to a temporary file and renamed into place, so
+    processes sharing a cache never see a partial entry. Loading an entry
+    touches it, and storing one evicts the least recently used entries beyond
+    max_entries. Entries written by another version of the cache, or whose
+    mappings don't match the instruction set, are deleted when found.
+    """
+
+    class Error(Error): ...
+
+    # Environment variable that overrides the default directory. If it's set
+    # but empty, the default cache is disabled.
+    ENVIRONMENT_VARIABLE = "FLIP_ROM_CACHE"
+
+    def __init__(self, directory: str | Path, max_entries: int = 16) -> None:
+        if max_entries < 1:
+            raise self._error(f"Invalid max_entries {max_entries}.", self.Error)
+        self.__directory = Path(directory)
+        self.__max_entries = max_entries
+
+    @classmethod
+    def default(cls) -> Optional["RomCache"]:
+        """The cache the Controller uses, or None if it's disabled.
+
+        The directory is $FLIP_ROM_CACHE if it's set, otherwise flip/roms in
+        $XDG_CACHE_HOME or ~/.cache.
+        """
+        if (directory := os.environ.get(cls.ENVIRONMENT_VARIABLE)) is not None:
+            return cls(directory) if directory else None
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return cls(Path(base) / "flip" / "roms")
+
+    @property
+    def directory(self) -> Path:
+        return self.__directory
+
+    @property
+    def max_entries(self) -> int:
+        return self.__max_entries
+
+    @staticmethod
+    def fingerprint(instruction_set: InstructionSet) -> str:
+        """A stable hash of everything in an InstructionSet that the ROM holds."""
+        canonical = [
+            _VERSION,
+            sorted(
+                [
+                    instruction.name,
+                    sorted(
+                        [
+                            mode.opcode.unsigned_value,
+                            mode.mode.name,
+                            sorted(
+                                [
+                                    sorted(impl.statuses.items()),
+                                    [sorted(step) for step in impl],
+                                ]
+                                for impl in mode
+                            ),
+                        ]
+                        for mode in instruction
+                    ),
+                ]
+                for instruction in instruction_set
+            ),
+        ]
+        return hashlib.sha256(
+            json.dumps(canonical, separators=(",", ":")).encode()
+        ).hexdigest()
+
+    def path(self, instruction_set: InstructionSet) -> Path:
+        """The path of the entry for an InstructionSet."""
+        return self.__directory / f"{self.fingerprint(instruction_set)}.rom"
+
+    @staticmethod
+    def _metadata(format: InstructionMemoryFormat) -> dict[str, Any]:
+        return {
+            "address_size": format.address_size,
+            "controls": dict(format.controls),
+            "statuses": dict(format.statuses),
+        }
+
+    def get(self, instruction_set: InstructionSet) -> InstructionMemory:
+        """Load the ROM of an InstructionSet, assembling and storing it on a miss.
+
+        If the entry can't be written, the assembled ROM is returned anyway.
+        """
+        if (instruction_memory := self.load(instruction_set)) is None:
+            instruction_memory = Assembler(instruction_set).assemble(
+                Assembler.default_workers()
+            )
+            with contextlib.suppress(OSError):
+                self.store(instruction_set, instruction_memory)
+        return instruction_memory
+
+    def load(self, instruction_set: InstructionSet) -> Optional[InstructionMemory]:
+        """Load the ROM of an InstructionSet, or None if it isn't cached."""
+        path = self.path(instruction_set)
+        try:
+            with open(path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    instruction_memory = self.__read(instruction_set, buffer)
+        except OSError:
+            return None
+        except (ValueError, TypeError):
+            # Truncated or corrupt.
+            instruction_memory = None
+        with contextlib.suppress(OSError):
+            if instruction_memory is None:
+                path.unlink(missing_ok=True)
+            else:
+                # Mark the entry as recently used. It may have been evicted by
+                # another process since it was read.
+                os.utime(path)
+        return instruction_memory
+
+    def __read(
+        self, instruction_set: InstructionSet, buffer: mmap.mmap
+    ) -> Optional[InstructionMemory]:
+        if len(buffer) < _HEADER.size:
+            return None
+        header: tuple[bytes, int, int, int, int] = _HEADER.unpack_from(buffer)
+        magic, version, header_size, num_words, count = header
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        format = InstructionMemoryFormat(instruction_set)
+        metadata = json.loads(buffer[_HEADER.size : header_size].rstrip(b"\0"))
+        if metadata != self._metadata(format):
+            return None
+        start = header_size + _align(4 * count)
+        end = start + 8 * num_words * count
+        if len(buffer) < end:
+            return None
+        addresses = struct.unpack_from(f"<{count}I", buffer, header_size)
+        words = struct.unpack_from(f"<{num_words * count}Q", buffer, start)
+        if num_words == 1:
+            data = dict(zip(addresses, words, strict=True))
+        else:
+            data = {
+                address: sum(
+                    words[i * num_words + j] << (64 * j) for j in range(num_words)
+                )
+                for i, address in enumerate(addresses)
+            }
+        return InstructionMemory(format=format, data=data)
+
+    def store(
+        self, instruction_set: InstructionSet, instruction_memory: InstructionMemory
+    ) -> None:
+        """Store the ROM of an InstructionSet and evict the oldest entries."""
+        format = instruction_memory.format
+        num_words = max(1, (format.control_size + 63) // 64)
+        metadata = json.dumps(self._metadata(format)).encode()
+        header_size = _align(_HEADER.size + len(metadata))
+        addresses = sorted(instruction_memory.data)
+        with tempfile.NamedTemporaryFile(
+            dir=self.__ensure_directory(), suffix=".tmp", delete=False
+        ) as file:
+            try:
+                file.write(
+                    _HEADER.pack(
+                        _MAGIC, _VERSION, header_size, num_words, len(addresses)
+                    )
+                )
+                file.write(metadata.ljust(header_size - _HEADER.size, b"\0"))
+                file.write(
+                    struct.pack(f"<{len(addresses)}I", *addresses).ljust(
+                        _align(4 * len(addresses)), b"\0"
+                    )
+                )
+                for address in addresses:
+                    file.write(
+                        instruction_memory.data[address].to_bytes(
+                            8 * num_words, "little"
+                        )
+                    )
+            except BaseException:
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, self.path(instruction_set))
+        self.evict()
+
+    def __ensure_directory(self) -> Path:
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        return self.__directory
+
+    def evict(self) -> None:
+        """Delete the least recently used entries beyond max_entries."""
+        entries = list[tuple[int, Path]]()
+        for path in self.__directory.glob("*.rom"):
+            try:
+                entries.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                # Evicted by another process.
+                pass
+        entries.sort(reverse=True)
+        for _, path in entries[self.__max_entries :]:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        for path in self.__directory.glob("*.rom"):
+            path.unlink(missing_ok=True)
+
+
+def _align(size: int) -> int:
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
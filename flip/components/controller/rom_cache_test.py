@@ -0,0 +1,171 @@
+import os
+import struct
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pytest_subtests import SubTests
+
+from flip.bytes import Byte
+from flip.components import MinimalComputer
+from flip.components.controller import Assembler, Controller, RomCache
+from flip.instructions import (
+    AddressingMode,
+    Instruction,
+    InstructionImpl,
+    InstructionMode,
+    InstructionSet,
+    Step,
+)
+
+
+def _instruction_set(*controls: str, opcode: int = 1) -> InstructionSet:
+    return InstructionSet.create().with_instruction(
+        Instruction.create(name="i").with_mode(
+            InstructionMode.create(
+                mode=AddressingMode.NONE,
+                opcode=Byte(opcode),
+                impls={
+                    InstructionImpl.create(
+                        statuses={"s": False},
+                        steps=[Step.create(controls=set(controls))],
+                    ),
+                    InstructionImpl.create(
+                        statuses={"s": True},
+                        steps=[Step.create(controls={"c"}), Step.create()],
+                    ),
+                },
+            )
+        )
+    )
+
+
+def test_round_trip(tmp_path: Path, subtests: SubTests) -> None:
+    cache = RomCache(tmp_path)
+    for name, instruction_set in list[tuple[str, InstructionSet]](
+        [
+            ("small", _instruction_set("a", "b")),
+            # Control words wider than 64 bits.
+            ("wide", _instruction_set(*(f"c{i}" for i in range(100)))),
+            ("minimal", MinimalComputer.instruction_set()),
+        ]
+    ):
+        with subtests.test(name=name):
+            assert cache.load(instruction_set) is None
+            expected = Assembler(instruction_set).assemble()
+            cache.store(instruction_set, expected)
+            actual = cache.load(instruction_set)
+            assert actual is not None
+            assert actual.data == expected.data
+            assert dict(actual.format.controls) == dict(expected.format.controls)
+            assert dict(actual.format.statuses) == dict(expected.format.statuses)
+
+
+def test_little_endian(tmp_path: Path) -> None:
+    cache = RomCache(tmp_path)
+    instruction_set = _instruction_set("a", "b")
+    instruction_memory = Assembler(instruction_set).assemble()
+    cache.store(instruction_set, instruction_memory)
+    entry = cache.path(instruction_set).read_bytes()
+    _, _, header_size, num_words, count = struct.unpack_from("<8sIIII", entry)
+    addresses = struct.unpack_from(f"<{count}I", entry, header_size)
+    assert list(addresses) == sorted(instruction_memory.data)
+    start = header_size + -(-4 * count // 64) * 64
+    words = struct.unpack_from(f"<{count * num_words}Q", entry, start)
+    assert list(words) == [instruction_memory.data[address] for address in addresses]
+
+
+def test_fingerprint() -> None:
+    assert RomCache.fingerprint(_instruction_set("a", "b")) == RomCache.fingerprint(
+        _instruction_set("b", "a")
+    )
+    fingerprints = {
+        RomCache.fingerprint(instruction_set)
+        for instruction_set in [
+            _instruction_set("a"),
+            _instruction_set("b"),
+            _instruction_set("a", opcode=2),
+            _instruction_set("a").with_footer("f"),
+        ]
+    }
+    assert len(fingerprints) == 4
+
+
+def test_get(tmp_path: Path) -> None:
+    cache = RomCache(tmp_path)
+    instruction_set = _instruction_set("a")
+    instruction_memory = cache.get(instruction_set)
+    assert instruction_memory.data == Assembler(instruction_set).assemble().data
+    assert cache.path(instruction_set).exists()
+    cached = cache.load(instruction_set)
+    assert cached is not None
+    assert cached.data == instruction_memory.data
+
+
+def test_invalid_entries_are_evicted(tmp_path: Path, subtests: SubTests) -> None:
+    cache = RomCache(tmp_path)
+    instruction_set = _instruction_set("a")
+    path = cache.path(instruction_set)
+    for name, corrupt in list[tuple[str, Callable[[bytes], bytes]]](
+        [
+            ("empty", lambda _: b""),
+            ("header", lambda entry: entry[:10]),
+            ("magic", lambda entry: b"NOTAROM\0" + entry[8:]),
+            ("version", lambda entry: entry[:8] + bytes([99, 0, 0, 0]) + entry[12:]),
+            ("metadata", lambda entry: entry.replace(b'"a"', b'"z"')),
+            ("truncated", lambda entry: entry[:-1]),
+        ]
+    ):
+        with subtests.test(name=name):
+            cache.store(instruction_set, Assembler(instruction_set).assemble())
+            path.write_bytes(corrupt(path.read_bytes()))
+            assert cache.load(instruction_set) is None
+            assert not path.exists()
+
+
+def test_evict(tmp_path: Path) -> None:
+    cache = RomCache(tmp_path, max_entries=2)
+    a, b, c = (_instruction_set(control) for control in "abc")
+    for i, instruction_set in enumerate([a, b]):
+        cache.store(instruction_set, Assembler(instruction_set).assemble())
+        os.utime(cache.path(instruction_set), ns=(i, i))
+    # Loading a makes b the least recently used.
+    assert cache.load(a) is not None
+    cache.store(c, Assembler(c).assemble())
+    assert cache.path(a).exists()
+    assert not cache.path(b).exists()
+    assert cache.path(c).exists()
+    cache.clear()
+    assert list(tmp_path.glob("*.rom")) == []
+
+
+def test_default(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(RomCache.ENVIRONMENT_VARIABLE, str(tmp_path))
+    cache = RomCache.default()
+    assert cache is not None and cache.directory == tmp_path
+    monkeypatch.setenv(RomCache.ENVIRONMENT_VARIABLE, "")
+    assert RomCache.default() is None
+    monkeypatch.delenv(RomCache.ENVIRONMENT_VARIABLE)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cache = RomCache.default()
+    assert cache is not None and cache.directory == tmp_path / "flip" / "roms"
+
+
+def test_invalid_max_entries(tmp_path: Path) -> None:
+    with pytest.raises(RomCache.Error):
+        RomCache(tmp_path, max_entries=0)
+
+
+def test_controller_uses_default(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(RomCache.ENVIRONMENT_VARIABLE, str(tmp_path))
+    instruction_set = _instruction_set("a")
+    assemble = Controller._assemble_instruction_memory.__wrapped__  # type: ignore
+    instruction_memory = assemble(instruction_set)
+    assert RomCache(tmp_path).path(instruction_set).exists()
+    assert assemble(instruction_set).data == instruction_memory.data
+    monkeypatch.setenv(RomCache.ENVIRONMENT_VARIABLE, "")
+    RomCache(tmp_path).clear()
+    assert assemble(instruction_set).data == instruction_memory.data
+    assert list(tmp_path.glob("*.rom")) == []
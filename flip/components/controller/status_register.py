@@ -2,10 +2,12 @@ from dataclasses import dataclass
 from typing import Iterator, Mapping, Optional, override
 
 from flip.bytes import Byte
+from flip.components import trace
 from flip.components.bus import Bus
 from flip.components.component import Component
 from flip.components.control import Control
 from flip.components.register import Register
+from flip.components.status import Status
 from flip.core import Error, Errorable
 
 
@@ -46,7 +48,7 @@ class StatusRegister(Register):
                         f"Status {status} not found.",
                         self.Error,
                     )
-            return Byte(
+            return Byte.of(
                 sum(
                     1 << index
                     for status, index in self._status_indices.items()
@@ -115,6 +117,31 @@ class StatusRegister(Register):
             # We manually handle clearing the latch in the clear phase.
             auto_clear=False,
         )
+        self.__latched: Optional[tuple[tuple[Status, int], ...]] = None
+
+    @override
+    def _invalidate_cache(
+        self,
+        traversed: Optional[frozenset[Component]] = None,
+    ) -> None:
+        # The latched statuses are resolved in the root, which may have changed.
+        self.__latched = None
+        super()._invalidate_cache(traversed)
+
+    @property
+    def _latched(self) -> tuple[tuple[Status, int], ...]:
+        """Each status in the format, resolved in the root, and its bit mask."""
+        if self.__latched is None:
+            statuses_by_path = self.root.statuses_by_path
+            latched = list[tuple[Status, int]]()
+            for path, index in self.__format.items():
+                if (status := statuses_by_path.get(path)) is None:
+                    raise self._error(
+                        f"Status {path} not found in root statuses.", self.Error
+                    )
+                latched.append((status, 1 << index))
+            self.__latched = tuple(latched)
+        return self.__latched
 
     @property
     def format(self) -> "StatusRegister.Format":
@@ -155,21 +182,22 @@ class StatusRegister(Register):
         """
         super()._tick_clear()
         if self.latch and self.disable_latch:
-            self._log("Latching disabled.")
-        if self.latch and not self.disable_latch:
-            for status in self.__format:
-                if status not in self.root.statuses_by_path:
-                    raise self._error(
-                        f"Status {status} not found in root statuses.", self.Error
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.StatusLatch(
+                        path=self.path, statuses=dict(self.status_values), disabled=True
                     )
-            self.value = self.__format.encode(
-                {
-                    path: status.value
-                    for path, status in self.root.statuses_by_path.items()
-                    if path in self.__format
-                }
-            )
-            self._log(f"Latched status values: {self.status_values}")
+                )
+        if self.latch and not self.disable_latch:
+            value = 0
+            for status, mask in self._latched:
+                if status.value:
+                    value |= mask
+            self.value = Byte.of(value)
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.StatusLatch(path=self.path, statuses=dict(self.status_values))
+                )
 
         # Manually clear the latch controls. Auto-clearing is disabled because we
         # want to manually handle latching at the very end of the tick cycle.
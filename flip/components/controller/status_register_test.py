@@ -147,3 +147,29 @@ def test_disable_latch() -> None:
     # verify that status was latched
     assert status.value == Byte(0x01)
     assert status.status_values == {"tax_enable": True}
+
+
+def test_latch_after_tree_changes() -> None:
+    root = Component()
+    bus = Bus(name="bus", parent=root)
+    status = StatusRegister(
+        name="status",
+        parent=root,
+        bus=bus,
+        format=StatusRegister.Format({"tax_enable": 0}),
+    )
+    old = Status(name="tax_enable", parent=root)
+    old.value = True
+    status.latch = True
+    root.tick()
+    assert status.value == Byte(0x01)
+    # Latching resolves the new status, not the one it latched before.
+    root.remove_child(old)
+    Status(name="tax_enable", parent=root)
+    status.latch = True
+    root.tick()
+    assert status.value == Byte(0x00)
+    root.remove_child(root.children_by_name["tax_enable"])
+    status.latch = True
+    with pytest.raises(StatusRegister.Error):
+        root.tick()
@@ -1,7 +1,9 @@
 from typing import Optional, override
 
 from flip.bytes import Byte
-from flip.components import component
+from flip.components import component, trace
+from flip.components.alu.operation_table import OperationTable
+from flip.components.alu.operations.adc import Adc
 from flip.components.bus import Bus
 from flip.components.control import Control
 from flip.components.register import Register
@@ -28,8 +30,15 @@ class Counter(Register):
     @override
     def _tick_process(self) -> None:
         if self.reset:
-            self.value = Byte(0)
-            self._log(f"reset to {self.value}")
+            self.value = Byte.of(0)
+            if (tracer := self._tracer) is not None:
+                tracer.emit(trace.RegisterReset(path=self.path, value=0))
         elif self.increment:
-            self.value = self.value.add(Byte(1)).value
-            self._log(f"incremented to {self.value}")
+            self.value = _INCREMENT(self.value, Byte.of(1), False).value
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.Increment(path=self.path, value=self.value.unsigned_value)
+                )
+
+
+_INCREMENT = OperationTable.for_operation(Adc())
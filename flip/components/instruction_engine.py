@@ -0,0 +1,758 @@
+from dataclasses import dataclass, field, fields, replace
+from typing import Callable, Mapping, Optional
+
+from flip.bytes import Byte, Word
+from flip.components.alu import OperationTable
+from flip.components.alu.operations import OperationSet
+from flip.components.controller import InstructionMemory, StatusRegister
+from flip.core import Error, Errorable
+from flip.instructions import AddressingMode, InstructionSet
+
+
+def _alu(
+    s: "InstructionEngine.State", table: OperationTable, lhs: int, rhs: int
+) -> int:
+    entry = table.entry(lhs, rhs, s.carry_in)
+    s.carry_in = s.carry_out = bool(entry & OperationTable.CARRY)
+    s.zero = bool(entry & OperationTable.ZERO)
+    s.negative = bool(entry & OperationTable.NEGATIVE)
+    s.overflow = bool(entry & OperationTable.OVERFLOW)
+    s.half_carry = bool(entry & OperationTable.HALF_CARRY)
+    return entry & 0xFF
+
+
+class InstructionEngine(Errorable):
+    """Executes whole MinimalComputer instructions at once.
+
+    The engine keeps the architectural state of a MinimalComputer in plain ints
+    and has a 256-entry dispatch table, indexed by opcode, of handlers that
+    apply each instruction's effects the same way its microcode does, including
+    the ALU and status register side effects. ALU results are looked up in the
+    OperationTables of the ALU's operations, so they can't drift from the
+    ALU's own. Cycle counts come from the number
+    of steps each opcode has in the assembled ROM, so they match the microcode
+    engine tick for tick.
+
+    Scratch registers that don't survive an instruction boundary (the bus,
+    memory.address, arg_buffer and the ALU operand registers) aren't modeled.
+    """
+
+    class Error(Error): ...
+
+    class DecodeError(Error): ...
+
+    class DivergenceError(Error): ...
+
+    type Handler = Callable[["InstructionEngine.State"], None]
+
+    # Builds a handler for one occurrence of an instruction given its operand.
+    type Decoder = Callable[[int], "InstructionEngine.Handler"]
+
+    @dataclass(slots=True)
+    class State:
+        """Architectural state of a MinimalComputer at an instruction boundary."""
+
+        # a, x, y
+        registers: list[int] = field(default_factory=lambda: [0, 0, 0])
+        program_counter: int = 0
+        stack_pointer: int = 0xFF
+        stack_page: int = 0x01
+        status: int = 0
+        instruction: int = 0
+        carry_in: bool = False
+        carry_out: bool = False
+        zero: bool = False
+        negative: bool = False
+        overflow: bool = False
+        half_carry: bool = False
+        result: int = 0
+        halt: bool = False
+        memory: dict[int, int] = field(default_factory=dict[int, int])
+
+        @classmethod
+        def capture(
+            cls, computer: "minimal_computer.MinimalComputer", memory: bool = True
+        ) -> "InstructionEngine.State":
+            """Capture the computer's state, leaving memory empty if not memory."""
+            alu = computer.alu
+            return cls(
+                registers=[
+                    computer.a.value.unsigned_value,
+                    computer.x.value.unsigned_value,
+                    computer.y.value.unsigned_value,
+                ],
+                program_counter=computer.program_counter.value.value,
+                stack_pointer=computer.stack_pointer.low.unsigned_value,
+                stack_page=computer.stack_pointer.high.unsigned_value,
+                status=computer.controller.status.value.unsigned_value,
+                instruction=computer.controller.instruction_buffer.value.unsigned_value,
+                carry_in=alu.carry_in,
+                carry_out=alu.carry_out,
+                zero=alu.zero,
+                negative=alu.negative,
+                overflow=alu.overflow,
+                half_carry=alu.half_carry,
+                result=computer.result_analyzer.value.unsigned_value,
+                halt=computer.halt,
+                memory=(
+                    {
+                        address.value: value.unsigned_value
+                        for address, value in computer.memory.items()
+                    }
+                    if memory
+                    else {}
+                ),
+            )
+
+        def store(self, computer: "minimal_computer.MinimalComputer") -> None:
+            computer.a.value = Byte.of(self.registers[0])
+            computer.x.value = Byte.of(self.registers[1])
+            computer.y.value = Byte.of(self.registers[2])
+            computer.program_counter.value = Word.of(self.program_counter)
+            computer.stack_pointer.low = Byte.of(self.stack_pointer)
+            computer.stack_pointer.high = Byte.of(self.stack_page)
+            computer.controller.status.value = Byte.of(self.status)
+            computer.controller.instruction_buffer.value = Byte.of(self.instruction)
+            alu = computer.alu
+            alu.carry_in = self.carry_in
+            alu.carry_out = self.carry_out
+            alu.zero = self.zero
+            alu.negative = self.negative
+            alu.overflow = self.overflow
+            alu.half_carry = self.half_carry
+            computer.result_analyzer.value = Byte.of(self.result)
+            computer.result_analyzer.update_statuses()
+            computer.halt = self.halt
+            computer.memory.load(
+                {
+                    Word.of(address): Byte.of(value)
+                    for address, value in self.memory.items()
+                    if computer.memory.get(Word.of(address)) != Byte.of(value)
+                }
+            )
+
+        def diff(
+            self, other: "InstructionEngine.State"
+        ) -> Mapping[str, tuple[object, object]]:
+            """Fields that differ from other, as (self, other) value pairs."""
+            return {
+                field_.name: (getattr(self, field_.name), getattr(other, field_.name))
+                for field_ in fields(self)
+                if getattr(self, field_.name) != getattr(other, field_.name)
+            }
+
+    class _Memory(dict[int, int]):
+        """Engine memory that records the addresses written to it."""
+
+        def __init__(self, data: Mapping[int, int], written: set[int]) -> None:
+            super().__init__(data)
+            self.written = written
+
+        def __setitem__(self, address: int, value: int) -> None:
+            super().__setitem__(address, value)
+            self.written.add(address)
+
+    @dataclass(frozen=True, kw_only=True)
+    class Divergence:
+        """The first instruction after which the two engines disagree."""
+
+        instruction_index: int
+        address: int
+        opcode: int
+        name: str
+        expected_cycles: int
+        actual_cycles: int
+        # field -> (microcode value, instruction engine value)
+        fields: Mapping[str, tuple[object, object]]
+
+        def __str__(self) -> str:
+            diffs = [
+                f"{name}: microcode={expected!r} instruction={actual!r}"
+                for name, (expected, actual) in sorted(self.fields.items())
+            ]
+            if self.expected_cycles != self.actual_cycles:
+                diffs.append(
+                    f"cycles: microcode={self.expected_cycles} "
+                    f"instruction={self.actual_cycles}"
+                )
+            return (
+                f"instruction #{self.instruction_index} {self.name} "
+                f"(opcode 0x{self.opcode:02X}) at 0x{self.address:04X} diverged: "
+                + ", ".join(diffs)
+            )
+
+    def __init__(
+        self,
+        instruction_set: InstructionSet,
+        instruction_memory: InstructionMemory,
+        status_format: StatusRegister.Format,
+        operation_set: OperationSet,
+    ) -> None:
+        self.__tables: Mapping[str, OperationTable] = {
+            operation.name: OperationTable.for_operation(operation)
+            for operation in operation_set
+        }
+        self.__status_masks: Mapping[str, int] = {
+            status: 1 << index for status, index in status_format.items()
+        }
+        self.__latch = self._latch()
+        self.__handlers: list[Optional[InstructionEngine.Handler]] = [None] * 256
+        self.__decoders: list[Optional[InstructionEngine.Decoder]] = [None] * 256
+        self.__names: list[str] = [""] * 256
+        self.__sizes: list[int] = [0] * 256
+        self.__ends_block: list[bool] = [False] * 256
+        for instruction in instruction_set:
+            for mode in instruction:
+                opcode = mode.opcode.unsigned_value
+                self.__handlers[opcode] = self._handler(instruction.name, mode.mode)
+                self.__decoders[opcode] = self._decoder(instruction.name, mode.mode)
+                self.__names[opcode] = f"{instruction.name} {mode.mode.name.lower()}"
+                self.__sizes[opcode] = self._SIZES[mode.mode]
+                self.__ends_block[opcode] = instruction.name in self._BLOCK_ENDS
+        self.__cycles = self._cycles(instruction_memory, status_format)
+        for opcode, cycles in enumerate(self.__cycles):
+            # An instruction whose length depends on the status can't have its
+            # cycles summed ahead of time, so it has to end a block too.
+            if len(set(cycles)) > 1:
+                self.__ends_block[opcode] = True
+
+    # Instruction length in bytes, including the opcode.
+    _SIZES: Mapping[AddressingMode, int] = {
+        AddressingMode.NONE: 1,
+        AddressingMode.IMMEDIATE: 2,
+        AddressingMode.RELATIVE: 2,
+        AddressingMode.ZERO_PAGE: 2,
+        AddressingMode.ABSOLUTE: 3,
+        AddressingMode.INDEX_X: 3,
+        AddressingMode.INDEX_Y: 3,
+    }
+
+    _REGISTERS: Mapping[str, int] = {"a": 0, "x": 1, "y": 2}
+
+    # Instruction name -> ALU operation.
+    _ALU_OPERATION_NAMES: Mapping[str, str] = {
+        "adc": "adc",
+        "sbc": "sbc",
+        "and": "and",
+        "ora": "or",
+        "eor": "xor",
+        "asl": "shl",
+        "lsr": "shr",
+        "rol": "rol",
+        "ror": "ror",
+    }
+
+    # Instructions after which the next program counter isn't known statically.
+    _BLOCK_ENDS = frozenset(
+        {
+            "hlt",
+            "jmp",
+            "jsr",
+            "rts",
+            "beq",
+            "bne",
+            "bmi",
+            "bpl",
+            "bcs",
+            "bcc",
+            "bvs",
+            "bvc",
+        }
+    )
+
+    @staticmethod
+    def _cycles(
+        instruction_memory: InstructionMemory,
+        status_format: StatusRegister.Format,
+    ) -> list[list[int]]:
+        """Number of steps per opcode, indexed by opcode and status byte."""
+        steps: dict[tuple[int, int], int] = {}
+        format = instruction_memory.format
+        for address in instruction_memory.data:
+            opcode, statuses, step_index = format.decode_address(address)
+            status = status_format.encode(
+                {
+                    status: value
+                    for status, value in statuses.items()
+                    if status in status_format
+                }
+            ).unsigned_value
+            key = (opcode.unsigned_value, status)
+            steps[key] = max(steps.get(key, 0), step_index.unsigned_value + 1)
+        # Expand status-register bits that the opcode doesn't branch on to
+        # every status byte.
+        rom_masks = [
+            status_format.encode(
+                {
+                    status: value
+                    for status, value in format.statuses.decode_address(
+                        format.status_mask(Byte(opcode))
+                    ).items()
+                    if status in status_format
+                }
+            ).unsigned_value
+            for opcode in range(256)
+        ]
+        return [
+            [
+                steps.get((opcode, status & rom_masks[opcode]), 0)
+                for status in range(256)
+            ]
+            for opcode in range(256)
+        ]
+
+    def name(self, opcode: int) -> str:
+        return self.__names[opcode]
+
+    def cycles(self, opcode: int, status: int) -> int:
+        return self.__cycles[opcode][status]
+
+    def handler(self, opcode: int) -> Optional[Handler]:
+        return self.__handlers[opcode]
+
+    def decoder(self, opcode: int) -> Optional[Decoder]:
+        """Decoder for instructions whose operand can be decoded ahead of time.
+
+        The handlers a decoder builds expect the program counter to already be
+        past the whole instruction. Opcodes without a decoder, such as those
+        with no operand or an indexed one, return None and should be run with
+        their regular handler.
+        """
+        return self.__decoders[opcode]
+
+    def size(self, opcode: int) -> int:
+        """Length of the instruction in bytes, or 0 for unknown opcodes."""
+        return self.__sizes[opcode]
+
+    def ends_block(self, opcode: int) -> bool:
+        """Whether the instruction ends a straight-line run of instructions."""
+        return self.__ends_block[opcode]
+
+    def step(self, state: State) -> int:
+        """Execute one instruction and return the number of cycles it took."""
+        memory = state.memory
+        opcode = memory.get(state.program_counter, 0)
+        if (handler := self.__handlers[opcode]) is None:
+            raise self._error(
+                f"Unknown opcode 0x{opcode:02X} at 0x{state.program_counter:04X}.",
+                self.DecodeError,
+            )
+        cycles = self.__cycles[opcode][state.status]
+        # header: fetch the opcode into the instruction buffer and increment pc
+        state.instruction = opcode
+        state.program_counter = (state.program_counter + 1) & 0xFFFF
+        handler(state)
+        return cycles
+
+    def run(self, state: State, max_cycles: Optional[int] = None) -> int:
+        """Execute instructions until halt and return the number of cycles."""
+        cycles = 0
+        step = self.step
+        while not state.halt:
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            cycles += step(state)
+        return cycles
+
+    def verify(
+        self,
+        computer: "minimal_computer.MinimalComputer",
+        max_instructions: Optional[int] = None,
+    ) -> Optional[Divergence]:
+        """Run the computer's microcode and this engine in lockstep until halt.
+
+        After each instruction the computer's registers and flags are compared
+        against the engine's, along with the memory at every address either
+        engine wrote during the instruction, so memory is only copied once.
+        Returns the first divergence, or None if the engines agreed all the
+        way to halt.
+        """
+        written: set[int] = set()
+        state = self.State.capture(computer)
+        memory = state.memory = self._Memory(state.memory, written)
+
+        def listener(address: Word) -> None:
+            written.add(address.value)
+
+        computer.memory.add_write_listener(listener)
+        try:
+            index = 0
+            while not computer.halt and (
+                max_instructions is None or index < max_instructions
+            ):
+                address = state.program_counter
+                opcode = memory.get(address, 0)
+                written.clear()
+                expected_cycles = computer.tick_instruction()
+                actual_cycles = self.step(state)
+                expected = self.State.capture(computer, memory=False)
+                expected.memory = {
+                    address: value.unsigned_value
+                    for address in written
+                    if (value := computer.memory.get(Word.of(address))) is not None
+                }
+                differences = expected.diff(
+                    replace(
+                        state,
+                        memory={
+                            address: memory[address]
+                            for address in written
+                            if address in memory
+                        },
+                    )
+                )
+                if differences or expected_cycles != actual_cycles:
+                    return self.Divergence(
+                        instruction_index=index,
+                        address=address,
+                        opcode=opcode,
+                        name=self.name(opcode),
+                        expected_cycles=expected_cycles,
+                        actual_cycles=actual_cycles,
+                        fields=differences,
+                    )
+                index += 1
+            return None
+        finally:
+            computer.memory.remove_write_listener(listener)
+
+    def _latch(self) -> Handler:
+        masks = self.__status_masks
+        negative_mask = masks.get("result_analyzer.negative", 0)
+        zero_mask = masks.get("result_analyzer.zero", 0)
+        carry_mask = masks.get("alu.carry_out", 0)
+        overflow_mask = masks.get("alu.overflow", 0)
+        alu_zero_mask = masks.get("alu.zero", 0)
+        alu_negative_mask = masks.get("alu.negative", 0)
+        half_carry_mask = masks.get("alu.half_carry", 0)
+
+        def latch(s: InstructionEngine.State) -> None:
+            result = s.result
+            s.status = (
+                (negative_mask if result & 0x80 else 0)
+                | (zero_mask if result == 0 else 0)
+                | (carry_mask if s.carry_out else 0)
+                | (overflow_mask if s.overflow else 0)
+                | (alu_zero_mask if s.zero else 0)
+                | (alu_negative_mask if s.negative else 0)
+                | (half_carry_mask if s.half_carry else 0)
+            )
+
+        return latch
+
+    def _decoder(self, name: str, mode: AddressingMode) -> Optional[Decoder]:
+        if mode not in (
+            AddressingMode.IMMEDIATE,
+            AddressingMode.ZERO_PAGE,
+            AddressingMode.ABSOLUTE,
+        ):
+            return None
+        latch = self.__latch
+        tables = self.__tables
+        sbc = tables["sbc"]
+        immediate = mode == AddressingMode.IMMEDIATE
+
+        def load(to: int) -> InstructionEngine.Decoder:
+            def decoder(operand: int) -> InstructionEngine.Handler:
+                def load_immediate(s: InstructionEngine.State) -> None:
+                    s.registers[to] = s.result = operand
+                    latch(s)
+
+                def load_memory(s: InstructionEngine.State) -> None:
+                    s.registers[to] = s.result = s.memory.get(operand, 0)
+                    latch(s)
+
+                return load_immediate if immediate else load_memory
+
+            return decoder
+
+        def store(from_: int) -> InstructionEngine.Decoder:
+            def decoder(operand: int) -> InstructionEngine.Handler:
+                def handler(s: InstructionEngine.State) -> None:
+                    s.memory[operand] = s.registers[from_]
+                    latch(s)
+
+                return handler
+
+            return decoder
+
+        def alu_binary(table: OperationTable) -> InstructionEngine.Decoder:
+            def decoder(operand: int) -> InstructionEngine.Handler:
+                def alu_immediate(s: InstructionEngine.State) -> None:
+                    s.registers[0] = s.result = _alu(s, table, s.registers[0], operand)
+                    latch(s)
+
+                def alu_memory(s: InstructionEngine.State) -> None:
+                    s.registers[0] = s.result = _alu(
+                        s, table, s.registers[0], s.memory.get(operand, 0)
+                    )
+                    latch(s)
+
+                return alu_immediate if immediate else alu_memory
+
+            return decoder
+
+        def cmp(operand: int) -> InstructionEngine.Handler:
+            def cmp_immediate(s: InstructionEngine.State) -> None:
+                s.carry_in = True
+                s.result = _alu(s, sbc, s.registers[0], operand)
+                latch(s)
+
+            def cmp_memory(s: InstructionEngine.State) -> None:
+                s.carry_in = True
+                s.result = _alu(s, sbc, s.registers[0], s.memory.get(operand, 0))
+                latch(s)
+
+            return cmp_immediate if immediate else cmp_memory
+
+        match name:
+            case "lda" | "ldx" | "ldy":
+                return load(self._REGISTERS[name[2]])
+            case "sta" | "stx" | "sty":
+                return store(self._REGISTERS[name[2]])
+            case "adc" | "sbc" | "and" | "ora" | "eor":
+                return alu_binary(tables[self._ALU_OPERATION_NAMES[name]])
+            case "cmp":
+                return cmp
+            case _:
+                return None
+
+    def _handler(self, name: str, mode: AddressingMode) -> Handler:
+        masks = self.__status_masks
+        latch = self.__latch
+
+        def fetch(s: InstructionEngine.State) -> int:
+            value = s.memory.get(s.program_counter, 0)
+            s.program_counter = (s.program_counter + 1) & 0xFFFF
+            return value
+
+        def fetch_word(s: InstructionEngine.State) -> int:
+            low = fetch(s)
+            return (fetch(s) << 8) | low
+
+        alu = _alu
+        tables = self.__tables
+        adc = tables["adc"]
+        sbc = tables["sbc"]
+
+        def indexed_address(s: InstructionEngine.State, index: int) -> int:
+            low = fetch(s)
+            high = fetch(s)
+            s.carry_in = False
+            low = alu(s, adc, low, s.registers[index])
+            # The microcode latches the status register here so the carry is
+            # visible, but it's always overwritten by the latch at the end of
+            # the instruction, so it isn't modeled.
+            return (alu(s, adc, high, 0) << 8) | low
+
+        def load_program_counter(s: InstructionEngine.State, low: int) -> None:
+            # The high byte is read into program_counter.high in the same step
+            # that increments program_counter, so the increment applies to the
+            # new high byte before the low byte is overwritten.
+            high = s.memory.get(s.program_counter, 0)
+            program_counter = (((high << 8) | (s.program_counter & 0xFF)) + 1) & 0xFFFF
+            s.program_counter = (program_counter & 0xFF00) | low
+
+        def push(s: InstructionEngine.State, value: int) -> None:
+            s.memory[(s.stack_page << 8) | s.stack_pointer] = value
+            s.stack_pointer = (s.stack_pointer - 1) & 0xFF
+
+        def pull(s: InstructionEngine.State) -> int:
+            s.stack_pointer = (s.stack_pointer + 1) & 0xFF
+            return s.memory.get((s.stack_page << 8) | s.stack_pointer, 0)
+
+        def address(s: InstructionEngine.State) -> int:
+            match mode:
+                case AddressingMode.ABSOLUTE:
+                    return fetch_word(s)
+                case AddressingMode.ZERO_PAGE:
+                    return fetch(s)
+                case AddressingMode.INDEX_X:
+                    return indexed_address(s, 1)
+                case AddressingMode.INDEX_Y:
+                    return indexed_address(s, 2)
+                case _:
+                    raise self._error(f"{name} has no address in {mode}.")
+
+        def operand(s: InstructionEngine.State) -> int:
+            if mode == AddressingMode.IMMEDIATE:
+                return fetch(s)
+            return s.memory.get(address(s), 0)
+
+        registers = self._REGISTERS
+        branches = {
+            "beq": ("result_analyzer.zero", False),
+            "bne": ("result_analyzer.zero", True),
+            "bmi": ("result_analyzer.negative", False),
+            "bpl": ("result_analyzer.negative", True),
+            "bcs": ("alu.carry_out", False),
+            "bcc": ("alu.carry_out", True),
+            "bvs": ("alu.overflow", False),
+            "bvc": ("alu.overflow", True),
+        }
+        alu_operations = self._ALU_OPERATION_NAMES
+
+        def nop(s: InstructionEngine.State) -> None:
+            latch(s)
+
+        def hlt(s: InstructionEngine.State) -> None:
+            # hlt disables the status latch so the status can be inspected.
+            s.halt = True
+
+        def transfer(from_: int, to: int) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                s.registers[to] = s.registers[from_]
+                latch(s)
+
+            return handler
+
+        def load(to: int) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                s.registers[to] = s.result = operand(s)
+                latch(s)
+
+            return handler
+
+        def store(from_: int) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                s.memory[address(s)] = s.registers[from_]
+                latch(s)
+
+            return handler
+
+        def jmp(s: InstructionEngine.State) -> None:
+            load_program_counter(s, fetch(s))
+            latch(s)
+
+        def set_carry(value: bool) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                s.carry_in = value
+                latch(s)
+
+            return handler
+
+        def alu_binary(table: OperationTable) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                rhs = operand(s)
+                s.registers[0] = s.result = alu(s, table, s.registers[0], rhs)
+                latch(s)
+
+            return handler
+
+        def alu_unary(table: OperationTable) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                s.registers[0] = s.result = alu(s, table, s.registers[0], 0)
+                latch(s)
+
+            return handler
+
+        def increment(register: int) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                # carry_in.clear is processed after the ALU, so the add sees
+                # the current carry and the carry is cleared afterwards.
+                value = alu(s, adc, s.registers[register], 1)
+                s.carry_in = False
+                s.registers[register] = s.result = value
+                latch(s)
+
+            return handler
+
+        def decrement(register: int) -> InstructionEngine.Handler:
+            def handler(s: InstructionEngine.State) -> None:
+                s.carry_in = True
+                s.registers[register] = s.result = alu(s, sbc, s.registers[register], 1)
+                latch(s)
+
+            return handler
+
+        def cmp(s: InstructionEngine.State) -> None:
+            rhs = operand(s)
+            s.carry_in = True
+            s.result = alu(s, sbc, s.registers[0], rhs)
+            latch(s)
+
+        def branch(status: str, invert: bool) -> InstructionEngine.Handler:
+            mask = masks[status]
+
+            def handler(s: InstructionEngine.State) -> None:
+                if bool(s.status & mask) != invert:
+                    load_program_counter(s, fetch(s))
+                else:
+                    s.program_counter = (s.program_counter + 2) & 0xFFFF
+                latch(s)
+
+            return handler
+
+        def pha(s: InstructionEngine.State) -> None:
+            push(s, s.registers[0])
+            latch(s)
+
+        def pla(s: InstructionEngine.State) -> None:
+            s.registers[0] = pull(s)
+            latch(s)
+
+        def php(s: InstructionEngine.State) -> None:
+            push(s, s.status)
+            latch(s)
+
+        def plp(s: InstructionEngine.State) -> None:
+            # plp disables the status latch because it just pulled the status.
+            s.status = pull(s)
+
+        def jsr(s: InstructionEngine.State) -> None:
+            low = fetch(s)
+            push(s, s.program_counter & 0xFF)
+            push(s, s.program_counter >> 8)
+            load_program_counter(s, low)
+            latch(s)
+
+        def rts(s: InstructionEngine.State) -> None:
+            high = pull(s)
+            low = pull(s)
+            s.program_counter = (((high << 8) | low) + 1) & 0xFFFF
+            latch(s)
+
+        match name:
+            case "nop":
+                return nop
+            case "hlt":
+                return hlt
+            case "tax" | "txa" | "tay" | "tya":
+                return transfer(registers[name[1]], registers[name[2]])
+            case "lda" | "ldx" | "ldy":
+                return load(registers[name[2]])
+            case "sta" | "stx" | "sty":
+                return store(registers[name[2]])
+            case "jmp":
+                return jmp
+            case "sec" | "clc":
+                return set_carry(name == "sec")
+            case "adc" | "sbc" | "and" | "ora" | "eor":
+                return alu_binary(tables[alu_operations[name]])
+            case "asl" | "lsr" | "rol" | "ror":
+                return alu_unary(tables[alu_operations[name]])
+            case "inc" | "inx" | "iny":
+                return increment(registers["a" if name == "inc" else name[2]])
+            case "dec" | "dex" | "dey":
+                return decrement(registers["a" if name == "dec" else name[2]])
+            case "cmp":
+                return cmp
+            case _ if name in branches:
+                return branch(*branches[name])
+            case "pha":
+                return pha
+            case "pla":
+                return pla
+            case "php":
+                return php
+            case "plp":
+                return plp
+            case "jsr":
+                return jsr
+            case "rts":
+                return rts
+            case _:
+                raise self._error(f"No handler for instruction {name}.", self.Error)
+
+
+from flip.components import minimal_computer
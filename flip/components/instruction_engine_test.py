@@ -0,0 +1,144 @@
+import pytest
+
+from flip.bytes import Byte, Word
+from flip.components import Computer, MinimalComputer, instruction_engine
+from flip.components.instruction_engine import InstructionEngine
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x03)
+        .ldy("data")
+        .label("loop")
+        .lda_index_x("data")
+        .adc(0x10)
+        .sta_index_y(0x00FF)
+        .php()
+        .jsr("subroutine")
+        .plp()
+        .dex()
+        .bne("loop")
+        .cmp(0x40)
+        .bcs("done")
+        .eor(0xFF)
+        .label("done")
+        .hlt()
+        .label("subroutine")
+        .pha()
+        .asl()
+        .rol()
+        .sta_zero_page(0xF0)
+        .pla()
+        .inc()
+        .rts()
+        .at(0x0100)
+        .label("data")
+        .data(0x01)
+        .data(0x7F)
+        .data(0x80)
+        .data(0xFF)
+    )
+
+
+def test_run_matches_microcode() -> None:
+    microcode = MinimalComputer()
+    microcode_cycles = microcode.run(_program())
+    instruction = MinimalComputer()
+    instruction_cycles = instruction.run(_program(), engine="instruction")
+    assert instruction_cycles == microcode_cycles
+    assert instruction.cycles == microcode.cycles
+    assert instruction.halt
+    assert instruction.a.value == microcode.a.value
+    assert instruction.x.value == microcode.x.value
+    assert instruction.y.value == microcode.y.value
+    assert instruction.program_counter.value == microcode.program_counter.value
+    assert instruction.stack_pointer.value == microcode.stack_pointer.value
+    assert instruction.controller.status.value == microcode.controller.status.value
+    assert instruction.alu.carry_in == microcode.alu.carry_in
+    assert dict(instruction.memory) == dict(microcode.memory)
+
+
+def test_run_max_cycles() -> None:
+    microcode = MinimalComputer()
+    assert microcode.run(_program(), max_cycles=100) == 100
+    assert not microcode.halt
+    instruction = MinimalComputer()
+    # The instruction engine stops at the first instruction boundary at or
+    # after max_cycles.
+    instruction_cycles = instruction.run(_program(), "instruction", max_cycles=100)
+    assert 100 <= instruction_cycles < 120
+    assert not instruction.halt
+    with pytest.raises(MinimalComputer.Error):
+        MinimalComputer().run(_program(), "verify", max_cycles=100)
+
+
+def test_verify() -> None:
+    computer = MinimalComputer()
+    computer.run(_program(), engine=Computer.Engine.VERIFY)
+    assert computer.halt
+
+
+def test_verify_divergence(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        instruction_engine,
+        "_alu",
+        lambda s, table, lhs, rhs: 0,  # type: ignore
+    )
+    computer = MinimalComputer()
+    computer.load(MinimalComputer.program_builder().lda(0x01).adc(0x01).hlt())
+    divergence = computer.instruction_engine.verify(computer)
+    assert divergence is not None
+    assert divergence.instruction_index == 1
+    assert divergence.name == "adc immediate"
+    assert divergence.address == 0x0002
+    assert divergence.fields["registers"] == ([0x02, 0, 0], [0x00, 0, 0])
+    with pytest.raises(InstructionEngine.DivergenceError):
+        MinimalComputer().run(
+            MinimalComputer.program_builder().lda(0x01).adc(0x01).hlt(),
+            engine="verify",
+        )
+
+
+def test_verify_memory_divergence(monkeypatch: pytest.MonkeyPatch) -> None:
+    def setitem(memory: dict[int, int], address: int, value: int) -> None:
+        dict[int, int].__setitem__(memory, address, value + 1)
+        memory.written.add(address)  # type: ignore
+
+    monkeypatch.setattr(
+        InstructionEngine._Memory, "__setitem__", setitem  # type: ignore
+    )
+    computer = MinimalComputer()
+    computer.load(MinimalComputer.program_builder().lda(0x05).sta(0x0080).hlt())
+    divergence = computer.instruction_engine.verify(computer)
+    assert divergence is not None
+    assert divergence.name == "sta absolute"
+    # Only the written address is compared.
+    assert divergence.fields == {"memory": ({0x0080: 0x05}, {0x0080: 0x06})}
+
+
+def test_unknown_opcode() -> None:
+    computer = MinimalComputer(data={Word(0x0000): Byte(0xFF)})
+    state = InstructionEngine.State.capture(computer)
+    with pytest.raises(InstructionEngine.DecodeError):
+        computer.instruction_engine.step(state)
+
+
+def test_branch_cycles() -> None:
+    computer = MinimalComputer()
+    engine = computer.instruction_engine
+    format = computer.controller.status.format
+    opcode = MinimalComputer.instruction_set().instructions_by_name["beq"].opcodes
+    (beq,) = (opcode.unsigned_value for opcode in opcode)
+    zero = format.encode({"result_analyzer.zero": True}).unsigned_value
+    # header + load the target address vs header + skip the address
+    assert engine.cycles(beq, zero) == 10
+    assert engine.cycles(beq, 0) == 5
+
+
+def test_max_cycles() -> None:
+    computer = MinimalComputer()
+    computer.load(MinimalComputer.program_builder().label("loop").jmp("loop"))
+    state = InstructionEngine.State.capture(computer)
+    assert computer.instruction_engine.run(state, max_cycles=100) == 100
+    assert not state.halt
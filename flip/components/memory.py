@@ -1,12 +1,243 @@
-from typing import Iterator, Mapping, MutableMapping, Optional, override
+import struct
+import sys
+from array import array
+from enum import Enum, auto
+from itertools import compress
+from typing import (
+    Callable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    overload,
+    override,
+)
 
 from flip.bytes import Byte, Word
+from flip.components import trace
 from flip.components.bus import Bus
 from flip.components.component import Component
 from flip.components.control import Control
 from flip.components.word_register import WordRegister
 
 
+class _DenseData(MutableMapping[Word, Byte]):
+    """A flat 64 KiB address space backed by a bytearray.
+
+    Keeps track of which addresses have been written so that it has the same
+    mapping semantics as a dict: unwritten addresses read as 0 but aren't keys.
+    """
+
+    SIZE = 0x10000
+
+    def __init__(self, data: Optional[Mapping[Word, Byte]] = None) -> None:
+        self.bytes = bytearray(self.SIZE)
+        self.present = bytearray(self.SIZE)
+        self.size = 0
+        if data is not None:
+            self.update(data)
+
+    def peek(self, address: int) -> int:
+        return self.bytes[address]
+
+    def poke(self, address: int, value: int) -> None:
+        self.bytes[address] = value & 0xFF
+        if not self.present[address]:
+            self.present[address] = 1
+            self.size += 1
+
+    @overload
+    def get(self, address: Word, /) -> Optional[Byte]: ...
+
+    @overload
+    def get[T](self, address: Word, /, default: Byte | T) -> Byte | T: ...
+
+    @override
+    def get[T](
+        self, address: Word, /, default: Optional[Byte | T] = None
+    ) -> Optional[Byte | T]:
+        value = address.value
+        if self.present[value]:
+            return Byte.of(self.bytes[value])
+        return default
+
+    @override
+    def __len__(self) -> int:
+        return self.size
+
+    @override
+    def __iter__(self) -> Iterator[Word]:
+        return map(Word, compress(range(self.SIZE), self.present))
+
+    @override
+    def __contains__(self, address: object) -> bool:
+        return isinstance(address, Word) and self.present[address.value] == 1
+
+    @override
+    def __getitem__(self, address: Word) -> Byte:
+        value = address.value
+        if not self.present[value]:
+            raise KeyError(address)
+        return Byte.of(self.bytes[value])
+
+    @override
+    def __setitem__(self, address: Word, value: Byte) -> None:
+        self.poke(address.value, value.unsigned_value)
+
+    @override
+    def __delitem__(self, address: Word) -> None:
+        value = address.value
+        if not self.present[value]:
+            raise KeyError(address)
+        self.bytes[value] = 0
+        self.present[value] = 0
+        self.size -= 1
+
+    @override
+    def clear(self) -> None:
+        self.bytes[:] = bytes(self.SIZE)
+        self.present[:] = bytes(self.SIZE)
+        self.size = 0
+
+
+class _Page:
+    """One page of a _PagedData, with the same layout as _DenseData."""
+
+    __slots__ = ("bytes", "present", "size")
+
+    def __init__(self, size: int) -> None:
+        self.bytes = bytearray(size)
+        self.present = bytearray(size)
+        self.size = 0
+
+    def copy(self) -> "_Page":
+        page = _Page(0)
+        page.bytes = self.bytes[:]
+        page.present = self.present[:]
+        page.size = self.size
+        return page
+
+
+class _PagedData(MutableMapping[Word, Byte]):
+    """A 64 KiB address space split into fixed-size pages, shared copy-on-write.
+
+    Pages are only allocated once they're written. fork() returns a copy that
+    shares every page with this one, and whichever of them next writes to a
+    shared page copies it first, so forking costs one list copy no matter how
+    much memory is in use.
+    """
+
+    PAGE_BITS = 8
+    PAGE_SIZE = 1 << PAGE_BITS
+    NUM_PAGES = 0x10000 >> PAGE_BITS
+    _OFFSET_MASK = PAGE_SIZE - 1
+
+    def __init__(self, data: Optional[Mapping[Word, Byte]] = None) -> None:
+        self.pages: list[Optional[_Page]] = [None] * self.NUM_PAGES
+        # Whether each page is exclusively this data's, and so safe to write.
+        self.owned = bytearray(self.NUM_PAGES)
+        self.size = 0
+        if data is not None:
+            self.update(data)
+
+    def fork(self) -> "_PagedData":
+        fork = _PagedData()
+        fork.pages = self.pages[:]
+        fork.size = self.size
+        # Every page is now shared, so both sides copy before writing.
+        self.owned = bytearray(self.NUM_PAGES)
+        return fork
+
+    @property
+    def owned_pages(self) -> int:
+        return self.owned.count(1)
+
+    def __writable(self, index: int) -> _Page:
+        if (page := self.pages[index]) is None:
+            page = self.pages[index] = _Page(self.PAGE_SIZE)
+            self.owned[index] = 1
+        elif not self.owned[index]:
+            page = self.pages[index] = page.copy()
+            self.owned[index] = 1
+        return page
+
+    def peek(self, address: int) -> int:
+        if (page := self.pages[address >> self.PAGE_BITS]) is None:
+            return 0
+        return page.bytes[address & self._OFFSET_MASK]
+
+    def poke(self, address: int, value: int) -> None:
+        page = self.__writable(address >> self.PAGE_BITS)
+        offset = address & self._OFFSET_MASK
+        page.bytes[offset] = value & 0xFF
+        if not page.present[offset]:
+            page.present[offset] = 1
+            page.size += 1
+            self.size += 1
+
+    def __present(self, address: int) -> bool:
+        page = self.pages[address >> self.PAGE_BITS]
+        return page is not None and page.present[address & self._OFFSET_MASK] == 1
+
+    @overload
+    def get(self, address: Word, /) -> Optional[Byte]: ...
+
+    @overload
+    def get[T](self, address: Word, /, default: Byte | T) -> Byte | T: ...
+
+    @override
+    def get[T](
+        self, address: Word, /, default: Optional[Byte | T] = None
+    ) -> Optional[Byte | T]:
+        if self.__present(address.value):
+            return Byte.of(self.peek(address.value))
+        return default
+
+    @override
+    def __len__(self) -> int:
+        return self.size
+
+    @override
+    def __iter__(self) -> Iterator[Word]:
+        for index, page in enumerate(self.pages):
+            if page is not None and page.size:
+                base = index << self.PAGE_BITS
+                for offset in compress(range(self.PAGE_SIZE), page.present):
+                    yield Word.of(base | offset)
+
+    @override
+    def __contains__(self, address: object) -> bool:
+        return isinstance(address, Word) and self.__present(address.value)
+
+    @override
+    def __getitem__(self, address: Word) -> Byte:
+        if not self.__present(address.value):
+            raise KeyError(address)
+        return Byte.of(self.peek(address.value))
+
+    @override
+    def __setitem__(self, address: Word, value: Byte) -> None:
+        self.poke(address.value, value.unsigned_value)
+
+    @override
+    def __delitem__(self, address: Word) -> None:
+        value = address.value
+        if not self.__present(value):
+            raise KeyError(address)
+        page = self.__writable(value >> self.PAGE_BITS)
+        offset = value & self._OFFSET_MASK
+        page.bytes[offset] = 0
+        page.present[offset] = 0
+        page.size -= 1
+        self.size -= 1
+
+    @override
+    def clear(self) -> None:
+        self.pages = [None] * self.NUM_PAGES
+        self.owned = bytearray(self.NUM_PAGES)
+        self.size = 0
+
+
 class Memory(Component, MutableMapping[Word, Byte]):
     class Error(Component.Error): ...
 
@@ -14,12 +245,21 @@ class Memory(Component, MutableMapping[Word, Byte]):
 
     class KeyError(Error, Component.KeyError, KeyError): ...
 
+    class Backend(Enum):
+        # A dict of the addresses that have been written.
+        SPARSE = auto()
+        # A flat 64 KiB bytearray.
+        DENSE = auto()
+        # Fixed-size pages, shared copy-on-write between forks.
+        PAGED = auto()
+
     def __init__(
         self,
         bus: Bus,
         data: Optional[Mapping[Word, Byte]] = None,
         name: Optional[str] = None,
         parent: Optional[Component] = None,
+        backend: "Memory.Backend | str" = Backend.SPARSE,
     ) -> None:
         super().__init__(name=name, parent=parent)
         self.__bus = bus
@@ -27,9 +267,92 @@ class Memory(Component, MutableMapping[Word, Byte]):
         self.__read = Control(name="read", parent=self)
         self.__high_reset = Control(name="high_reset", parent=self)
         self.__address = WordRegister(name="address", bus=bus, parent=self)
-        self.__data: MutableMapping[Word, Byte] = (
-            dict(data) if data is not None else dict()
-        )
+        if isinstance(backend, str):
+            backend = self.Backend[backend.upper()]
+        self.__backend = backend
+        self.__dense: Optional[_DenseData] = None
+        self.__paged: Optional[_PagedData] = None
+        self.__data: MutableMapping[Word, Byte]
+        # The dense or paged data, which can be peeked and poked directly.
+        self.__indexed: Optional[_DenseData | _PagedData] = None
+        match backend:
+            case Memory.Backend.SPARSE:
+                self.__data = dict(data) if data is not None else dict()
+            case Memory.Backend.DENSE:
+                self.__data = self.__indexed = self.__dense = _DenseData(data)
+            case Memory.Backend.PAGED:
+                self.__data = self.__indexed = self.__paged = _PagedData(data)
+        self.__write_listeners = list[Callable[[Word], None]]()
+
+    @override
+    def _copy(self) -> Component:
+        copy = super()._copy()
+        assert isinstance(copy, Memory)
+        match self.__backend:
+            case Memory.Backend.SPARSE:
+                copy.__data = dict(self.__data)
+            case Memory.Backend.DENSE:
+                assert self.__dense is not None
+                copy.__data = copy.__indexed = copy.__dense = _DenseData()
+                copy.__dense.bytes[:] = self.__dense.bytes
+                copy.__dense.present[:] = self.__dense.present
+                copy.__dense.size = self.__dense.size
+            case Memory.Backend.PAGED:
+                assert self.__paged is not None
+                copy.__data = copy.__indexed = copy.__paged = self.__paged.fork()
+        # Listeners belong to whoever registered them on the original.
+        copy.__write_listeners = []
+        return copy
+
+    def add_write_listener(self, listener: Callable[[Word], None]) -> None:
+        """Call listener with the address of every write to this memory."""
+        self.__write_listeners.append(listener)
+
+    def remove_write_listener(self, listener: Callable[[Word], None]) -> None:
+        self.__write_listeners.remove(listener)
+
+    def __notify(self, address: Word) -> None:
+        for listener in self.__write_listeners:
+            listener(address)
+
+    @property
+    def backend(self) -> "Memory.Backend":
+        return self.__backend
+
+    @property
+    def owned_pages(self) -> int:
+        """How many pages a paged memory has allocated or copied since it was
+        last forked, rather than sharing with its fork."""
+        if self.__paged is None:
+            raise self._error(
+                f"Memory backend {self.__backend.name} doesn't have pages.",
+                self.Error,
+            )
+        return self.__paged.owned_pages
+
+    def peek(self, address: int) -> int:
+        """Get the unsigned value at an int address, or 0 if it's unset."""
+        if self.__indexed is not None:
+            return self.__indexed.peek(address)
+        return self.__data.get(Word.of(address), Byte.of(0)).unsigned_value
+
+    def poke(self, address: int, value: int) -> None:
+        """Set the value at an int address."""
+        if self.__indexed is not None:
+            self.__indexed.poke(address, value)
+            if self.__write_listeners:
+                self.__notify(Word.of(address))
+        else:
+            self[Word.of(address)] = Byte.of(value)
+
+    def view(self, start: int = 0, stop: int = 0x10000) -> memoryview:
+        """A read-only zero-copy view of [start, stop) of a dense memory."""
+        if self.__dense is None:
+            raise self._error(
+                f"Memory backend {self.__backend.name} doesn't support views.",
+                self.Error,
+            )
+        return memoryview(self.__dense.bytes).toreadonly()[start:stop]
 
     @property
     def address(self) -> Word:
@@ -41,7 +364,7 @@ class Memory(Component, MutableMapping[Word, Byte]):
 
     @property
     def value(self) -> Byte:
-        return self.__data.get(self.address, Byte(0))
+        return self.__data.get(self.address, Byte.of(0))
 
     @value.setter
     def value(self, value: Byte) -> None:
@@ -65,6 +388,8 @@ class Memory(Component, MutableMapping[Word, Byte]):
     @override
     def __setitem__(self, address: Word, value: Byte) -> None:
         self.__data[address] = value
+        if self.__write_listeners:
+            self.__notify(address)
 
     @override
     def __delitem__(self, address: Word) -> None:
@@ -72,6 +397,15 @@ class Memory(Component, MutableMapping[Word, Byte]):
             del self.__data[address]
         except KeyError as e:
             raise self._error(f"Address {address} not found.", self.KeyError) from e
+        if self.__write_listeners:
+            self.__notify(address)
+
+    @override
+    def clear(self) -> None:
+        addresses = list(self.__data) if self.__write_listeners else []
+        self.__data.clear()
+        for address in addresses:
+            self.__notify(address)
 
     @property
     def read(self) -> bool:
@@ -94,15 +428,117 @@ class Memory(Component, MutableMapping[Word, Byte]):
         if self.read:
             if (value := self.__bus.value) is None:
                 raise self._error("trying to read open bus", self.ReadError)
-            self._log(f"reading {value} from bus to address {self.address}")
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.MemoryRead(
+                        path=self.path,
+                        address=self.address.value,
+                        value=value.unsigned_value,
+                    )
+                )
             self.value = value
 
     @override
     def _tick_write(self) -> None:
         if self.write:
             value = self.value
-            self._log(f"writing {value} to bus from address {self.address}")
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.MemoryWrite(
+                        path=self.path,
+                        address=self.address.value,
+                        value=value.unsigned_value,
+                    )
+                )
             self.__bus.set(value, self)
 
+    # Header of packed memory: format and number of written addresses.
+    _PACK_HEADER = struct.Struct("<BI")
+    _PACK_SPARSE = 0
+    _PACK_DENSE = 1
+
+    def pack(self) -> bytes:
+        """The written addresses and their values, in a compact binary form.
+
+        Sparse memories pack each written address and value, and dense ones
+        pack their whole address space, so either is a straight copy to
+        unpack.
+        """
+        if (dense := self.__dense) is not None:
+            return (
+                self._PACK_HEADER.pack(self._PACK_DENSE, dense.size)
+                + dense.present
+                + dense.bytes
+            )
+        addresses = array("H", [address.value for address in self.__data])
+        if sys.byteorder == "big":  # pragma: no cover
+            addresses.byteswap()
+        return (
+            self._PACK_HEADER.pack(self._PACK_SPARSE, len(addresses))
+            + addresses.tobytes()
+            + bytes([value.unsigned_value for value in self.__data.values()])
+        )
+
+    def unpack(self, data: bytes | memoryview, offset: int = 0) -> int:
+        """Replace the contents with data packed by pack at offset.
+
+        Returns the offset of the end of the packed data.
+        """
+        data = memoryview(data)
+        try:
+            format, count = self._PACK_HEADER.unpack_from(data, offset)
+        except struct.error as e:
+            raise self._error("Truncated packed memory.", self.Error) from e
+        offset += self._PACK_HEADER.size
+        match format:
+            case self._PACK_SPARSE:
+                end = offset + 3 * count
+            case self._PACK_DENSE:
+                end = offset + 2 * _DenseData.SIZE
+            case _:
+                raise self._error(f"Unknown packed memory format {format}.", self.Error)
+        if len(data) < end:
+            raise self._error("Truncated packed memory.", self.Error)
+        self.clear()
+        if format == self._PACK_SPARSE:
+            self.__unpack_sparse(data[offset:end], count)
+        else:
+            self.__unpack_dense(data[offset:end], count)
+        if self.__write_listeners:
+            for address in list(self.__data):
+                self.__notify(address)
+        return end
+
+    def __unpack_sparse(self, data: memoryview, count: int) -> None:
+        addresses = array("H")
+        addresses.frombytes(data[: 2 * count])
+        if sys.byteorder == "big":  # pragma: no cover
+            addresses.byteswap()
+        values = data[2 * count :]
+        if (indexed := self.__indexed) is not None:
+            for address, value in zip(addresses, values, strict=True):
+                indexed.poke(address, value)
+        else:
+            self.__data.update(
+                (Word.of(address), Byte.of(value))
+                for address, value in zip(addresses, values, strict=True)
+            )
+
+    def __unpack_dense(self, data: memoryview, count: int) -> None:
+        present = data[: _DenseData.SIZE]
+        values = data[_DenseData.SIZE :]
+        if (dense := self.__dense) is not None:
+            dense.present[:] = present
+            dense.bytes[:] = values
+            dense.size = count
+        else:
+            self.__data.update(
+                (Word.of(address), Byte.of(values[address]))
+                for address in compress(range(_DenseData.SIZE), present)
+            )
+
     def load(self, data: Mapping[Word, Byte]) -> None:
-        self.__data = dict(self.__data) | dict(data)
+        self.__data.update(data)
+        if self.__write_listeners:
+            for address in data:
+                self.__notify(address)
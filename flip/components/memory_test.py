@@ -1,7 +1,8 @@
 import pytest
+from pytest_subtests import SubTests
 
 from flip.bytes import Byte, Word
-from flip.components import Bus, Component, Memory, Register
+from flip.components import Bus, Component, Memory, MinimalComputer, Register
 
 
 def test_ctor() -> None:
@@ -102,3 +103,155 @@ def test_load() -> None:
     assert memory[Word(0x1234)] == Byte(0x56)
     memory.load({Word(0x1234): Byte(0x78)})
     assert memory[Word(0x1234)] == Byte(0x78)
+
+
+def test_write_listener() -> None:
+    bus = Bus(name="bus")
+    memory = Memory(name="memory", bus=bus, parent=bus)
+    writes = list[Word]()
+    memory.add_write_listener(writes.append)
+    memory[Word(0x1234)] = Byte(0x56)
+    memory.load({Word(0x1235): Byte(0x57)})
+    del memory[Word(0x1234)]
+    assert writes == [Word(0x1234), Word(0x1235), Word(0x1234)]
+    memory.remove_write_listener(writes.append)
+    memory[Word(0x1234)] = Byte(0x56)
+    assert len(writes) == 3
+
+
+def test_dense() -> None:
+    bus = Bus(name="bus")
+    memory = Memory(
+        name="memory", bus=bus, parent=bus, data={Word(0): Byte(1)}, backend="dense"
+    )
+    assert memory.backend == Memory.Backend.DENSE
+    assert len(memory) == 1
+    assert dict(memory) == {Word(0): Byte(1)}
+    assert Word(1) not in memory
+    with pytest.raises(Memory.KeyError):
+        memory[Word(1)]
+    memory.address = Word(0xFFFF)
+    assert memory.value == Byte(0)
+    memory.value = Byte(0x56)
+    assert dict(memory) == {Word(0): Byte(1), Word(0xFFFF): Byte(0x56)}
+    del memory[Word(0)]
+    assert dict(memory) == {Word(0xFFFF): Byte(0x56)}
+    with pytest.raises(Memory.KeyError):
+        del memory[Word(0)]
+    memory.clear()
+    assert len(memory) == 0
+    assert memory.peek(0xFFFF) == 0
+
+
+def test_paged() -> None:
+    bus = Bus(name="bus")
+    memory = Memory(
+        name="memory", bus=bus, parent=bus, data={Word(0): Byte(1)}, backend="paged"
+    )
+    assert memory.backend == Memory.Backend.PAGED
+    assert memory.owned_pages == 1
+    assert dict(memory) == {Word(0): Byte(1)}
+    assert Word(1) not in memory
+    with pytest.raises(Memory.KeyError):
+        memory[Word(1)]
+    memory.address = Word(0xFFFF)
+    assert memory.value == Byte(0)
+    memory.value = Byte(0x56)
+    assert memory.owned_pages == 2
+    assert dict(memory) == {Word(0): Byte(1), Word(0xFFFF): Byte(0x56)}
+    del memory[Word(0)]
+    assert dict(memory) == {Word(0xFFFF): Byte(0x56)}
+    with pytest.raises(Memory.KeyError):
+        del memory[Word(0)]
+    memory.clear()
+    assert len(memory) == 0
+    assert memory.owned_pages == 0
+    assert memory.peek(0xFFFF) == 0
+    with pytest.raises(Memory.Error):
+        assert Memory(name="sparse", bus=bus, parent=bus).owned_pages
+
+
+def test_peek_poke(subtests: SubTests) -> None:
+    for backend in Memory.Backend:
+        with subtests.test(backend=backend):
+            bus = Bus(name="bus")
+            memory = Memory(name="memory", bus=bus, parent=bus, backend=backend)
+            writes = list[Word]()
+            memory.add_write_listener(writes.append)
+            assert memory.peek(0x1234) == 0
+            memory.poke(0x1234, 0x156)
+            assert memory.peek(0x1234) == 0x56
+            assert dict(memory) == {Word(0x1234): Byte(0x56)}
+            assert writes == [Word(0x1234)]
+
+
+def test_view() -> None:
+    bus = Bus(name="bus")
+    memory = Memory(name="memory", bus=bus, parent=bus, backend="dense")
+    view = memory.view(0x1000, 0x1004)
+    memory.load({Word(0x1001): Byte(0x56)})
+    memory.poke(0x1003, 0x78)
+    assert bytes(view) == b"\x00\x56\x00\x78"
+    assert len(memory.view()) == 0x10000
+    with pytest.raises(TypeError):
+        view[0] = 1
+
+
+def test_view_sparse() -> None:
+    bus = Bus(name="bus")
+    memory = Memory(name="memory", bus=bus, parent=bus)
+    with pytest.raises(Memory.Error):
+        memory.view()
+
+
+def test_dense_computer() -> None:
+    program = (
+        MinimalComputer.program_builder()
+        .ldx(0x04)
+        .label("loop")
+        .txa()
+        .sta_index_x(0xFFF0)
+        .pha()
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+    sparse = MinimalComputer()
+    sparse.run(program)
+    dense = MinimalComputer(memory_backend=Memory.Backend.DENSE)
+    assert dense.memory.backend == Memory.Backend.DENSE
+    dense.run(program)
+    assert dict(dense.memory) == dict(sparse.memory)
+
+
+def test_pack_unpack(subtests: SubTests) -> None:
+    data = {
+        Word(0x0000): Byte(0x12),
+        Word(0x1234): Byte(0x00),
+        Word(0xFFFF): Byte(0xFF),
+    }
+    for source in Memory.Backend:
+        for destination in Memory.Backend:
+            with subtests.test(source=source, destination=destination):
+                bus = Bus(name="bus")
+                memory = Memory(name="memory", bus=bus, parent=bus, backend=source)
+                memory.load(data)
+                packed = b"\x01" + memory.pack()
+                other = Memory(name="other", bus=bus, parent=bus, backend=destination)
+                other.load({Word(0x0001): Byte(0x34)})
+                writes = list[Word]()
+                other.add_write_listener(writes.append)
+                assert other.unpack(packed, 1) == len(packed)
+                assert dict(other) == data
+                assert set(writes) == set(data) | {Word(0x0001)}
+
+
+def test_unpack_invalid() -> None:
+    bus = Bus(name="bus")
+    memory = Memory(name="memory", bus=bus, parent=bus)
+    memory.load({Word(0x0001): Byte(0x34)})
+    packed = memory.pack()
+    for data in (packed[:2], packed[:-1], b"\x02" + packed[1:]):
+        with pytest.raises(Memory.Error):
+            memory.unpack(data)
+    assert dict(memory) == {Word(0x0001): Byte(0x34)}
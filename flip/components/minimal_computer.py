@@ -2,8 +2,11 @@ from functools import cache
 from typing import Callable, Iterable, Mapping, Optional, Self, Union, override
 
 from flip.bytes import Byte, Word
+from flip.components.block_cache import BlockCache
 from flip.components.component import Component
 from flip.components.computer import Computer
+from flip.components.instruction_engine import InstructionEngine
+from flip.components.memory import Memory
 from flip.components.register import Register
 from flip.components.stack_pointer import StackPointer
 from flip.instructions import InstructionImpl, InstructionMode, InstructionSet, Step
@@ -1026,11 +1029,13 @@ class MinimalComputer(Computer):
         children: Optional[Iterable[Component]] = None,
         data: Optional[Mapping[Word, Byte] | Program | ProgramBuilder] = None,
         stack_address_high_value: Optional[Byte] = None,
+        memory_backend: Memory.Backend | str = Memory.Backend.SPARSE,
     ) -> None:
         super().__init__(
             name=name,
             children=children,
             data=data,
+            memory_backend=memory_backend,
         )
         self.__a = self._create_register("a")
         self.__x = self._create_register("x")
@@ -1052,6 +1057,55 @@ class MinimalComputer(Computer):
                 else Byte(0x01)
             ),
         )
+        self.__instruction_engine: Optional[InstructionEngine] = None
+        self.__block_cache: Optional[BlockCache] = None
+
+    @override
+    def _copy(self) -> Component:
+        copy = super()._copy()
+        assert isinstance(copy, MinimalComputer)
+        # Cached blocks are invalidated by writes to this computer's memory.
+        copy.__block_cache = None
+        return copy
+
+    @property
+    def instruction_engine(self) -> InstructionEngine:
+        if self.__instruction_engine is None:
+            self.__instruction_engine = InstructionEngine(
+                instruction_set=self.instruction_set(),
+                instruction_memory=self.controller.instruction_memory,
+                status_format=self.controller.status.format,
+                operation_set=self.alu.operation_set,
+            )
+        return self.__instruction_engine
+
+    @property
+    def block_cache(self) -> BlockCache:
+        if self.__block_cache is None:
+            block_cache = BlockCache(self.instruction_engine)
+            self.memory.add_write_listener(
+                lambda address: block_cache.invalidate(address.value)
+            )
+            self.__block_cache = block_cache
+        return self.__block_cache
+
+    @override
+    def _run_instruction_engine(
+        self, verify: bool, max_cycles: Optional[int] = None
+    ) -> None:
+        if self.controller.step_counter.value.unsigned_value != 0:
+            raise self._error(
+                "Can't run the instruction engine mid-instruction.", self.Error
+            )
+        if verify:
+            if max_cycles is not None:
+                raise self._error("Can't verify with max_cycles.", self.Error)
+            if (divergence := self.instruction_engine.verify(self)) is not None:
+                raise self._error(str(divergence), InstructionEngine.DivergenceError)
+        else:
+            state = InstructionEngine.State.capture(self)
+            self.cycles += self.block_cache.run(state, max_cycles)
+            state.store(self)
 
     @property
     def a(self) -> Register:
@@ -1,7 +1,7 @@
 from pytest_subtests import SubTests
 
 from flip.bytes import Byte, Word
-from flip.components import MinimalComputer
+from flip.components import Memory, MinimalComputer
 from flip.programs import Program
 
 
@@ -1270,3 +1270,75 @@ def test_nested_jsr() -> None:
     )
     assert computer.a.value == Byte(0x03)
     assert computer.x.value == Byte(0x02)
+
+
+def test_fork(subtests: SubTests) -> None:
+    program = (
+        MinimalComputer.program_builder()
+        .ldx(0x04)
+        .label("loop")
+        .txa()
+        .sta_index_x(0x0200)
+        .pha()
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+    expected = MinimalComputer(data=program)
+    expected.tick_until_halt()
+    for backend in Memory.Backend:
+        with subtests.test(backend=backend):
+            parent = MinimalComputer(data=program, memory_backend=backend)
+            for _ in range(30):
+                parent.tick()
+            fork = parent.fork()
+            assert fork is not parent
+            assert fork.snapshot() == parent.snapshot()
+            fork.validate()
+            # The fork carries on from the same state without affecting its
+            # parent, and vice versa.
+            fork.tick_until_halt()
+            assert fork.a.value == expected.a.value
+            assert fork.cycles == expected.cycles
+            assert dict(fork.memory) == dict(expected.memory)
+            assert not parent.halt
+            assert parent.cycles == 30
+            parent.x.value = Byte(0x01)
+            parent.a.write = True
+            assert fork.x.value == Byte(0x00)
+            assert not fork.a.write
+
+
+def test_fork_shares_pages() -> None:
+    parent = MinimalComputer(
+        data={Word(0x0000): Byte(0x01), Word(0x1000): Byte(0x02)},
+        memory_backend="paged",
+    )
+    assert parent.memory.owned_pages == 2
+    fork = parent.fork()
+    assert parent.memory.owned_pages == 0
+    assert fork.memory.owned_pages == 0
+    fork.memory[Word(0x1001)] = Byte(0x03)
+    assert fork.memory.owned_pages == 1
+    assert Word(0x1001) not in parent.memory
+    parent.memory[Word(0x1000)] = Byte(0x04)
+    assert parent.memory.owned_pages == 1
+    assert fork.memory[Word(0x1000)] == Byte(0x02)
+
+
+def test_fork_instruction_engine() -> None:
+    program = MinimalComputer.program_builder().lda(0x01).sta(0x0300).hlt()
+    parent = MinimalComputer(data=program)
+    block_cache = parent.block_cache
+    fork = parent.fork()
+    assert fork.block_cache is not block_cache
+    fork.run(program, engine="instruction")
+    assert fork.memory[Word(0x0300)] == Byte(0x01)
+    assert not parent.halt
+
+
+def test_fork_before_tick() -> None:
+    program = MinimalComputer.program_builder().lda(0x01).adc(0x02).hlt()
+    fork = MinimalComputer(data=program).fork()
+    fork.tick_until_halt()
+    assert fork.a.value == Byte(0x03)
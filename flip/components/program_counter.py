@@ -1,6 +1,7 @@
 from typing import Optional, override
 
 from flip.bytes import Word
+from flip.components import trace
 from flip.components.bus import Bus
 from flip.components.component import Component
 from flip.components.control import Control
@@ -37,8 +38,10 @@ class ProgramCounter(WordRegister):
     @override
     def _tick_process(self) -> None:
         if self.reset:
-            self.value = Word(0)
-            self._log(f"reset to {self.value}")
+            self.value = Word.of(0)
+            if (tracer := self._tracer) is not None:
+                tracer.emit(trace.RegisterReset(path=self.path, value=0))
         elif self.increment:
-            self.value = Word(self.value.value + 1)
-            self._log(f"incremented to {self.value}")
+            self.value = Word.of(self.value.value + 1)
+            if (tracer := self._tracer) is not None:
+                tracer.emit(trace.Increment(path=self.path, value=self.value.value))
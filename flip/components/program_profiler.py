@@ -0,0 +1,239 @@
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Mapping, Optional
+
+from flip.bytes import Word
+from flip.instructions import InstructionSet
+
+
+class ProgramProfiler:
+    """Profiles where a guest program spends its cycles.
+
+    Pass one to Computer.tick_until_halt, which calls before_tick before each
+    tick and finish once the computer halts. The profiler only looks at the
+    step counter and program counter between ticks: an instruction starts on
+    each tick with step index 0, at the address in the program counter, and
+    its opcode is the instruction buffer once the next instruction starts.
+    Each instruction's cycles are counted against its opcode, its address and
+    the subroutine it's in.
+
+    Subroutines are followed through jsr and rts: a jsr enters the subroutine
+    at the address the program counter holds after it, and an rts returns to
+    the caller. Exclusive cycles are those of the subroutine's own
+    instructions, including the rts, and inclusive cycles add those of
+    everything it calls. The jsr itself counts against the caller.
+    Cycles before the first instruction boundary aren't counted.
+    """
+
+    @dataclass(kw_only=True)
+    class _Frame:
+        function: int
+        # The address of the jsr that called this frame.
+        call_site: int
+        entry_cycles: int
+
+    def __init__(
+        self,
+        instruction_set: InstructionSet,
+        labels: Optional[Mapping[str, int | Word]] = None,
+    ) -> None:
+        """Create a profiler for programs of an instruction set.
+
+        labels name subroutines in reports by the address they start at.
+        """
+        self.__names = dict[int, str]()
+        self.__calls = frozenset[int]()
+        self.__returns = frozenset[int]()
+        for instruction in instruction_set:
+            for mode in instruction:
+                opcode = mode.opcode.unsigned_value
+                self.__names[opcode] = f"{instruction.name} {mode.mode.name.lower()}"
+                if instruction.name == "jsr":
+                    self.__calls |= {opcode}
+                elif instruction.name == "rts":
+                    self.__returns |= {opcode}
+        self.__labels = {
+            address if isinstance(address, int) else address.value: name
+            for name, address in (labels or {}).items()
+        }
+        self.__opcode_cycles = Counter[int]()
+        self.__opcode_counts = Counter[int]()
+        self.__pc_cycles = Counter[int]()
+        # Exclusive cycles by function and address.
+        self.__function_pc_cycles = Counter[tuple[int, int]]()
+        self.__inclusive = Counter[int]()
+        # Calls and inclusive cycles by caller, call site and callee.
+        self.__call_counts = Counter[tuple[int, int, int]]()
+        self.__call_cycles = Counter[tuple[int, int, int]]()
+        self.__stack = list[ProgramProfiler._Frame]()
+        self.__pc: Optional[int] = None
+        self.__start = 0
+        self.__now = 0
+        self.__cycles = 0
+
+    @property
+    def cycles(self) -> int:
+        """The number of cycles counted."""
+        return self.__cycles
+
+    def before_tick(self, computer: "computer.Computer") -> None:
+        """Called by the computer between ticks."""
+        if computer.controller.step_counter.value.unsigned_value != 0:
+            return
+        cycles = self.__now = computer.cycles
+        pc = computer.program_counter.value.value
+        if self.__pc is not None:
+            self.__retire(
+                computer.controller.instruction_buffer.value.unsigned_value,
+                cycles,
+                pc,
+            )
+        elif not self.__stack:
+            self.__stack.append(
+                self._Frame(function=pc, call_site=pc, entry_cycles=cycles)
+            )
+        self.__pc = pc
+        self.__start = cycles
+
+    def finish(self, computer: "computer.Computer") -> None:
+        """Called by the computer when it halts, to count the last instruction."""
+        if self.__pc is None:
+            return
+        self.__now = computer.cycles
+        self.__retire(
+            computer.controller.instruction_buffer.value.unsigned_value,
+            computer.cycles,
+            None,
+        )
+        self.__pc = None
+
+    def __retire(self, opcode: int, cycles: int, next_pc: Optional[int]) -> None:
+        assert self.__pc is not None
+        pc = self.__pc
+        spent = cycles - self.__start
+        self.__cycles += spent
+        self.__opcode_cycles[opcode] += spent
+        self.__opcode_counts[opcode] += 1
+        self.__pc_cycles[pc] += spent
+        frame = self.__stack[-1]
+        self.__function_pc_cycles[frame.function, pc] += spent
+        if opcode in self.__calls and next_pc is not None:
+            self.__stack.append(
+                self._Frame(function=next_pc, call_site=pc, entry_cycles=cycles)
+            )
+        elif opcode in self.__returns and len(self.__stack) > 1:
+            self.__stack.pop()
+            self.__count_call(frame, self.__stack[-1], cycles)
+
+    def __count_call(
+        self,
+        frame: "ProgramProfiler._Frame",
+        caller: "ProgramProfiler._Frame",
+        end: int,
+    ) -> None:
+        key = (caller.function, frame.call_site, frame.function)
+        self.__call_counts[key] += 1
+        self.__call_cycles[key] += end - frame.entry_cycles
+        # Recursive frames only count once towards their function.
+        if all(f.function != frame.function for f in self.__stack):
+            self.__inclusive[frame.function] += end - frame.entry_cycles
+
+    def name(self, address: int) -> str:
+        """The name of the subroutine starting at an address."""
+        return self.__labels.get(address, f"0x{address:04X}")
+
+    def opcode_name(self, opcode: int) -> str:
+        """The instruction name and addressing mode of an opcode."""
+        return self.__names.get(opcode, f"0x{opcode:02X}")
+
+    @property
+    def opcodes(self) -> Mapping[int, tuple[int, int]]:
+        """Count and cycles of each opcode retired."""
+        return {
+            opcode: (self.__opcode_counts[opcode], cycles)
+            for opcode, cycles in self.__opcode_cycles.items()
+        }
+
+    @property
+    def pcs(self) -> Mapping[int, int]:
+        """Cycles of the instructions at each address."""
+        return dict(self.__pc_cycles)
+
+    @property
+    def subroutines(self) -> Mapping[int, tuple[int, int, int]]:
+        """Calls, inclusive cycles and exclusive cycles of each subroutine.
+
+        The outermost frame, where the profile started, is included with zero
+        calls, and its inclusive cycles are every cycle counted.
+        """
+        exclusive = Counter[int]()
+        for (function, _), cycles in self.__function_pc_cycles.items():
+            exclusive[function] += cycles
+        calls = Counter[int]()
+        for (_, _, callee), count in self.__call_counts.items():
+            calls[callee] += count
+        inclusive = Counter(self.__inclusive)
+        # Frames that haven't returned yet count up to now.
+        open_ = set[int]()
+        for frame in self.__stack[1:]:
+            if frame.function not in open_:
+                open_.add(frame.function)
+                inclusive[frame.function] += self.__now - frame.entry_cycles
+        if self.__stack:
+            inclusive[self.__stack[0].function] = self.__cycles
+        return {
+            function: (calls[function], inclusive[function], exclusive[function])
+            for function in exclusive.keys() | inclusive.keys()
+        }
+
+    def report(self, top: int = 20) -> str:
+        """A text report of the hottest opcodes, addresses and subroutines."""
+        total = self.__cycles or 1
+        lines = [f"{self.__cycles} cycles", "", "opcode  count  cycles  %"]
+        for opcode, (count, cycles) in sorted(
+            self.opcodes.items(), key=lambda item: (-item[1][1], item[0])
+        )[:top]:
+            lines.append(
+                f"{self.opcode_name(opcode)}  {count}  {cycles}  "
+                f"{100 * cycles / total:.1f}"
+            )
+        lines += ["", "address  cycles  %"]
+        for pc, cycles in sorted(
+            self.__pc_cycles.items(), key=lambda item: (-item[1], item[0])
+        )[:top]:
+            lines.append(f"0x{pc:04X}  {cycles}  {100 * cycles / total:.1f}")
+        lines += ["", "subroutine  calls  inclusive  exclusive"]
+        for function, (calls, inclusive, exclusive) in sorted(
+            self.subroutines.items(), key=lambda item: (-item[1][1], item[0])
+        )[:top]:
+            lines.append(f"{self.name(function)}  {calls}  {inclusive}  {exclusive}")
+        return "\n".join(lines)
+
+    def write_callgrind(self, file: str | Path | IO[str]) -> None:
+        """Write the profile in callgrind format, with addresses as lines."""
+        if isinstance(file, (str, Path)):
+            with open(file, "w") as f:
+                self.write_callgrind(f)
+            return
+        file.write("# callgrind format\nversion: 1\ncreator: flip\n")
+        file.write("positions: line\nevents: Cycles\n")
+        file.write(f"summary: {self.__cycles}\n\nfl=program\n")
+        functions = sorted(
+            {function for function, _ in self.__function_pc_cycles}
+            | {key[0] for key in self.__call_counts}
+        )
+        for function in functions:
+            file.write(f"\nfn={self.name(function)}\n")
+            for (f, pc), cycles in sorted(self.__function_pc_cycles.items()):
+                if f == function:
+                    file.write(f"{pc} {cycles}\n")
+            for key, count in sorted(self.__call_counts.items()):
+                caller, call_site, callee = key
+                if caller == function:
+                    file.write(f"cfn={self.name(callee)}\n")
+                    file.write(f"calls={count} {callee}\n")
+                    file.write(f"{call_site} {self.__call_cycles[key]}\n")
+
+
+from flip.components import computer
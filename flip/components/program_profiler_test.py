@@ -0,0 +1,113 @@
+import io
+from pathlib import Path
+
+from flip.bytes import Word
+from flip.components import MinimalComputer
+from flip.components.program_profiler import ProgramProfiler
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x03)  # 0x0000
+        .label("loop")
+        .jsr("outer")  # 0x0002
+        .dex()  # 0x0005
+        .bne("loop")  # 0x0006
+        .hlt()  # 0x0009
+        .label("outer")
+        .jsr("inner")  # 0x000A
+        .rts()  # 0x000D
+        .label("inner")
+        .ror()  # 0x000E
+        .rts()  # 0x000F
+    )
+
+
+def _profile(**kwargs: int) -> tuple[MinimalComputer, ProgramProfiler]:
+    computer = MinimalComputer(data=_program())
+    profiler = ProgramProfiler(
+        MinimalComputer.instruction_set(),
+        labels={"outer": 0x000A, "inner": Word(0x000E)},
+    )
+    computer.tick_until_halt(profiler=profiler, **kwargs)
+    return computer, profiler
+
+
+def test_opcodes_and_pcs() -> None:
+    computer, profiler = _profile()
+    assert profiler.cycles == computer.cycles
+    assert sum(cycles for _, cycles in profiler.opcodes.values()) == computer.cycles
+    assert sum(profiler.pcs.values()) == computer.cycles
+    counts = {
+        profiler.opcode_name(opcode): count
+        for opcode, (count, _) in profiler.opcodes.items()
+    }
+    assert counts == {
+        "ldx immediate": 1,
+        "jsr absolute": 6,
+        "dex none": 3,
+        "bne absolute": 3,
+        "hlt none": 1,
+        "rts none": 6,
+        "ror none": 3,
+    }
+    assert set(profiler.pcs) == {0x00, 0x02, 0x05, 0x06, 0x09, 0x0A, 0x0D, 0x0E, 0x0F}
+
+
+def test_subroutines() -> None:
+    computer, profiler = _profile()
+    subroutines = profiler.subroutines
+    pcs = profiler.pcs
+    calls, inclusive, exclusive = subroutines[0x000E]
+    assert calls == 3
+    assert exclusive == inclusive == pcs[0x0E] + pcs[0x0F]
+    calls, inclusive, exclusive = subroutines[0x000A]
+    assert calls == 3
+    assert exclusive == pcs[0x0A] + pcs[0x0D]
+    assert inclusive == exclusive + subroutines[0x000E][1]
+    calls, inclusive, exclusive = subroutines[0x0000]
+    assert calls == 0
+    assert inclusive == computer.cycles
+    assert exclusive == computer.cycles - subroutines[0x000A][1]
+    report = profiler.report()
+    assert report.startswith(f"{computer.cycles} cycles")
+    assert "outer  3" in report
+    assert "inner  3" in report
+
+
+def test_max_cycles() -> None:
+    computer, profiler = _profile(max_cycles=40)
+    assert not computer.halt
+    assert 0 < profiler.cycles <= 40
+    # Still inside outer, which counts up to the last boundary.
+    assert profiler.subroutines[0x000A][1] > 0
+    computer.tick_until_halt(profiler=profiler)
+    _, expected = _profile()
+    assert profiler.subroutines == expected.subroutines
+    assert profiler.opcodes == expected.opcodes
+
+
+def test_callgrind(tmp_path: Path) -> None:
+    _, profiler = _profile()
+    stream = io.StringIO()
+    profiler.write_callgrind(stream)
+    text = stream.getvalue()
+    assert "events: Cycles" in text
+    assert f"summary: {profiler.cycles}" in text
+    assert "fn=outer" in text
+    assert "cfn=inner\ncalls=3 14\n10 " in text
+    path = tmp_path / "callgrind.out"
+    profiler.write_callgrind(path)
+    assert path.read_text() == text
+    # Every line cost adds up to the total.
+    total = 0
+    called = False
+    for line in text.splitlines():
+        if line.startswith("calls="):
+            called = True
+        elif line[:1].isdigit():
+            if not called:
+                total += int(line.split()[1])
+            called = False
+    assert total == profiler.cycles
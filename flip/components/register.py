@@ -1,7 +1,7 @@
 from typing import Optional, override
 
 from flip.bytes import Byte
-from flip.components import component
+from flip.components import component, trace
 from flip.components.bus import Bus
 from flip.components.control import Control
 
@@ -20,7 +20,7 @@ class Register(component.Component):
     ) -> None:
         super().__init__(name=name, parent=parent)
         self.__bus = bus
-        self.__value = value if value is not None else Byte(0)
+        self.__value = value if value is not None else Byte.of(0)
         self.__write = Control(name="write", parent=self)
         self.__read = Control(name="read", parent=self)
         self.__reset = Control(name="reset", parent=self)
@@ -64,7 +64,10 @@ class Register(component.Component):
     @override
     def _tick_write(self) -> None:
         if self.write:
-            self._log(f"writing {self.value} to bus")
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.BusWrite(path=self.path, value=self.value.unsigned_value)
+                )
             self.bus.set(self.value, self)
 
     @override
@@ -72,11 +75,15 @@ class Register(component.Component):
         if self.read:
             if (value := self.bus.value) is None:
                 raise self._error(f"Reading open bus on {self.path}.", self.ReadError)
-            self._log(f"reading {value} from bus")
+            if (tracer := self._tracer) is not None:
+                tracer.emit(
+                    trace.RegisterRead(path=self.path, value=value.unsigned_value)
+                )
             self.value = value
 
     @override
     def _tick_process(self) -> None:
         if self.reset:
-            self.value = Byte(0)
-            self._log(f"reset to {self.value}")
+            self.value = Byte.of(0)
+            if (tracer := self._tracer) is not None:
+                tracer.emit(trace.RegisterReset(path=self.path, value=0))
@@ -39,6 +39,10 @@ class ResultAnalyzer(Register):
     @override
     def _tick_process(self) -> None:
         super()._tick_process()
+        self.update_statuses()
+
+    def update_statuses(self) -> None:
+        """Update the statuses from the current value."""
         value = self.value.unsigned_value
         self.__zero.value = value == 0
         self.__negative.value = value & 0x80 != 0
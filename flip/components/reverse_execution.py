@@ -0,0 +1,158 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Generator, Optional
+
+from flip.core import Error, Errorable
+
+
+class ReverseExecution(Errorable):
+    """Steps a computer backwards with checkpoints and deterministic replay.
+
+    While enabled, the computer takes a snapshot every interval ticks and
+    keeps them in a ring, evicting the oldest once they take more than
+    max_bytes. Going back to an earlier cycle restores the latest checkpoint
+    at or before it and replays ticks forward, which lands in exactly the
+    state the computer was in, since ticks are deterministic.
+
+    Replayed ticks have already been seen, so they aren't traced, recorded
+    or checkpointed again. Replay only reproduces ticks, so changes made to
+    the computer any other way, such as loading memory or running an
+    instruction engine, should be followed by checkpoint().
+    """
+
+    class Error(Error): ...
+
+    def __init__(
+        self,
+        computer: "computer.Computer",
+        interval: int = 1000,
+        max_bytes: int = 1 << 26,
+    ) -> None:
+        if interval < 1:
+            raise self._error(f"Invalid interval {interval}.", self.Error)
+        if max_bytes < 1:
+            raise self._error(f"Invalid max_bytes {max_bytes}.", self.Error)
+        self.__computer = computer
+        self.__interval = interval
+        self.__max_bytes = max_bytes
+        # (cycles, snapshot) pairs in increasing cycle order.
+        self.__checkpoints: deque[tuple[int, bytes]] = deque()
+        self.__num_bytes = 0
+        self.__replaying = False
+        self.checkpoint()
+
+    @property
+    def interval(self) -> int:
+        return self.__interval
+
+    @property
+    def max_bytes(self) -> int:
+        return self.__max_bytes
+
+    @property
+    def num_bytes(self) -> int:
+        """The total size of the checkpoints."""
+        return self.__num_bytes
+
+    @property
+    def checkpoints(self) -> tuple[int, ...]:
+        """The cycles of the checkpoints, oldest first."""
+        return tuple(cycles for cycles, _ in self.__checkpoints)
+
+    @property
+    def earliest(self) -> int:
+        """The earliest cycle that can be stepped back to."""
+        return self.__checkpoints[0][0]
+
+    def checkpoint(self) -> None:
+        """Checkpoint the computer's current state."""
+        cycles = self.__computer.cycles
+        self.__truncate(cycles - 1)
+        snapshot = self.__computer.snapshot()
+        self.__checkpoints.append((cycles, snapshot))
+        self.__num_bytes += len(snapshot)
+        # Always keep the newest checkpoint, even if it's over budget alone.
+        while self.__num_bytes > self.__max_bytes and len(self.__checkpoints) > 1:
+            _, evicted = self.__checkpoints.popleft()
+            self.__num_bytes -= len(evicted)
+
+    def begin_tick(self) -> None:
+        """Called by the computer at the start of every tick."""
+        if (
+            not self.__replaying
+            and self.__computer.cycles - self.__checkpoints[-1][0] >= self.__interval
+        ):
+            self.checkpoint()
+
+    def seek(self, cycles: int) -> None:
+        """Return the computer to the state it was in at an earlier cycle.
+
+        Checkpoints after that cycle are dropped, since the computer's state
+        may be changed from there.
+        """
+        if not self.earliest <= cycles <= self.__computer.cycles:
+            raise self._error(
+                f"Can't seek to cycle {cycles}: only cycles {self.earliest} to "
+                f"{self.__computer.cycles} are available.",
+                self.Error,
+            )
+        self.__truncate(cycles)
+        self.__restore(len(self.__checkpoints) - 1)
+        self.__replay(cycles)
+
+    def step_back(self, ticks: int = 1) -> None:
+        """Return the computer to the state it was in ticks ticks ago."""
+        if ticks < 0:
+            raise self._error(f"Invalid ticks {ticks}.", self.Error)
+        self.seek(self.__computer.cycles - ticks)
+
+    def run_back_until(self, predicate: "Callable[[computer.Computer], bool]") -> bool:
+        """Return the computer to the latest earlier cycle where predicate holds.
+
+        predicate is checked against the state at the start of each earlier
+        tick, latest first. If it never holds, the computer is left at the
+        earliest available cycle and this returns False.
+        """
+        end = self.__computer.cycles
+        for index in reversed(range(len(self.__checkpoints))):
+            found: Optional[int] = None
+            start = self.__restore(index)
+            with self.__replaying_ticks():
+                while (cycles := self.__computer.cycles) < end:
+                    if predicate(self.__computer):
+                        found = cycles
+                    self.__computer.tick()
+            if found is not None:
+                self.seek(found)
+                return True
+            end = start
+        self.seek(self.earliest)
+        return False
+
+    def __truncate(self, cycles: int) -> None:
+        # Drop checkpoints after cycles.
+        while self.__checkpoints and self.__checkpoints[-1][0] > cycles:
+            _, dropped = self.__checkpoints.pop()
+            self.__num_bytes -= len(dropped)
+
+    def __restore(self, index: int) -> int:
+        cycles, snapshot = self.__checkpoints[index]
+        self.__computer.restore(snapshot)
+        return cycles
+
+    def __replay(self, cycles: int) -> None:
+        with self.__replaying_ticks():
+            while self.__computer.cycles < cycles:
+                self.__computer.tick()
+
+    @contextmanager
+    def __replaying_ticks(self) -> Generator[None]:
+        self.__replaying = True
+        try:
+            with self.__computer.pause_tracing(), self.__computer.pause_recording():
+                yield
+        finally:
+            self.__replaying = False
+
+
+from flip.components import computer
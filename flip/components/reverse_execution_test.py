@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import pytest
+from pytest_subtests import SubTests
+
+from flip.components import Computer, MinimalComputer, ReverseExecution
+from flip.components.trace import RingBufferSink
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x08)
+        .label("loop")
+        .adc(0x03)
+        .sta_zero_page(0xF0)
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+
+
+def _history(ticks: int) -> list[bytes]:
+    computer = MinimalComputer(data=_program())
+    history = [computer.snapshot()]
+    for _ in range(ticks):
+        computer.tick()
+        history.append(computer.snapshot())
+    return history
+
+
+def test_step_back(subtests: SubTests) -> None:
+    history = _history(100)
+    for interval in (1, 7, 1000):
+        for ticks in (0, 1, 6, 7, 50, 100):
+            with subtests.test(interval=interval, ticks=ticks):
+                computer = MinimalComputer(data=_program())
+                computer.enable_reverse_execution(interval=interval)
+                for _ in range(100):
+                    computer.tick()
+                computer.step_back(ticks)
+                assert computer.cycles == 100 - ticks
+                assert computer.snapshot() == history[100 - ticks]
+
+
+def test_step_back_then_forward() -> None:
+    history = _history(60)
+    computer = MinimalComputer(data=_program())
+    reverse_execution = computer.enable_reverse_execution(interval=10)
+    for _ in range(60):
+        computer.tick()
+    computer.step_back(35)
+    assert reverse_execution.checkpoints == (0, 10, 20)
+    for _ in range(35):
+        computer.tick()
+    assert computer.snapshot() == history[60]
+    assert reverse_execution.checkpoints == (0, 10, 20, 30, 40, 50)
+
+
+def test_run_back_until() -> None:
+    computer = MinimalComputer(data=_program())
+    computer.enable_reverse_execution(interval=16)
+    computer.tick_until_halt()
+    end = computer.cycles
+    assert computer.run_back_until(lambda c: c.memory.peek(0xF0) == 0x0F)
+    assert computer.memory.peek(0xF0) == 0x0F
+    assert computer.cycles < end
+    # The predicate stops holding on the next tick.
+    computer.tick()
+    assert computer.memory.peek(0xF0) != 0x0F
+    assert not computer.run_back_until(lambda c: c.a.value == 0xFF)
+    assert computer.cycles == 0
+
+
+def test_eviction() -> None:
+    computer = MinimalComputer(data=_program())
+    # Room for three checkpoints, allowing for the byte the program stores.
+    size = len(computer.snapshot()) + 16
+    reverse_execution = computer.enable_reverse_execution(
+        interval=10, max_bytes=size * 3
+    )
+    for _ in range(100):
+        computer.tick()
+    assert reverse_execution.checkpoints == (70, 80, 90)
+    assert reverse_execution.num_bytes <= reverse_execution.max_bytes
+    computer.step_back(30)
+    assert computer.cycles == 70
+    with pytest.raises(ReverseExecution.Error):
+        computer.step_back(1)
+
+
+def test_errors() -> None:
+    computer = MinimalComputer()
+    with pytest.raises(Computer.Error):
+        computer.step_back()
+    with pytest.raises(ReverseExecution.Error):
+        computer.enable_reverse_execution(interval=0)
+    with pytest.raises(ReverseExecution.Error):
+        computer.enable_reverse_execution(max_bytes=0)
+    computer.enable_reverse_execution()
+    with pytest.raises(ReverseExecution.Error):
+        computer.step_back(-1)
+    with pytest.raises(ReverseExecution.Error):
+        computer.step_back(1)
+    computer.disable_reverse_execution()
+    assert computer.reverse_execution is None
+
+
+def test_fork_drops_reverse_execution() -> None:
+    computer = MinimalComputer(data=_program())
+    computer.enable_reverse_execution()
+    assert computer.fork().reverse_execution is None
+
+
+def test_replay_isnt_traced_or_recorded(tmp_path: Path) -> None:
+    computer = MinimalComputer(data=_program())
+    computer.enable_reverse_execution(interval=7)
+    sink = RingBufferSink()
+    computer.add_trace_sink(sink)
+    with computer.record(tmp_path / "trace") as recorder:
+        for _ in range(50):
+            computer.tick()
+        events = len(sink.events)
+        computer.step_back(10)
+        assert computer.run_back_until(lambda computer: computer.cycles == 20)
+        assert len(sink.events) == events
+        assert recorder.count == 50
+        computer.tick()
+        assert recorder.count == 51
+    assert len(sink.events) > events
+    assert {event.cycle for event in sink.events[events:]} == {21}
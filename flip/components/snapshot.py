@@ -0,0 +1,165 @@
+import struct
+import zlib
+
+from flip.bytes import Byte
+from flip.components.bus import Bus
+from flip.components.component import Component
+from flip.components.memory import Memory
+from flip.components.register import Register
+from flip.components.status import Status
+from flip.core import Error, Errorable
+
+
+class Snapshot(Errorable):
+    """Packs the state of a component tree into bytes and restores it.
+
+    The layout is derived from the paths of the tree's registers, statuses,
+    controls, buses and memories, which are packed in path order: a byte per
+    register, a bit per status, the root's ControlState bits, each bus's value
+    and setter, and each memory's packed contents. Word registers and status
+    registers are made of registers, so they're covered too.
+
+    Snapshots start with a header holding a format version and a checksum of
+    the layout, so restoring a snapshot into a tree it wasn't taken from
+    raises instead of scrambling state. Restoring sets values in place and
+    never rebuilds the tree.
+    """
+
+    class Error(Error): ...
+
+    class LayoutError(Error): ...
+
+    VERSION = 1
+    MAGIC = b"FLIP"
+
+    # magic, version, layout checksum, cycles
+    _HEADER = struct.Struct("<4sBIQ")
+    # set, value, setter length
+    _BUS = struct.Struct("<BBH")
+
+    def __init__(self, root: Component) -> None:
+        components = list(root.walk())
+        self.__root = root
+        self.__registers = tuple(
+            sorted(
+                (c for c in components if isinstance(c, Register)),
+                key=lambda c: c.path,
+            )
+        )
+        self.__statuses = tuple(
+            sorted(
+                (c for c in components if isinstance(c, Status)),
+                key=lambda c: c.path,
+            )
+        )
+        self.__buses = tuple(
+            sorted((c for c in components if isinstance(c, Bus)), key=lambda c: c.path)
+        )
+        self.__memories = tuple(
+            sorted(
+                (c for c in components if isinstance(c, Memory)),
+                key=lambda c: c.path,
+            )
+        )
+        indices = root.control_state.indices
+        self.__num_control_bytes = (max(indices.values(), default=-1) + 8) // 8
+        self.__num_status_bytes = (len(self.__statuses) + 7) // 8
+        layout = "\n".join(
+            [f"register {c.path}" for c in self.__registers]
+            + [f"status {c.path}" for c in self.__statuses]
+            + [f"control {path} {index}" for path, index in sorted(indices.items())]
+            + [f"bus {c.path}" for c in self.__buses]
+            + [f"memory {c.path}" for c in self.__memories]
+        )
+        self.__checksum = zlib.crc32(layout.encode())
+
+    @property
+    def checksum(self) -> int:
+        """Checksum of the layout, which snapshots must match to be restored."""
+        return self.__checksum
+
+    def capture(self, cycles: int = 0) -> bytes:
+        """Pack the tree's current state, along with a cycle count."""
+        statuses = 0
+        for i, status in enumerate(self.__statuses):
+            if status.value:
+                statuses |= 1 << i
+        parts = [
+            self._HEADER.pack(self.MAGIC, self.VERSION, self.__checksum, cycles),
+            bytes([register.value.unsigned_value for register in self.__registers]),
+            statuses.to_bytes(self.__num_status_bytes, "little"),
+            self.__root.control_state.bits.to_bytes(self.__num_control_bytes, "little"),
+        ]
+        for bus in self.__buses:
+            if (value := bus.value) is None:
+                parts.append(self._BUS.pack(0, 0, 0))
+            else:
+                setter = (bus.setter or "").encode()
+                parts.append(self._BUS.pack(1, value.unsigned_value, len(setter)))
+                parts.append(setter)
+        for memory in self.__memories:
+            parts.append(memory.pack())
+        return b"".join(parts)
+
+    def restore(self, data: bytes | memoryview) -> int:
+        """Restore the tree's state from a snapshot and return its cycle count."""
+        data = memoryview(data)
+        try:
+            magic, version, checksum, cycles = self._HEADER.unpack_from(data)
+        except struct.error as e:
+            raise self._error("Truncated snapshot.", self.Error) from e
+        if magic != self.MAGIC:
+            raise self._error("Not a snapshot.", self.Error)
+        if version != self.VERSION:
+            raise self._error(
+                f"Unsupported snapshot version {version}, expected {self.VERSION}.",
+                self.LayoutError,
+            )
+        if checksum != self.__checksum:
+            raise self._error(
+                "Snapshot was taken from a different component tree.",
+                self.LayoutError,
+            )
+        offset = self._HEADER.size
+        end = (
+            offset
+            + len(self.__registers)
+            + self.__num_status_bytes
+            + self.__num_control_bytes
+        )
+        if len(data) < end:
+            raise self._error("Truncated snapshot.", self.Error)
+        for register, value in zip(
+            self.__registers,
+            data[offset : offset + len(self.__registers)],
+            strict=True,
+        ):
+            register.value = Byte.of(value)
+        offset += len(self.__registers)
+        statuses = int.from_bytes(
+            data[offset : offset + self.__num_status_bytes], "little"
+        )
+        for i, status in enumerate(self.__statuses):
+            status.value = bool(statuses >> i & 1)
+        offset += self.__num_status_bytes
+        self.__root.control_state.bits = int.from_bytes(
+            data[offset : offset + self.__num_control_bytes], "little"
+        )
+        offset += self.__num_control_bytes
+        for bus in self.__buses:
+            try:
+                set_, value, length = self._BUS.unpack_from(data, offset)
+            except struct.error as e:
+                raise self._error("Truncated snapshot.", self.Error) from e
+            offset += self._BUS.size
+            bus.clear()
+            if set_:
+                setter = bytes(data[offset : offset + length]).decode()
+                bus.set(Byte.of(value), setter)
+                offset += length
+        for memory in self.__memories:
+            try:
+                offset = memory.unpack(data, offset)
+            except Memory.Error as e:
+                raise self._error(f"Invalid snapshot: {e}", self.Error) from e
+        return cycles
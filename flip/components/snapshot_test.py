@@ -0,0 +1,100 @@
+import pytest
+
+from flip.bytes import Byte, Word
+from flip.components import MinimalComputer
+from flip.components.snapshot import Snapshot
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x05)
+        .label("loop")
+        .adc(0x03)
+        .sta(0x0200)
+        .pha()
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+
+
+def test_round_trip() -> None:
+    computer = MinimalComputer(data=_program())
+    for _ in range(50):
+        computer.tick()
+    snapshot = computer.snapshot()
+    other = MinimalComputer()
+    other.restore(snapshot)
+    assert other.snapshot() == snapshot
+    assert other.cycles == 50
+    # Both computers carry on identically, mid-instruction or not.
+    computer.tick_until_halt()
+    other.tick_until_halt()
+    assert other.snapshot() == computer.snapshot()
+    assert other.a.value == computer.a.value
+    assert dict(other.memory) == dict(computer.memory)
+
+
+def test_restore_rewinds() -> None:
+    computer = MinimalComputer(data=_program())
+    snapshot = computer.snapshot()
+    computer.tick_until_halt()
+    assert computer.halt
+    computer.restore(snapshot)
+    assert not computer.halt
+    assert computer.cycles == 0
+    assert computer.a.value == Byte(0)
+    assert Word(0x0200) not in computer.memory
+    assert computer.run(_program()) == MinimalComputer().run(_program())
+
+
+def test_controls_statuses_and_bus() -> None:
+    computer = MinimalComputer()
+    computer.alu.carry_in = True
+    computer.alu.overflow = True
+    computer.a.write = True
+    computer._bus.set(Byte(0x42), computer.a)  # type: ignore
+    snapshot = computer.snapshot()
+    other = MinimalComputer()
+    other.restore(snapshot)
+    assert other.alu.carry_in
+    assert other.alu.overflow
+    assert other.a.write
+    assert other._bus.value == Byte(0x42)  # type: ignore
+    assert other._bus.setter == "a"  # type: ignore
+
+
+def test_dense() -> None:
+    computer = MinimalComputer(data=_program())
+    computer.tick_until_halt()
+    dense = MinimalComputer(memory_backend="dense")
+    dense.restore(computer.snapshot())
+    assert dict(dense.memory) == dict(computer.memory)
+    sparse = MinimalComputer()
+    sparse.restore(dense.snapshot())
+    assert dict(sparse.memory) == dict(computer.memory)
+
+
+def test_invalid() -> None:
+    computer = MinimalComputer()
+    snapshot = computer.snapshot()
+    with pytest.raises(Snapshot.Error):
+        computer.restore(snapshot[:10])
+    with pytest.raises(Snapshot.Error):
+        computer.restore(snapshot[:-1])
+    with pytest.raises(Snapshot.Error):
+        computer.restore(b"XXXX" + snapshot[4:])
+    with pytest.raises(Snapshot.LayoutError):
+        computer.restore(snapshot[:4] + bytes([Snapshot.VERSION + 1]) + snapshot[5:])
+    with pytest.raises(Snapshot.LayoutError):
+        computer.restore(snapshot[:5] + bytes(4) + snapshot[9:])
+
+
+def test_layout_changes_with_tree() -> None:
+    computer = MinimalComputer()
+    snapshot = computer.snapshot()
+    other = MinimalComputer()
+    computer.add_child(other)
+    with pytest.raises(Snapshot.LayoutError):
+        computer.restore(snapshot)
@@ -47,6 +47,6 @@ class StackPointer(WordRegister):
     def _tick_process(self) -> None:
         super()._tick_process()
         if self.increment:
-            self.low = Byte(self.low.unsigned_value + 1)
+            self.low = Byte.of(self.low.unsigned_value + 1)
         if self.decrement:
-            self.low = Byte(self.low.unsigned_value - 1)
+            self.low = Byte.of(self.low.unsigned_value - 1)
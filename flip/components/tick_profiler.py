@@ -0,0 +1,139 @@
+import time
+from dataclasses import dataclass
+from types import MethodType
+from typing import Callable, Sequence, cast
+
+
+class TickProfiler:
+    """Counts calls to and times every tick hook of a component tree.
+
+    While a root has a profiler, its ticks run the tick schedule through
+    the profiler, which wraps each hook in a pair of perf_counter_ns calls.
+    Entries are keyed by component path and phase. Hooks that the schedule
+    skips aren't called, so they don't appear, and neither does the root's
+    final ControlState clear.
+    """
+
+    @dataclass(frozen=True, kw_only=True)
+    class Entry:
+        path: str
+        phase: str
+        calls: int
+        ns: int
+
+        @property
+        def mean_ns(self) -> float:
+            return self.ns / self.calls if self.calls else 0.0
+
+    def __init__(self, root_name: str) -> None:
+        self.__root_name = root_name
+        self.__indices = dict[tuple[str, str], int]()
+        self.__calls = list[int]()
+        self.__ns = list[int]()
+        self.__ticks = 0
+        self.__schedule: object = None
+        self.__phases: Sequence[Sequence[tuple[int, Callable[[], None]]]] = ()
+
+    @property
+    def ticks(self) -> int:
+        """The number of ticks profiled."""
+        return self.__ticks
+
+    def reset(self) -> None:
+        self.__calls = [0] * len(self.__calls)
+        self.__ns = [0] * len(self.__ns)
+        self.__ticks = 0
+
+    def tick(
+        self, schedule: Sequence[Sequence[Callable[[], None]]], phases: Sequence[str]
+    ) -> None:
+        """Run one tick of a root's schedule, timing each hook."""
+        if schedule is not self.__schedule:
+            self.__bind(schedule, phases)
+        counter = time.perf_counter_ns
+        calls = self.__calls
+        ns = self.__ns
+        for phase in self.__phases:
+            for index, tick in phase:
+                start = counter()
+                tick()
+                ns[index] += counter() - start
+                calls[index] += 1
+        self.__ticks += 1
+
+    def __bind(
+        self, schedule: Sequence[Sequence[Callable[[], None]]], phases: Sequence[str]
+    ) -> None:
+        # The schedule is rebuilt when the tree changes, and entries of
+        # components that are still in the tree carry on accumulating.
+        bound = list[list[tuple[int, Callable[[], None]]]]()
+        for phase, ticks in zip(phases, schedule, strict=True):
+            bound.append([])
+            for tick in ticks:
+                owner: object = cast(MethodType, tick).__self__
+                assert isinstance(owner, component.Component)
+                key = (owner.path, phase)
+                if (index := self.__indices.get(key)) is None:
+                    index = self.__indices[key] = len(self.__calls)
+                    self.__calls.append(0)
+                    self.__ns.append(0)
+                bound[-1].append((index, tick))
+        self.__schedule = schedule
+        self.__phases = bound
+
+    @property
+    def entries(self) -> Sequence["TickProfiler.Entry"]:
+        """Every hook that was called, by descending time."""
+        entries = [
+            self.Entry(
+                path=path,
+                phase=phase,
+                calls=self.__calls[index],
+                ns=self.__ns[index],
+            )
+            for (path, phase), index in self.__indices.items()
+            if self.__calls[index]
+        ]
+        return sorted(entries, key=lambda entry: (-entry.ns, entry.path, entry.phase))
+
+    def table(self) -> str:
+        """The entries as a text table, by descending time."""
+        entries = self.entries
+        total = sum(entry.ns for entry in entries) or 1
+        rows = [("path", "phase", "calls", "total ms", "mean us", "%")] + [
+            (
+                entry.path or self.__root_name,
+                entry.phase,
+                str(entry.calls),
+                f"{entry.ns / 1e6:.3f}",
+                f"{entry.mean_ns / 1e3:.3f}",
+                f"{100 * entry.ns / total:.1f}",
+            )
+            for entry in entries
+        ]
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if i < 2 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths, strict=True))
+            ).rstrip()
+            for row in rows
+        )
+
+    def collapsed_stacks(self) -> str:
+        """The entries as collapsed stacks of nanoseconds, for flamegraph tools.
+
+        Each line is the root's name, the names along the component's path
+        and the phase, separated by semicolons, followed by the time.
+        """
+        lines = list[str]()
+        for entry in self.entries:
+            frames = [self.__root_name]
+            if entry.path:
+                frames += entry.path.split(".")
+            frames.append(entry.phase)
+            lines.append(f"{';'.join(frames)} {entry.ns}")
+        return "\n".join(sorted(lines))
+
+
+from flip.components import component
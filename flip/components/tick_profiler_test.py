@@ -0,0 +1,67 @@
+from flip.components import Bus, Component, MinimalComputer, Register
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return MinimalComputer.program_builder().lda(0x01).adc(0x02).hlt()
+
+
+def test_profile() -> None:
+    computer = MinimalComputer(data=_program())
+    profiler = computer.memory.enable_profiling()
+    assert computer.profiler is profiler
+    computer.tick_until_halt()
+    assert profiler.ticks == computer.cycles
+    entries = {(entry.path, entry.phase): entry for entry in profiler.entries}
+    assert entries["controller", "_tick_control"].calls == computer.cycles
+    assert entries["", "_tick_control"].calls == computer.cycles
+    assert entries["memory", "_tick_write"].calls == computer.cycles
+    assert all(entry.ns > 0 for entry in entries.values())
+    assert [entry.ns for entry in profiler.entries] == sorted(
+        (entry.ns for entry in profiler.entries), reverse=True
+    )
+    # The root isn't in the table by path, but by name.
+    table = profiler.table().splitlines()
+    assert table[0].split() == [
+        "path",
+        "phase",
+        "calls",
+        "total",
+        "ms",
+        "mean",
+        "us",
+        "%",
+    ]
+    assert len(table) == len(entries) + 1
+    assert any(line.startswith("MinimalComputer ") for line in table)
+    stacks = profiler.collapsed_stacks().splitlines()
+    assert len(stacks) == len(entries)
+    assert (
+        f"MinimalComputer;controller;_tick_control "
+        f"{entries['controller', '_tick_control'].ns}"
+    ) in stacks
+
+
+def test_profile_tree_change() -> None:
+    root = Component(name="root")
+    profiler = root.enable_profiling()
+    root.tick()
+    assert profiler.entries == []
+    Register(name="r", bus=Bus(name="bus", parent=root), parent=root)
+    root.tick()
+    root.tick()
+    assert {(entry.path, entry.calls) for entry in profiler.entries} >= {("r", 2)}
+
+
+def test_reset_and_disable() -> None:
+    computer = MinimalComputer(data=_program())
+    profiler = computer.enable_profiling()
+    assert computer.enable_profiling() is profiler
+    computer.tick()
+    profiler.reset()
+    assert profiler.ticks == 0
+    assert profiler.entries == []
+    computer.disable_profiling()
+    assert computer.profiler is None
+    computer.tick_until_halt()
+    assert profiler.entries == []
+    assert computer.fork().profiler is None
@@ -0,0 +1,174 @@
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable, Optional
+
+
+@dataclass(kw_only=True, slots=True)
+class Event:
+    # Path of the component that emitted the event.
+    path: str
+    # The tick the event happened in, set by the Tracer.
+    cycle: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"event": type(self).__name__, **asdict(self)}
+
+
+@dataclass(kw_only=True, slots=True)
+class ControlSet(Event):
+    """The controller asserted the controls of a microcode step."""
+
+    opcode: int
+    step_index: int
+    statuses: dict[str, bool]
+    controls: tuple[str, ...]
+
+
+@dataclass(kw_only=True, slots=True)
+class BusWrite(Event):
+    value: int
+
+
+@dataclass(kw_only=True, slots=True)
+class RegisterRead(Event):
+    """A register read a value from the bus."""
+
+    value: int
+
+
+@dataclass(kw_only=True, slots=True)
+class RegisterReset(Event):
+    value: int
+
+
+@dataclass(kw_only=True, slots=True)
+class Increment(Event):
+    """A counter was incremented to value."""
+
+    value: int
+
+
+@dataclass(kw_only=True, slots=True)
+class MemoryRead(Event):
+    """Memory read a value from the bus into address."""
+
+    address: int
+    value: int
+
+
+@dataclass(kw_only=True, slots=True)
+class MemoryWrite(Event):
+    """Memory wrote the value at address to the bus."""
+
+    address: int
+    value: int
+
+
+@dataclass(kw_only=True, slots=True)
+class AluOperation(Event):
+    operation: str
+    lhs: int
+    rhs: int
+    carry_in: bool
+    value: int
+    carry_out: bool
+
+
+@dataclass(kw_only=True, slots=True)
+class StatusLatch(Event):
+    """A status register latched status values, unless latching was disabled."""
+
+    statuses: dict[str, bool]
+    disabled: bool = False
+
+
+class Sink(ABC):
+    """Receives the events of a traced tree."""
+
+    @abstractmethod
+    def emit(self, event: Event) -> None: ...
+
+    def close(self) -> None:  # noqa: B027
+        """Called when the sink is removed from its tree."""
+
+
+class RingBufferSink(Sink):
+    """Keeps the last capacity events in memory."""
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self.__events: deque[Event] = deque(maxlen=capacity)
+
+    @property
+    def events(self) -> tuple[Event, ...]:
+        return tuple(self.__events)
+
+    def clear(self) -> None:
+        self.__events.clear()
+
+    def emit(self, event: Event) -> None:
+        self.__events.append(event)
+
+
+class JsonLinesSink(Sink):
+    """Writes each event as a line of JSON.
+
+    If given a path, the sink opens the file and closes it when it's removed.
+    """
+
+    def __init__(self, file: str | Path | IO[str]) -> None:
+        if isinstance(file, (str, Path)):
+            self.__file: IO[str] = open(file, "w")
+            self.__owned = True
+        else:
+            self.__file = file
+            self.__owned = False
+
+    def emit(self, event: Event) -> None:
+        self.__file.write(json.dumps(event.to_dict()))
+        self.__file.write("\n")
+
+    def close(self) -> None:
+        if self.__owned:
+            self.__file.close()
+        else:
+            self.__file.flush()
+
+
+class CallbackSink(Sink):
+    def __init__(self, callback: Callable[[Event], None]) -> None:
+        self.__callback = callback
+
+    def emit(self, event: Event) -> None:
+        self.__callback(event)
+
+
+class Tracer:
+    """Stamps events with the current cycle and sends them to sinks.
+
+    The root of a traced tree owns its Tracer, and hands it to every component
+    in the tree as _tracer. While a tree has no sinks, its components have no
+    tracer, so every emit site is a single None check.
+    """
+
+    def __init__(self, sinks: Iterable[Sink] = (), cycle: int = 0) -> None:
+        self.cycle = cycle
+        self.__sinks = list(sinks)
+
+    @property
+    def sinks(self) -> tuple[Sink, ...]:
+        return tuple(self.__sinks)
+
+    def add_sink(self, sink: Sink) -> None:
+        self.__sinks.append(sink)
+
+    def remove_sink(self, sink: Sink) -> None:
+        self.__sinks.remove(sink)
+        sink.close()
+
+    def emit(self, event: Event) -> None:
+        event.cycle = self.cycle
+        for sink in self.__sinks:
+            sink.emit(event)
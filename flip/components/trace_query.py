@@ -0,0 +1,198 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, MutableMapping, Optional
+
+from flip.bytes import Byte
+from flip.components.trace_recorder import TraceReader
+from flip.core import Error, Errorable
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+else:
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover
+        np = None
+
+type Array = npt.NDArray[Any]
+
+
+class TraceQuery(Errorable):
+    """Answers questions about a recorded trace from lazily built indexes.
+
+    Columns are named by record field (tick, opcode, step_index, bus_value,
+    bus_setter), register path, word register path (the value of its high and
+    low registers), status path or control path. The first query about a
+    column scans it once to build an index, and later queries about it are
+    binary searches:
+
+    - changes holds the record indices where the column's value differs from
+      the record before, so finding the last change before a tick is a search.
+    - order, values and offsets are an inverted index from value to the
+      records that hold it: order lists record indices sorted by value, values
+      lists the distinct values in order, and the records with values[i] are
+      order[offsets[i] : offsets[i + 1]]. They only grow with the number of
+      records, however large the values are.
+
+    With cache=True, indexes are saved as .npy files in a directory next to
+    the trace, named after the trace with .index appended, and reused as long
+    as the trace's size and modification time haven't changed. If the
+    directory can't be written, indexes are only kept in memory.
+    """
+
+    class Error(Error): ...
+
+    def __init__(self, trace: TraceReader | str | Path, cache: bool = True) -> None:
+        if np is None:  # pragma: no cover
+            raise self._error("TraceQuery requires numpy.", self.Error)
+        self.__reader = trace if isinstance(trace, TraceReader) else TraceReader(trace)
+        self.__ticks = self.__reader.records["tick"]
+        self.__indexes: MutableMapping[str, Array] = {}
+        self.__cache_dir: Optional[Path] = None
+        if cache:
+            try:
+                self.__cache_dir = self.__open_cache()
+            except OSError:
+                pass
+
+    @property
+    def reader(self) -> TraceReader:
+        return self.__reader
+
+    @property
+    def cache_dir(self) -> Optional[Path]:
+        return self.__cache_dir
+
+    def column(self, name: str) -> Array:
+        """The value of a column in every record."""
+        reader = self.__reader
+        if name in (reader.dtype.names or ()) and reader.dtype[name].shape == ():
+            return reader.records[name]
+        if name in reader.registers:
+            return reader.register(name)
+        if f"{name}.low" in reader.registers and f"{name}.high" in reader.registers:
+            return reader.register(f"{name}.high").astype(np.uint16) << 8 | (
+                reader.register(f"{name}.low")
+            )
+        if name in reader.statuses:
+            return reader.status(name)
+        if name in reader.controls:
+            return reader.control(name)
+        raise self._error(f"Unknown column {name}.", self.Error)
+
+    def value_at(self, name: str, tick: int) -> int:
+        """The value of a column in the record of a tick."""
+        return int(self.column(name)[self.__record(tick)])
+
+    def changes(self, name: str) -> Array:
+        """The ticks where a column's value changed from the record before."""
+        return self.__ticks[self.__changes(name)]
+
+    def last_change(self, name: str, before: int) -> Optional[int]:
+        """The last tick before a tick where a column's value changed.
+
+        Returns None if the column didn't change before then.
+        """
+        changes = self.__changes(name)
+        end = int(np.searchsorted(self.__ticks, before, "left"))
+        i = int(np.searchsorted(changes, end, "left"))
+        return None if i == 0 else int(self.__ticks[changes[i - 1]])
+
+    def ticks_where(self, name: str, value: int | Byte) -> Array:
+        """Every tick where a column had a value, in order."""
+        if isinstance(value, Byte):
+            value = value.unsigned_value
+        order = self.__index(f"{name}.order", lambda: self.__order(name))
+        offsets = self.__index(f"{name}.offsets", lambda: self.__offsets(name))
+        values = self.__index(f"{name}.values", lambda: self.__values(name))
+        i = int(np.searchsorted(values, value, "left"))
+        if i == len(values) or values[i] != value:
+            return self.__ticks[:0]
+        return self.__ticks[order[offsets[i] : offsets[i + 1]]]
+
+    def executions(self, opcode: int | Byte) -> Array:
+        """The first tick of every execution of the instruction with an opcode.
+
+        Instructions are the runs of records from one with step index 0 up to
+        the next, and an instruction's opcode is the instruction buffer at the
+        end of its last record, after it's been fetched. An instruction cut
+        off at the start of the trace isn't counted.
+
+        Opcodes come from the computer's InstructionSet, like
+        instructions_by_name["lda"].modes_by_addressing_mode[ABSOLUTE].opcode.
+        """
+        if isinstance(opcode, Byte):
+            opcode = opcode.unsigned_value
+        starts = self.__index("instructions.starts", self.__starts)
+        opcodes = self.__index("instructions.opcodes", self.__opcodes)
+        return self.__ticks[starts[opcodes == opcode]]
+
+    def __record(self, tick: int) -> int:
+        i = int(np.searchsorted(self.__ticks, tick, "left"))
+        if i == len(self.__ticks) or self.__ticks[i] != tick:
+            raise self._error(f"No record of tick {tick}.", self.Error)
+        return i
+
+    def __changes(self, name: str) -> Array:
+        def build() -> Array:
+            column = self.column(name)
+            return np.flatnonzero(column[1:] != column[:-1]) + 1
+
+        return self.__index(f"{name}.changes", build)
+
+    def __order(self, name: str) -> Array:
+        # Stable, so each value's records stay in tick order.
+        return np.argsort(self.column(name), kind="stable")
+
+    def __offsets(self, name: str) -> Array:
+        order = self.__index(f"{name}.order", lambda: self.__order(name))
+        _, starts = np.unique(self.column(name)[order], return_index=True)
+        return np.append(starts, len(order))
+
+    def __values(self, name: str) -> Array:
+        order = self.__index(f"{name}.order", lambda: self.__order(name))
+        offsets = self.__index(f"{name}.offsets", lambda: self.__offsets(name))
+        return self.column(name)[order[offsets[:-1]]]
+
+    def __starts(self) -> Array:
+        return np.flatnonzero(self.__reader.records["step_index"] == 0)
+
+    def __opcodes(self) -> Array:
+        starts = self.__index("instructions.starts", self.__starts)
+        ends = np.append(starts[1:], len(self.__ticks)) - 1
+        return self.column("controller.instruction_buffer")[ends]
+
+    def __index(self, key: str, build: Callable[[], Array]) -> Array:
+        if (index := self.__indexes.get(key)) is not None:
+            return index
+        path = None if self.__cache_dir is None else self.__cache_dir / f"{key}.npy"
+        if path is not None and path.exists():
+            index = np.load(path, mmap_mode="r")
+        else:
+            index = build()
+            if path is not None:
+                try:
+                    np.save(path, index)
+                except OSError:
+                    # Keep going without the cache, like when it can't be
+                    # opened.
+                    self.__cache_dir = None
+        self.__indexes[key] = index
+        return index
+
+    def __open_cache(self) -> Path:
+        trace = self.__reader.path
+        stat = trace.stat()
+        key = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        cache_dir = trace.with_name(f"{trace.name}.index")
+        key_path = cache_dir / "key.json"
+        if cache_dir.exists():
+            if key_path.exists() and json.loads(key_path.read_text()) == key:
+                return cache_dir
+            # The trace changed, so the indexes are stale.
+            for path in cache_dir.glob("*.npy"):
+                path.unlink()
+        cache_dir.mkdir(exist_ok=True)
+        key_path.write_text(json.dumps(key))
+        return cache_dir
@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import pytest
+
+from flip.components import MinimalComputer
+from flip.instructions.addressing_mode import AddressingMode
+
+np = pytest.importorskip("numpy")
+
+from flip.components.trace_query import TraceQuery
+from flip.components.trace_recorder import TraceReader
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x03)
+        .label("loop")
+        .txa()
+        .sta(0x0200)
+        .sta_index_x(0x0200)
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+
+
+def _opcode(name: str, mode: AddressingMode) -> int:
+    instruction = MinimalComputer.instruction_set().instructions_by_name[name]
+    return instruction.modes_by_addressing_mode[mode].opcode.unsigned_value
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    path = tmp_path / "run.trace"
+    computer = MinimalComputer(data=_program())
+    with computer.record(path):
+        computer.tick_until_halt()
+    return path
+
+
+def _scan_last_change(query: TraceQuery, name: str, before: int) -> int | None:
+    column = query.column(name).tolist()
+    ticks = query.reader.records["tick"].tolist()
+    last = None
+    for i in range(1, len(column)):
+        if ticks[i] < before and column[i] != column[i - 1]:
+            last = ticks[i]
+    return last
+
+
+def test_last_change(path: Path) -> None:
+    query = TraceQuery(path, cache=False)
+    ticks = query.reader.records["tick"].tolist()
+    for name in ("x", "a", "memory.address", "alu.zero", "memory.read"):
+        for before in (0, 1, 10, 37, ticks[-1], ticks[-1] + 1):
+            assert query.last_change(name, before) == _scan_last_change(
+                query, name, before
+            ), (name, before)
+    changes = query.changes("x").tolist()
+    assert [query.value_at("x", tick) for tick in changes] == [3, 2, 1, 0]
+
+
+def test_ticks_where(path: Path) -> None:
+    query = TraceQuery(path, cache=False)
+    address = query.column("memory.address")
+    ticks = query.reader.records["tick"]
+    for value in (0x0000, 0x0200, 0x0203, 0x1234):
+        assert (
+            query.ticks_where("memory.address", value).tolist()
+            == ticks[address == value].tolist()
+        )
+    assert len(query.ticks_where("memory.address", 0x0200)) > 0
+    assert query.ticks_where("halt", 1).tolist() == ticks[-1:].tolist()
+
+
+def test_executions(path: Path) -> None:
+    query = TraceQuery(path, cache=False)
+    sta = query.executions(_opcode("sta", AddressingMode.ABSOLUTE))
+    assert len(sta) == 3
+    assert len(query.executions(_opcode("ldx", AddressingMode.IMMEDIATE))) == 1
+    assert len(query.executions(_opcode("hlt", AddressingMode.NONE))) == 1
+    assert query.executions(_opcode("lda", AddressingMode.IMMEDIATE)).tolist() == []
+    for tick in sta.tolist():
+        assert query.value_at("step_index", tick) == 0
+
+
+def test_cache(path: Path) -> None:
+    query = TraceQuery(path)
+    assert query.cache_dir is not None
+    expected = query.ticks_where("x", 2).tolist()
+    assert (query.cache_dir / "x.order.npy").exists()
+    # A new query loads the saved index.
+    assert TraceQuery(path).ticks_where("x", 2).tolist() == expected
+    # Re-recording the trace drops the stale indexes.
+    computer = MinimalComputer(data=_program())
+    with computer.record(path):
+        for _ in range(5):
+            computer.tick()
+    assert TraceQuery(path).ticks_where("x", 2).tolist() == []
+
+
+def test_ticks_where_sparse_values(path: Path) -> None:
+    query = TraceQuery(path)
+    assert query.cache_dir is not None
+    assert query.ticks_where("memory.address", 1 << 40).tolist() == []
+    # The index has an entry per distinct address, not one per address up to
+    # the largest.
+    offsets = np.load(query.cache_dir / "memory.address.offsets.npy")
+    assert len(offsets) == len(np.unique(query.column("memory.address"))) + 1 < 0x200
+
+
+def test_cache_unwritable(path: Path) -> None:
+    # A file where the cache directory would go can't be written to.
+    path.with_name(f"{path.name}.index").write_text("")
+    query = TraceQuery(path)
+    assert query.cache_dir is None
+    assert (
+        query.ticks_where("x", 2).tolist()
+        == TraceQuery(path, cache=False).ticks_where("x", 2).tolist()
+    )
+
+
+def test_errors(path: Path) -> None:
+    query = TraceQuery(TraceReader(path), cache=False)
+    assert query.cache_dir is None
+    with pytest.raises(TraceQuery.Error):
+        query.column("z")
+    with pytest.raises(TraceQuery.Error):
+        query.value_at("x", 100000)
@@ -0,0 +1,349 @@
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Self
+
+from flip.components.bus import Bus
+from flip.components.register import Register
+from flip.components.status import Status
+from flip.core import Error, Errorable
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+else:
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover
+        np = None
+
+type Array = npt.NDArray[Any]
+
+_MAGIC = b"FLIPTRAC"
+_VERSION = 1
+# magic, version, header size, record size, record count
+_HEADER = struct.Struct("<8sIIIQ")
+# Records start on a multiple of this.
+_ALIGNMENT = 64
+# Bus setter index of an open bus.
+_NO_SETTER = 0xFFFF
+# Struct and NumPy codes for status bitfields, by size in bytes.
+_STATUS_TYPES = {1: ("B", "u1"), 2: ("H", "<u2"), 4: ("I", "<u4"), 8: ("Q", "<u8")}
+
+
+class TraceRecorder(Errorable):
+    """Appends a fixed-size record of every tick of a computer to a file.
+
+    Records are written through a memory map that grows by chunk_size records
+    at a time, and the file is truncated to the records written when the
+    recorder is closed. The file starts with a header holding the layout as
+    JSON, and the records that follow can be read as a NumPy structured array
+    with a TraceReader, or directly with numpy.memmap.
+
+    Each record holds the tick's cycle, the opcode and step index the
+    controller decoded, the root's ControlState bits as little-endian 64-bit
+    words, the bus value and the index of its setter, every register's value
+    in path order and the statuses as a bitfield in path order. Everything but
+    the opcode and step index is recorded as it stood at the end of the
+    process phase, before controls and the bus are cleared.
+    """
+
+    class Error(Error): ...
+
+    def __init__(
+        self,
+        computer: "computer.Computer",
+        path: str | Path,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        if chunk_size < 1:
+            raise self._error(f"Invalid chunk_size {chunk_size}.", self.Error)
+        components = list(computer.walk())
+        self.__registers = tuple(
+            sorted(
+                (c for c in components if isinstance(c, Register)),
+                key=lambda c: c.path,
+            )
+        )
+        self.__statuses = tuple(
+            sorted(
+                (c for c in components if isinstance(c, Status)),
+                key=lambda c: c.path,
+            )
+        )
+        status_size = next(
+            (size for size in _STATUS_TYPES if len(self.__statuses) <= size * 8),
+            None,
+        )
+        if status_size is None:
+            raise self._error(
+                f"Too many statuses to record: {len(self.__statuses)}.", self.Error
+            )
+        status_code, status_dtype = _STATUS_TYPES[status_size]
+        setters = sorted(c.path for c in components)
+        self.__setter_indices = {path: i for i, path in enumerate(setters)}
+        self.__control_state = computer.control_state
+        indices = self.__control_state.indices
+        self.__num_control_words = (max(indices.values(), default=-1) + 64) // 64
+        self.__computer = computer
+        if not isinstance(bus := computer.child("bus"), Bus):
+            raise self._error("Computer has no bus to record.", self.Error)
+        self.__bus = bus
+        self.__controller = computer.controller
+        self.__record = struct.Struct(
+            f"<QBB{self.__num_control_words}QBH{len(self.__registers)}s{status_code}"
+        )
+        layout = {
+            "dtype": [
+                ["tick", "<u8"],
+                ["opcode", "u1"],
+                ["step_index", "u1"],
+                ["controls", "<u8", [self.__num_control_words]],
+                ["bus_value", "u1"],
+                ["bus_setter", "<u2"],
+                ["registers", "u1", [len(self.__registers)]],
+                ["statuses", status_dtype],
+            ],
+            "registers": [c.path for c in self.__registers],
+            "statuses": [c.path for c in self.__statuses],
+            "controls": dict(sorted(indices.items())),
+            "setters": setters,
+        }
+        encoded = json.dumps(layout).encode()
+        self.__header_size = (
+            (_HEADER.size + len(encoded) + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        )
+        self.__path = Path(path)
+        self.__chunk_size = chunk_size
+        self.__count = 0
+        self.__capacity = 0
+        self.__opcode = 0
+        self.__step_index = 0
+        self.__file = open(self.__path, "w+b")
+        self.__file.write(
+            _HEADER.pack(_MAGIC, _VERSION, self.__header_size, self.__record.size, 0)
+        )
+        self.__file.write(encoded)
+        self.__file.flush()
+        self.__mmap: Optional[mmap.mmap] = None
+        self.__grow()
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    @property
+    def count(self) -> int:
+        """The number of records written."""
+        return self.__count
+
+    @property
+    def record_size(self) -> int:
+        return self.__record.size
+
+    @property
+    def closed(self) -> bool:
+        return self.__mmap is None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        if self.__computer.recorder is self:
+            self.__computer.stop_recording()
+        self.close()
+
+    def begin_tick(self) -> None:
+        """Called by the computer in the control phase, before decoding."""
+        controller = self.__controller
+        self.__opcode = controller.instruction_buffer.value.unsigned_value
+        self.__step_index = controller.step_counter.value.unsigned_value
+
+    def end_tick(self) -> None:
+        """Called by the computer at the start of the clear phase."""
+        if self.__count == self.__capacity:
+            self.__grow()
+        assert self.__mmap is not None
+        bits = self.__control_state.bits
+        words = [
+            bits >> (64 * i) & 0xFFFFFFFFFFFFFFFF
+            for i in range(self.__num_control_words)
+        ]
+        bus = self.__bus
+        if (value := bus.value) is None:
+            bus_value, setter = 0, _NO_SETTER
+        else:
+            bus_value = value.unsigned_value
+            setter = self.__setter_indices.get(bus.setter or "", _NO_SETTER)
+        statuses = 0
+        for i, status in enumerate(self.__statuses):
+            if status.value:
+                statuses |= 1 << i
+        self.__record.pack_into(
+            self.__mmap,
+            self.__header_size + self.__count * self.__record.size,
+            self.__computer.cycles,
+            self.__opcode,
+            self.__step_index,
+            *words,
+            bus_value,
+            setter,
+            bytes([register.value.unsigned_value for register in self.__registers]),
+            statuses,
+        )
+        self.__count += 1
+
+    def __grow(self) -> None:
+        if self.__mmap is not None:
+            self.__mmap.close()
+        self.__capacity += self.__chunk_size
+        size = self.__header_size + self.__capacity * self.__record.size
+        os.ftruncate(self.__file.fileno(), size)
+        self.__mmap = mmap.mmap(self.__file.fileno(), size)
+
+    def flush(self) -> None:
+        """Write the record count to the header and flush the records to disk.
+
+        Until a flush, readers see the records up to the previous one.
+        """
+        if self.__mmap is None:
+            raise self._error("Recorder is closed.", self.Error)
+        _HEADER.pack_into(
+            self.__mmap,
+            0,
+            _MAGIC,
+            _VERSION,
+            self.__header_size,
+            self.__record.size,
+            self.__count,
+        )
+        self.__mmap.flush()
+
+    def close(self) -> None:
+        """Flush and truncate the file to the records written.
+
+        Computer.stop_recording closes the recorder it stops.
+        """
+        if self.__mmap is None:
+            return
+        self.flush()
+        self.__mmap.close()
+        self.__mmap = None
+        os.ftruncate(
+            self.__file.fileno(),
+            self.__header_size + self.__count * self.__record.size,
+        )
+        self.__file.close()
+
+
+class TraceReader(Errorable):
+    """Reads a file written by a TraceRecorder as a NumPy structured array.
+
+    The records are memory mapped, so nothing is read until it's used. NumPy
+    is an optional dependency, only needed to construct one of these.
+    """
+
+    class Error(Error): ...
+
+    def __init__(self, path: str | Path) -> None:
+        if np is None:  # pragma: no cover
+            raise self._error("TraceReader requires numpy.", self.Error)
+        self.__path = Path(path)
+        with open(self.__path, "rb") as file:
+            header = file.read(_HEADER.size)
+            try:
+                magic, version, header_size, record_size, count = _HEADER.unpack(header)
+            except struct.error as e:
+                raise self._error("Truncated trace.", self.Error) from e
+            if magic != _MAGIC:
+                raise self._error("Not a trace.", self.Error)
+            if version != _VERSION:
+                raise self._error(
+                    f"Unsupported trace version {version}, expected {_VERSION}.",
+                    self.Error,
+                )
+            layout = json.loads(file.read(header_size - _HEADER.size).rstrip(b"\0"))
+        self.__dtype = np.dtype([tuple(field) for field in layout["dtype"]])
+        if self.__dtype.itemsize != record_size:
+            raise self._error("Trace layout doesn't match its records.", self.Error)
+        self.__registers: Mapping[str, int] = {
+            path: i for i, path in enumerate(layout["registers"])
+        }
+        self.__statuses: Mapping[str, int] = {
+            path: i for i, path in enumerate(layout["statuses"])
+        }
+        self.__controls: Mapping[str, int] = layout["controls"]
+        self.__setters: tuple[str, ...] = tuple(layout["setters"])
+        self.__records: Array = (
+            np.memmap(
+                self.__path,
+                dtype=self.__dtype,
+                mode="r",
+                offset=header_size,
+                shape=(count,),
+            )
+            if count
+            else np.zeros(0, dtype=self.__dtype)
+        )
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    @property
+    def dtype(self) -> "np.dtype[Any]":
+        return self.__dtype
+
+    @property
+    def records(self) -> Array:
+        return self.__records
+
+    def __len__(self) -> int:
+        return len(self.__records)
+
+    @property
+    def registers(self) -> tuple[str, ...]:
+        return tuple(self.__registers)
+
+    @property
+    def statuses(self) -> tuple[str, ...]:
+        return tuple(self.__statuses)
+
+    @property
+    def controls(self) -> Mapping[str, int]:
+        """Bit indices of the controls in the controls words."""
+        return self.__controls
+
+    @property
+    def setters(self) -> tuple[str, ...]:
+        """The paths that bus_setter indexes."""
+        return self.__setters
+
+    def register(self, path: str) -> Array:
+        """The value of a register in every record."""
+        if (index := self.__registers.get(path)) is None:
+            raise self._error(f"Unknown register {path}.", self.Error)
+        return self.__records["registers"][:, index]
+
+    def status(self, path: str) -> Array:
+        """The value of a status in every record."""
+        if (index := self.__statuses.get(path)) is None:
+            raise self._error(f"Unknown status {path}.", self.Error)
+        return (self.__records["statuses"] >> index & 1).astype(bool)
+
+    def control(self, path: str) -> Array:
+        """The value of a control in every record."""
+        if (index := self.__controls.get(path)) is None:
+            raise self._error(f"Unknown control {path}.", self.Error)
+        word, bit = divmod(index, 64)
+        return (self.__records["controls"][:, word] >> np.uint64(bit) & 1).astype(bool)
+
+    def bus_setter(self, index: int) -> Optional[str]:
+        """The path of the component that set the bus in a record."""
+        setter = int(self.__records["bus_setter"][index])
+        return None if setter == _NO_SETTER else self.__setters[setter]
+
+
+from flip.components import computer
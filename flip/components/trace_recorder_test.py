@@ -0,0 +1,99 @@
+import struct
+from pathlib import Path
+
+import pytest
+
+from flip.components import MinimalComputer
+
+pytest.importorskip("numpy")
+
+from flip.components.trace_recorder import TraceReader, TraceRecorder
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(0x03)
+        .label("loop")
+        .txa()
+        .sta_zero_page(0xF0)
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+
+
+def test_record(tmp_path: Path) -> None:
+    path = tmp_path / "run.trace"
+    computer = MinimalComputer(data=_program())
+    expected = MinimalComputer(data=_program())
+    # A small chunk size, so the file grows several times.
+    with computer.record(path, chunk_size=7) as recorder:
+        computer.tick_until_halt()
+        assert recorder.count == computer.cycles
+    assert computer.recorder is None
+    assert recorder.closed
+    reader = TraceReader(path)
+    assert len(reader) == computer.cycles
+    records = reader.records
+    assert records["tick"].tolist() == list(range(1, computer.cycles + 1))
+    for i, record in enumerate(records):
+        opcode = expected.controller.instruction_buffer.value.unsigned_value
+        step_index = expected.controller.step_counter.value.unsigned_value
+        expected.tick()
+        assert record["opcode"] == opcode
+        assert record["step_index"] == step_index
+        assert reader.register("x")[i] == expected.x.value.unsigned_value
+        assert reader.register("a")[i] == expected.a.value.unsigned_value
+    assert reader.status("alu.zero").dtype == bool
+    assert reader.register("x")[-1] == 0
+    assert reader.control("halt")[-1]
+    assert not reader.control("halt")[0]
+    # The first two ticks copy the program counter to the memory address, and
+    # the third fetches the opcode from memory.
+    assert reader.bus_setter(0) == "program_counter.low"
+    assert reader.control("memory.address.low.read")[0]
+    assert reader.control("memory.write")[2]
+    assert reader.bus_setter(2) == "memory"
+    assert records["bus_value"][2] == computer.memory.peek(0x0000)
+
+
+def test_record_empty(tmp_path: Path) -> None:
+    path = tmp_path / "empty.trace"
+    computer = MinimalComputer()
+    computer.record(path)
+    computer.stop_recording()
+    assert len(TraceReader(path)) == 0
+
+
+def test_flush(tmp_path: Path) -> None:
+    path = tmp_path / "run.trace"
+    computer = MinimalComputer(data=_program())
+    recorder = computer.record(path)
+    for _ in range(10):
+        computer.tick()
+    assert len(TraceReader(path)) == 0
+    recorder.flush()
+    assert len(TraceReader(path)) == 10
+    computer.stop_recording()
+    with pytest.raises(TraceRecorder.Error):
+        recorder.flush()
+
+
+def test_errors(tmp_path: Path) -> None:
+    computer = MinimalComputer()
+    with pytest.raises(TraceRecorder.Error):
+        computer.record(tmp_path / "a", chunk_size=0)
+    path = tmp_path / "b"
+    path.write_bytes(b"nope")
+    with pytest.raises(TraceReader.Error):
+        TraceReader(path)
+    path.write_bytes(struct.pack("<8sIIIQ", b"NOTATRAC", 1, 32, 1, 0))
+    with pytest.raises(TraceReader.Error):
+        TraceReader(path)
+    computer.record(tmp_path / "c")
+    computer.stop_recording()
+    reader = TraceReader(tmp_path / "c")
+    for lookup in (reader.register, reader.status, reader.control):
+        with pytest.raises(TraceReader.Error):
+            lookup("z")
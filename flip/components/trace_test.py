@@ -0,0 +1,122 @@
+import io
+import json
+from pathlib import Path
+
+from flip.components import MinimalComputer
+from flip.components.trace import (
+    AluOperation,
+    BusWrite,
+    CallbackSink,
+    ControlSet,
+    Event,
+    Increment,
+    JsonLinesSink,
+    MemoryRead,
+    MemoryWrite,
+    RegisterRead,
+    RingBufferSink,
+    StatusLatch,
+)
+
+
+def _program() -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder().lda(0x01).adc(0x02).sta_zero_page(0xF0).hlt()
+    )
+
+
+def test_events() -> None:
+    computer = MinimalComputer(data=_program())
+    sink = RingBufferSink()
+    computer.add_trace_sink(sink)
+    computer.tick_until_halt()
+    events = sink.events
+    assert {type(event) for event in events} >= {
+        AluOperation,
+        BusWrite,
+        ControlSet,
+        Increment,
+        MemoryRead,
+        MemoryWrite,
+        RegisterRead,
+        StatusLatch,
+    }
+    # One control set per tick, stamped with the tick's cycle.
+    assert [event.cycle for event in events if isinstance(event, ControlSet)] == list(
+        range(1, computer.cycles + 1)
+    )
+    assert [
+        (event.operation, event.lhs, event.rhs, event.value)
+        for event in events
+        if isinstance(event, AluOperation)
+    ] == [("adc", 0x01, 0x02, 0x03)]
+    assert (
+        MemoryRead(
+            path="memory",
+            cycle=next(e.cycle for e in events if isinstance(e, MemoryRead)),
+            address=0xF0,
+            value=0x03,
+        )
+        in events
+    )
+    a = [event.value for event in events if isinstance(event, RegisterRead)]
+    assert 0x03 in a
+
+
+def test_cycles_continue_from_computer() -> None:
+    computer = MinimalComputer(data=_program())
+    computer.tick()
+    computer.tick()
+    events = list[Event]()
+    computer.add_trace_sink(CallbackSink(events.append))
+    computer.tick()
+    assert {event.cycle for event in events} == {3}
+
+
+def test_ring_buffer_capacity() -> None:
+    computer = MinimalComputer(data=_program())
+    sink = RingBufferSink(capacity=4)
+    computer.add_trace_sink(sink)
+    computer.tick_until_halt()
+    assert len(sink.events) == 4
+    assert sink.events[-1].cycle == computer.cycles
+    sink.clear()
+    assert sink.events == ()
+
+
+def test_json_lines(tmp_path: Path) -> None:
+    computer = MinimalComputer(data=_program())
+    buffer = RingBufferSink()
+    path = tmp_path / "trace.jsonl"
+    sink = JsonLinesSink(path)
+    computer.add_trace_sink(buffer)
+    computer.add_trace_sink(sink)
+    computer.tick_until_halt()
+    computer.remove_trace_sink(sink)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [json.loads(json.dumps(event.to_dict())) for event in buffer.events]
+    assert lines[0]["event"] == "ControlSet"
+    assert lines[0]["cycle"] == 1
+
+
+def test_json_lines_stream() -> None:
+    stream = io.StringIO()
+    sink = JsonLinesSink(stream)
+    sink.emit(BusWrite(path="a", cycle=7, value=0x12))
+    sink.close()
+    assert json.loads(stream.getvalue()) == {
+        "event": "BusWrite",
+        "path": "a",
+        "cycle": 7,
+        "value": 0x12,
+    }
+
+
+def test_fork_is_untraced() -> None:
+    computer = MinimalComputer(data=_program())
+    sink = RingBufferSink()
+    computer.add_trace_sink(sink)
+    fork = computer.fork()
+    assert fork.tracer is None
+    fork.tick_until_halt()
+    assert sink.events == ()
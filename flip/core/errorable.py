@@ -4,6 +4,8 @@ from flip.core.error import Error
 
 
 class Errorable:
+    __slots__ = ()
+
     def _error[E: Error](self, message: str, type: Type[E] = Error) -> E:
         return type(message)
 
@@ -0,0 +1 @@
+from .farm import Farm as Farm
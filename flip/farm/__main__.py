@@ -0,0 +1,5 @@
+import sys
+
+from flip.farm.cli import main
+
+sys.exit(main())
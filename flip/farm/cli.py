@@ -0,0 +1,118 @@
+"""Command line entry point for running a corpus of programs on a Farm.
+
+Programs are named by "module:attribute", where the attribute is an iterable
+of Programs or ProgramBuilders, or a function that returns one. Results are
+printed as JSON lines as they complete.
+"""
+
+import argparse
+import importlib
+import json
+from typing import Any, Iterable, Optional, Sequence, cast
+
+from flip.components import Computer
+from flip.farm.farm import Farm
+from flip.programs import Program, ProgramBuilder
+
+
+def _load(name: str) -> Any:
+    module_name, sep, attribute = name.partition(":")
+    if not sep or not module_name or not attribute:
+        raise argparse.ArgumentTypeError(f"Expected module:attribute, got {name}.")
+    try:
+        value: Any = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            value = getattr(value, part)
+    except (ImportError, AttributeError) as e:
+        raise argparse.ArgumentTypeError(f"Can't load {name}: {e}") from e
+    return value
+
+
+def _memory_range(value: str) -> tuple[int, int]:
+    start, sep, stop = value.partition(":")
+    try:
+        if not sep:
+            raise ValueError
+        return int(start, 0), int(stop, 0)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Expected start:stop, got {value}.") from e
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="flip-farm",
+        description="Run many programs in parallel and print their results.",
+    )
+    parser.add_argument(
+        "programs",
+        type=_load,
+        help="module:attribute of an iterable of programs, or a function "
+        "returning one",
+    )
+    parser.add_argument(
+        "--computer",
+        type=_load,
+        default="flip.components:MinimalComputer",
+        help="module:attribute of the Computer subclass to run programs on",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument("--max-cycles", type=int, default=None)
+    parser.add_argument(
+        "--memory",
+        type=_memory_range,
+        action="append",
+        default=[],
+        help="start:stop memory range to include in results, may be repeated",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=[engine.name.lower() for engine in Computer.Engine],
+        default=Computer.Engine.MICROCODE.name.lower(),
+    )
+    return parser
+
+
+def _json(result: Farm.Result) -> str:
+    return json.dumps(
+        {
+            "index": result.index,
+            "cycles": result.cycles,
+            "halted": result.halted,
+            "error": result.error,
+            "registers": dict(result.registers),
+            "memory": {
+                f"0x{start:04X}": data.hex() for start, data in result.memory.items()
+            },
+        }
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Returns 0 if every program halted without error, otherwise 1."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    computer_type = args.computer
+    if not (isinstance(computer_type, type) and issubclass(computer_type, Computer)):
+        parser.error("--computer must name a Computer subclass.")
+    loaded: object = args.programs
+    programs = cast(
+        Iterable[Program | ProgramBuilder], loaded() if callable(loaded) else loaded
+    )
+    try:
+        farm = Farm(
+            computer_type,
+            max_workers=args.workers,
+            chunksize=args.chunksize,
+            max_cycles=args.max_cycles,
+            memory_ranges=args.memory,
+            engine=args.engine,
+        )
+    except Farm.Error as e:
+        parser.error(str(e))
+    status = 0
+    for result in farm.run(programs):
+        print(_json(result), flush=True)
+        if result.error is not None:
+            status = 1
+    return status
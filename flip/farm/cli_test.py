@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from flip.components import MinimalComputer
+from flip.farm.cli import main
+
+PROGRAMS = [
+    MinimalComputer.program_builder().lda(0x12).sta(0x0300).hlt(),
+    MinimalComputer.program_builder().lda(0x34).sta(0x0300).hlt(),
+]
+
+
+def looping_programs() -> list[MinimalComputer.ProgramBuilder]:
+    return [MinimalComputer.program_builder().ldx(0x01).label("l").jmp("l")]
+
+
+def test_main(capsys: pytest.CaptureFixture[str]) -> None:
+    assert (
+        main(
+            [
+                "flip.farm.cli_test:PROGRAMS",
+                "--workers=1",
+                "--memory=0x0300:0x0301",
+            ]
+        )
+        == 0
+    )
+    results = sorted(
+        (json.loads(line) for line in capsys.readouterr().out.splitlines()),
+        key=lambda result: result["index"],
+    )
+    assert [result["registers"]["a"] for result in results] == [0x12, 0x34]
+    assert [result["memory"] for result in results] == [
+        {"0x0300": "12"},
+        {"0x0300": "34"},
+    ]
+    assert all(result["halted"] for result in results)
+
+
+def test_main_max_cycles(capsys: pytest.CaptureFixture[str]) -> None:
+    assert (
+        main(["flip.farm.cli_test:looping_programs", "--workers=1", "--max-cycles=100"])
+        == 1
+    )
+    (result,) = map(json.loads, capsys.readouterr().out.splitlines())
+    assert result["cycles"] == 100
+    assert not result["halted"]
+
+
+def test_main_invalid() -> None:
+    for argv in (
+        ["flip.farm.cli_test"],
+        ["flip.farm.cli_test:MISSING"],
+        ["flip.farm.cli_test:PROGRAMS", "--memory=0x0300"],
+        ["flip.farm.cli_test:PROGRAMS", "--computer=flip.farm.cli_test:PROGRAMS"],
+        ["flip.farm.cli_test:PROGRAMS", "--chunksize=0"],
+    ):
+        with pytest.raises(SystemExit):
+            main(argv)
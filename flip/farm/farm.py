@@ -0,0 +1,157 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import batched
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
+
+from flip.components import Computer, Register
+from flip.core import Error, Errorable
+from flip.programs import Program, ProgramBuilder
+
+
+class Farm(Errorable):
+    """Runs many programs on fresh computers across a pool of processes.
+
+    Each worker builds one computer when it starts, which assembles and caches
+    the instruction ROM for the rest of the worker's life. Programs are sent
+    to workers in chunks, and results are yielded as each chunk completes, so
+    they come back out of order; Result.index is the program's position in
+    the input. Programs are read from the input as chunks complete, keeping
+    at most two chunks per worker in flight, so the input can be a lazy
+    iterable of any length.
+    """
+
+    class Error(Error): ...
+
+    @dataclass(frozen=True, kw_only=True)
+    class Result:
+        # Position of the program in the input to run.
+        index: int
+        # Register values by path.
+        registers: Mapping[str, int] = field(default_factory=dict[str, int])
+        # Contents of each requested memory range, by start address.
+        memory: Mapping[int, bytes] = field(default_factory=dict[int, bytes])
+        cycles: int = 0
+        halted: bool = False
+        # The exception the program raised, or why it didn't halt.
+        error: Optional[str] = None
+
+    def __init__(
+        self,
+        computer_type: type[Computer],
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        max_cycles: Optional[int] = None,
+        memory_ranges: Sequence[tuple[int, int]] = (),
+        engine: Computer.Engine | str = Computer.Engine.MICROCODE,
+    ) -> None:
+        """Create a farm.
+
+        max_cycles limits the cycles of each program, and memory_ranges are
+        (start, stop) address ranges to read out of each computer when its
+        program is done.
+        """
+        if chunksize < 1:
+            raise self._error(f"Invalid chunksize {chunksize}.", self.Error)
+        if max_cycles is not None and max_cycles < 0:
+            raise self._error(f"Invalid max_cycles {max_cycles}.", self.Error)
+        for start, stop in memory_ranges:
+            if not 0 <= start <= stop <= 0x10000:
+                raise self._error(
+                    f"Invalid memory range 0x{start:04X}:0x{stop:04X}.", self.Error
+                )
+        if isinstance(engine, str):
+            engine = Computer.Engine[engine.upper()]
+        self.__max_workers = max_workers
+        self.__chunksize = chunksize
+        self.__config = _Config(
+            computer_type=computer_type,
+            engine=engine,
+            max_cycles=max_cycles,
+            memory_ranges=tuple(memory_ranges),
+        )
+
+    @property
+    def computer_type(self) -> type[Computer]:
+        return self.__config.computer_type
+
+    @property
+    def chunksize(self) -> int:
+        return self.__chunksize
+
+    def run(
+        self, programs: Iterable[Program | ProgramBuilder]
+    ) -> Iterator["Farm.Result"]:
+        """Run every program and yield their results as they complete."""
+        max_workers = self.__max_workers or os.process_cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initialize,
+            initargs=(self.__config.computer_type,),
+        ) as executor:
+            pending = set[Future[list[Farm.Result]]]()
+            try:
+                for chunk in batched(enumerate(programs), self.__chunksize):
+                    while len(pending) >= 2 * max_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from future.result()
+                    pending.add(executor.submit(_run, self.__config, chunk))
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            finally:
+                # Don't start chunks nobody will see if the caller stops early.
+                executor.shutdown(cancel_futures=True)
+
+
+@dataclass(frozen=True, kw_only=True)
+class _Config:
+    computer_type: type[Computer]
+    engine: Computer.Engine
+    max_cycles: Optional[int]
+    memory_ranges: tuple[tuple[int, int], ...]
+
+
+def _initialize(computer_type: type[Computer]) -> None:
+    # Assemble the instruction ROM, which is cached for the process.
+    computer_type()
+
+
+def _run(
+    config: _Config, chunk: Sequence[tuple[int, Program | ProgramBuilder]]
+) -> list[Farm.Result]:
+    return [_run_program(config, index, program) for index, program in chunk]
+
+
+def _run_program(
+    config: _Config, index: int, program: Program | ProgramBuilder
+) -> Farm.Result:
+    computer = config.computer_type()
+    error: Optional[str] = None
+    try:
+        computer.run(program, config.engine, config.max_cycles)
+        if not computer.halt:
+            error = f"Didn't halt within {config.max_cycles} cycles."
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return Farm.Result(
+        index=index,
+        registers=dict(
+            sorted(
+                (component.path, component.value.unsigned_value)
+                for component in computer.walk()
+                if isinstance(component, Register)
+            )
+        ),
+        memory={
+            start: bytes(
+                computer.memory.peek(address) for address in range(start, stop)
+            )
+            for start, stop in config.memory_ranges
+        },
+        cycles=computer.cycles,
+        halted=computer.halt,
+        error=error,
+    )
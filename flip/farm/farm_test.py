@@ -0,0 +1,89 @@
+from typing import Iterator
+
+import pytest
+
+from flip.components import MinimalComputer
+from flip.farm import Farm
+
+
+def _program(count: int) -> MinimalComputer.ProgramBuilder:
+    return (
+        MinimalComputer.program_builder()
+        .ldx(count)
+        .label("loop")
+        .adc(0x03)
+        .sta(0x0200)
+        .dex()
+        .bne("loop")
+        .hlt()
+    )
+
+
+def _expected(count: int) -> MinimalComputer:
+    computer = MinimalComputer()
+    computer.run(_program(count))
+    return computer
+
+
+def test_run() -> None:
+    counts = [0x01, 0x02, 0x05, 0x10, 0x20]
+    farm = Farm(
+        MinimalComputer, max_workers=2, chunksize=2, memory_ranges=[(0x0200, 0x0202)]
+    )
+    results = list(farm.run(_program(count) for count in counts))
+    assert sorted(result.index for result in results) == list(range(len(counts)))
+    for result in results:
+        expected = _expected(counts[result.index])
+        assert result.error is None
+        assert result.halted
+        assert result.cycles == expected.cycles
+        assert result.registers["a"] == expected.a.value.unsigned_value
+        assert result.registers["x"] == 0
+        assert result.memory == {
+            0x0200: bytes([expected.memory.peek(0x0200), expected.memory.peek(0x0201)])
+        }
+
+
+def test_run_reads_input_lazily() -> None:
+    read = 0
+
+    def programs() -> Iterator[MinimalComputer.ProgramBuilder]:
+        nonlocal read
+        for _ in range(20):
+            read += 1
+            yield _program(0x01)
+
+    results = Farm(MinimalComputer, max_workers=1).run(programs())
+    next(results)
+    # Two chunks in flight, plus the one waiting for a slot.
+    assert read <= 3
+    assert len(list(results)) == 19
+
+
+def test_max_cycles() -> None:
+    farm = Farm(MinimalComputer, max_workers=1, max_cycles=50)
+    (result,) = farm.run([_program(0x10)])
+    assert not result.halted
+    assert result.cycles == 50
+    assert result.error is not None
+
+
+def test_error() -> None:
+    farm = Farm(MinimalComputer, max_workers=1, engine="instruction")
+    programs = [
+        MinimalComputer.program_builder().data(0xFF),
+        _program(0x01),
+    ]
+    results = sorted(farm.run(programs), key=lambda result: result.index)
+    assert results[0].error is not None
+    assert "DecodeError" in results[0].error
+    assert results[1].error is None
+
+
+def test_invalid() -> None:
+    with pytest.raises(Farm.Error):
+        Farm(MinimalComputer, chunksize=0)
+    with pytest.raises(Farm.Error):
+        Farm(MinimalComputer, max_cycles=-1)
+    with pytest.raises(Farm.Error):
+        Farm(MinimalComputer, memory_ranges=[(0x0200, 0x0100)])